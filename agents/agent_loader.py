@@ -16,6 +16,6 @@ def load_agents() -> List[Type[Agent]]:
         if filename.endswith(".py"):
             module = import_module("agents." + filename.split('.')[0])
             for name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, Agent) and obj is not Agent:
+                if issubclass(obj, Agent) and obj.__module__ == module.__name__ and not inspect.isabstract(obj):
                     agents.append(obj)
     return agents
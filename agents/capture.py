@@ -0,0 +1,122 @@
+import itertools
+import os
+import queue
+import threading
+from time import time
+from typing import Dict, List, Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import ImageGrab
+
+from agents.perceive import WindowDetector
+from agents.training_data import concatenate_labels
+
+# Numbers the captures of this process, so that the batches of each have names of their own
+_captures = itertools.count()
+
+
+def grab_screen() -> np.ndarray:
+    """
+    :return: An RGB image of the whole screen.
+    """
+    return np.asarray(ImageGrab.grab().convert("RGB"))
+
+
+class FrameCapture:
+    """
+    Captures the game window from the screen in a background thread, so collecting images to train object detection
+    on never holds up the game. The game submits the state of the game it wants an image of, which is queued, and
+    the thread grabs the screen, converts it to grey, crops the window out of it and resizes it to the size of the
+    game. The crops and their states are saved in batches, in the same layout as the shards of training_data.
+    The queue is small and a submission is dropped if it is full, so when capturing falls behind the game it loses
+    frames rather than slowing the game down, and a frame is grabbed soon after its state was submitted. The time
+    each state was submitted and each frame captured are saved with them, to check how closely they match.
+    """
+
+    def __init__(self, output_dir: str, window_detector: WindowDetector, width: int, height: int,
+                 batch_size: int = 32, queue_size: int = 2, grab: Callable[[], np.ndarray] = grab_screen):
+        """
+        Start the thread.
+
+        :param output_dir: The directory to save the batches in.
+        :param window_detector: Finds the game window in images of the screen.
+        :param width: The width of the game.
+        :param height: The height of the game.
+        :param batch_size: The number of frames saved together.
+        :param queue_size: The number of submissions waiting to be captured before more are dropped.
+        :param grab: Grabs an RGB image of the screen.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.window_detector = window_detector
+        self.width = width
+        self.height = height
+        self.batch_size = batch_size
+        self.grab = grab
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.frames: List[np.ndarray] = []
+        self.labels: List[Dict[str, np.ndarray]] = []
+        self.times: List[Tuple[float, float]] = []
+        # Names the batches of this capture apart from those of other captures and earlier runs
+        self.prefix = "capture_{:d}_{:d}_{:d}".format(int(time()), os.getpid(), next(_captures))
+        self.batches = 0
+        self.saved = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, labels: Dict[str, np.ndarray]) -> bool:
+        """
+        Ask for a frame to be captured, without waiting.
+
+        :param labels: The state of the game, with a row per entity in each array, which must not be changed after.
+        :return: Whether the frame was queued, rather than dropped because capturing has fallen behind.
+        """
+        try:
+            self.queue.put_nowait((time(), labels))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        """ Capture queued frames until closed. """
+        while True:
+            submission = self.queue.get()
+            if submission is None:
+                break
+            submitted, labels = submission
+            image = cv2.cvtColor(self.grab(), cv2.COLOR_RGB2GRAY)
+            window_image = self.window_detector.detect(image)
+            if window_image.size == 0:
+                continue
+            self.frames.append(cv2.resize(window_image, (self.width, self.height), interpolation=cv2.INTER_AREA))
+            self.labels.append(labels)
+            self.times.append((submitted, time()))
+            if len(self.frames) == self.batch_size:
+                self.save_batch()
+        self.save_batch()
+
+    def save_batch(self) -> Optional[str]:
+        """
+        Save the frames captured since the last batch, from the capturing thread.
+
+        :return: The filename of the batch, or None if there are no frames to save.
+        """
+        if not self.frames:
+            return None
+        labels = {name: [frame_labels[name] for frame_labels in self.labels] for name in self.labels[0]}
+        filename = os.path.join(self.output_dir, "{}_{:05d}.npz".format(self.prefix, self.batches))
+        np.savez_compressed(filename, frames=np.stack(self.frames), times=np.array(self.times),
+                            **concatenate_labels(labels))
+        self.batches += 1
+        self.saved += len(self.frames)
+        self.frames, self.labels, self.times = [], [], []
+        return filename
+
+    def close(self):
+        """ Capture the frames still queued, save the last batch and stop the thread. """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
@@ -4,7 +4,16 @@ from game.physics import line_point, dist, is_left
 from game.control import Action
 
 
-def attack_nearest_asteroid(ship, closest_asteroid, asteroid_radius) -> Action:
+def attack_nearest_asteroid(ship, closest_asteroid, asteroid_radius, aim_scale: float = 1.0) -> Action:
+    """
+    Turn towards the asteroid and fire once it is in line with the ship.
+
+    :param ship: The ship attacking.
+    :param closest_asteroid: The position of the asteroid to attack.
+    :param asteroid_radius: The radius of the asteroid.
+    :param aim_scale: How far off the centre of the asteroid to fire, as a multiple of its radius.
+    :return: The action to take.
+    """
     point_x = int(ship.centre_x + (2 * ship.height * math.cos(ship.facing)))
     point_y = int(ship.centre_y + (2 * ship.height * math.sin(ship.facing)))
     line_vector_facing = line_point([point_x, point_y], [ship.centre_x, ship.centre_y], 100)
@@ -12,8 +21,9 @@ def attack_nearest_asteroid(ship, closest_asteroid, asteroid_radius) -> Action:
     dist_from_ship_to_asteroid_to_point_facing = dist([point_x, point_y], closest_asteroid) + \
                                                  dist(line_vector_facing, closest_asteroid)
     dist_from_ship_to_point_facing = dist([point_x, point_y], line_vector_facing)
-    if dist_from_ship_to_point_facing - asteroid_radius <= dist_from_ship_to_asteroid_to_point_facing <= \
-            dist_from_ship_to_point_facing + asteroid_radius:
+    tolerance = aim_scale * asteroid_radius
+    if dist_from_ship_to_point_facing - tolerance <= dist_from_ship_to_asteroid_to_point_facing <= \
+            dist_from_ship_to_point_facing + tolerance:
         return Action.FIRE
     if is_left(line_vector_behind, line_vector_facing, closest_asteroid):
         return Action.TURNLEFT
@@ -0,0 +1,119 @@
+import glob
+import os
+import random
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from game.entities import Ship, Asteroid, Particle
+from game.headless import HeadlessWindow
+from game.perception import VectorPerception
+from game.raster import rasterize
+
+from agents.perceive import detect_objects
+
+
+def random_scene(width: int, height: int, num_of_asteroids: int, num_of_particles: int
+                 ) -> Tuple[Ship, List[Asteroid], List[Particle]]:
+    """
+    Place a ship, asteroids and particles at random positions in the game.
+
+    :param width: The width of the game.
+    :param height: The height of the game.
+    :param num_of_asteroids: The number of asteroids.
+    :param num_of_particles: The number of particles.
+    :return: The ship, asteroids and particles.
+    """
+    ship = Ship(random.randint(0, width), random.randint(0, height), HeadlessWindow(width, height))
+    ship.facing = random.uniform(0, 6.28)
+    asteroids = [Asteroid(random.randint(0, width), random.randint(0, height), 0, 0, 15)
+                 for _ in range(num_of_asteroids)]
+    particles = [Particle(random.randint(0, width), random.randint(0, height), 0, 0)
+                 for _ in range(num_of_particles)]
+    return ship, asteroids, particles
+
+
+def benchmark(frames: int = 200, num_of_asteroids: int = 10, num_of_particles: int = 5, width: int = 640,
+              height: int = 480, seed: int = 0) -> Dict[str, float]:
+    """
+    Measure the speed of detect_objects and its accuracy against the VectorPerception of random scenes.
+    A ground truth asteroid is found, and a detection is correct, if the detected centre lies within its radius.
+
+    :param frames: The number of scenes to detect objects in.
+    :param num_of_asteroids: The number of asteroids in each scene.
+    :param num_of_particles: The number of particles in each scene.
+    :param width: The width of the game.
+    :param height: The height of the game.
+    :param seed: The seed of the random scenes.
+    :return: Frames per second, recall and precision of asteroids, mean centre and radius error of found
+     asteroids and the mean error of the ships position.
+    """
+    random.seed(seed)
+    detection_time = 0.0
+    found = 0
+    correct = 0
+    detected = 0
+    truths = 0
+    centre_errors: List[float] = []
+    radius_errors: List[float] = []
+    ship_errors: List[float] = []
+    frame = np.zeros((height, width), dtype=np.uint8)
+    for _ in range(frames):
+        ship, asteroids, particles = random_scene(width, height, num_of_asteroids, num_of_particles)
+        ship_state, asteroid_data, _ = VectorPerception(ship, particles, asteroids, []).get_perception_data()
+        rasterize(width, height, [ship], asteroids, particles, frame)
+
+        start = perf_counter()
+        detections = detect_objects(frame)
+        detection_time += perf_counter() - start
+
+        true_centres = np.array([(asteroid['centre_x'], asteroid['centre_y']) for asteroid in asteroid_data])
+        true_radii = np.array([asteroid['radius'] for asteroid in asteroid_data])
+        truths += len(true_centres)
+        detected += len(detections.asteroid_centres)
+        if len(detections.asteroid_centres) > 0:
+            offsets = true_centres[:, None, :] - detections.asteroid_centres[None, :, :]
+            distances = np.hypot(offsets[..., 0], offsets[..., 1])
+            nearest = np.argmin(distances, axis=1)
+            nearest_distances = distances[np.arange(len(true_centres)), nearest]
+            hits = nearest_distances <= true_radii
+            found += int(hits.sum())
+            correct += int((distances <= true_radii[:, None]).any(axis=0).sum())
+            centre_errors.extend(nearest_distances[hits])
+            radius_errors.extend(np.abs(detections.asteroid_radii[nearest[hits]] - true_radii[hits]))
+        if detections.ship is not None:
+            ship_errors.append(float(np.hypot(detections.ship[0] - ship_state['centre_x'],
+                                              detections.ship[1] - ship_state['centre_y'])))
+    return {
+        'frames_per_second': frames / detection_time,
+        'recall': found / max(truths, 1),
+        'precision': correct / max(detected, 1),
+        'centre_error': float(np.mean(centre_errors)) if centre_errors else float('nan'),
+        'radius_error': float(np.mean(radius_errors)) if radius_errors else float('nan'),
+        'ship_found': len(ship_errors) / frames,
+        'ship_error': float(np.mean(ship_errors)) if ship_errors else float('nan')
+    }
+
+
+def validate_templates(template_dir: str = "training_images/templates/asteroids") -> List[Tuple[str, int, float]]:
+    """
+    Detect asteroids in the captured asteroid samples, each of which should contain exactly one asteroid.
+
+    :param template_dir: The directory of asteroid samples.
+    :return: The filename, number of asteroids detected and radius of the first asteroid for each sample.
+    """
+    results = []
+    for filename in sorted(glob.glob(os.path.join(template_dir, "*"))):
+        detections = detect_objects(cv2.imread(filename, cv2.IMREAD_GRAYSCALE))
+        radius = float(detections.asteroid_radii[0]) if detections.asteroid_radii.size else 0.0
+        results.append((filename, len(detections.asteroid_radii), radius))
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print("{}: {:.3f}".format(name, value))
+    for filename, count, radius in validate_templates():
+        print("{}: {} asteroid(s), radius {:.1f}".format(filename, count, radius))
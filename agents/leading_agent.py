@@ -0,0 +1,52 @@
+from typing import Type, List
+
+import numpy as np
+
+from game.agent import Agent, Action
+from game.perception import Perception, VectorPerception
+from game.entities import Ship
+from game.prediction import closest_approach, collision_times, intercepts, rank_threats
+
+from agents.decide import attack_nearest_asteroid
+
+
+class LeadingAgent(Agent):
+    """
+    A reactive agent that targets the most threatening asteroid and aims at where its particle will meet it,
+    rather than at where the asteroid is now.
+    """
+
+    def __init__(self, ship: Ship):
+        """
+        Initialise the agents knowledge.
+        """
+        self.target: List[float] = [0, 0]
+        self.asteroid_radius = 0
+        super().__init__(ship)
+
+    def perceive(self, perception: VectorPerception):
+        ship_state = perception.ship_state
+        asteroids = perception.asteroid_array
+        if not len(asteroids):
+            return
+        centres, velocities, radii = asteroids[:, :2], asteroids[:, 2:4], asteroids[:, 4]
+        ship_position = (ship_state['centre_x'], ship_state['centre_y'])
+        ship_velocity = (ship_state['velocity_x'], ship_state['velocity_y'])
+        _, approach_distances = closest_approach(ship_position, ship_velocity, centres, velocities)
+        collision_ticks = collision_times(ship_position, ship_velocity, 2 * ship_state['height'], centres, velocities,
+                                          radii)
+        _, intercept_ticks = intercepts(ship_position, centres, velocities, self.ship.particle_canon_speed,
+                                        2 * ship_state['height'])
+        threats = [index for index in rank_threats(collision_ticks, approach_distances)
+                   if np.isfinite(intercept_ticks[index])]
+        if threats:
+            target = threats[0]
+            self.target = list(centres[target] + velocities[target] * intercept_ticks[target])
+            self.asteroid_radius = radii[target]
+
+    def decide(self) -> Action:
+        return attack_nearest_asteroid(self.ship, self.target, self.asteroid_radius)
+
+    @staticmethod
+    def get_perception_type() -> Type[Perception]:
+        return VectorPerception
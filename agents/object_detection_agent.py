@@ -1,16 +1,15 @@
-from typing import Type
 import os
+import weakref
+from typing import Type
 import numpy as np
 from time import time
-import cv2
-from PIL import ImageGrab
-from time import time
 
 from game.agent import Agent, Action
 from game.perception import Perception, ImagePerception, VectorPerception
 
+from agents.capture import FrameCapture
 from agents.decide import attack_nearest_asteroid
-from agents.perceive import get_closest_asteroid_from_image, detect_window_in_image
+from agents.perceive import get_closest_asteroid_from_image, WindowDetector
 from agents.reactive_agent import ReactiveAgent
 
 
@@ -39,18 +38,35 @@ class ObjectDetectionAgent(Agent):
 
 
 class ObjectDetectionTrainingAgent(ReactiveAgent):
+    """
+    A reactive agent that collects images of the game labelled with the state of the game, to train object detection
+    on. The screen is captured by a FrameCapture in the background, so the game only has to queue the state.
+    """
 
-    def __init__(self, ship):
+    def __init__(self, ship, interval: float = 2, output_dir: str = "training_images/captured"):
+        """
+        :param ship: The ship to control.
+        :param interval: The seconds between images.
+        :param output_dir: The directory to save the images and their labels in.
+        """
         super().__init__(ship)
+        self.interval = interval
         self.last_recorded_image_time = time()
         template_dir = "training_images/templates/window"
         self.templates = [os.path.join(template_dir, template) for template in os.listdir(template_dir)]
+        self.capture = FrameCapture(output_dir, WindowDetector(self.templates), ship.window_width, ship.window_height)
+        # Closes the capture once, when the agent is closed, collected or the interpreter exits, whichever is first
+        self.closer = weakref.finalize(self, self.capture.close)
 
     def perceive(self, perception: VectorPerception):
         super().perceive(perception)
         current_time = time()
-        if current_time - self.last_recorded_image_time > 2:
-            image = ImageGrab.grab().convert("RGB")
-            cv_image = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
-            window_image: np.ndarray = detect_window_in_image(self.templates, cv_image)
+        if current_time - self.last_recorded_image_time > self.interval:
+            self.capture.submit({'ship_states': np.array([list(perception.ship_state.values())], dtype=np.float32),
+                                 'asteroid_states': perception.asteroid_array,
+                                 'particle_states': perception.particle_array})
             self.last_recorded_image_time = current_time
+
+    def close(self):
+        """ Save the frames still queued and stop capturing. """
+        self.closer()
@@ -1,12 +1,132 @@
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Optional, Sequence, NamedTuple, Union
+from math import atan2, cos, sin
 from pyglet.image import ColorBufferImage
 import numpy as np
 import cv2
 from PIL import Image
 
 
-def get_closest_asteroid_from_image(image: ColorBufferImage) -> Tuple[List[int], int]:
-    return [1, 2], 3
+_template_cache: Dict[Tuple[str, float], np.ndarray] = {}
+
+
+class Detections(NamedTuple):
+    """ The objects detected in an image of the game. """
+    asteroid_centres: np.ndarray
+    asteroid_radii: np.ndarray
+    particles: np.ndarray
+    ship: Optional[Tuple[float, float]]
+    ship_facing: Optional[float]
+
+
+def image_to_array(image: Union[ColorBufferImage, np.ndarray]) -> np.ndarray:
+    """
+    Convert an image of the game to a grayscale numpy array indexed by [y, x], with y increasing up the screen.
+
+    :param image: A pyglet image of the screen, or an array that is already a frame.
+    :return: The grayscale frame.
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        return image
+    data = image.get_image_data().get_data('L', image.width)
+    return np.frombuffer(data, dtype=np.uint8).reshape(image.height, image.width)
+
+
+def detect_objects(frame: np.ndarray, threshold: int = 64, particle_area: int = 4, ship_roundness: float = 0.72,
+                   ship_height: int = 10) -> Detections:
+    """
+    Find the asteroids, particles and ship in a grayscale frame from the connected components of its lit pixels.
+    Asteroid outlines are close to circles, so their pixels are all about the same distance from their centroid,
+    whereas the pixels of the ships triangle are not, and the ships triangle reaches about one and a half of its
+    heights from its centroid. Every component is measured at once.
+
+    :param frame: The grayscale frame, indexed by [y, x].
+    :param threshold: The pixel value above which a pixel is part of an object.
+    :param particle_area: The largest number of pixels in a particle.
+    :param ship_roundness: The roundness (mean over maximum distance of pixels from the centroid) below which a
+     component may be the ship.
+    :param ship_height: The height of the ship, used to find its centre from the tip of its triangle.
+    :return: The detected objects.
+    """
+    binary = cv2.threshold(frame, threshold, 1, cv2.THRESH_BINARY)[1]
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    areas = stats[:, cv2.CC_STAT_AREA]
+    lit = cv2.findNonZero(binary)
+    lit = np.empty((0, 2), dtype=np.int32) if lit is None else lit.reshape(-1, 2)
+    xs = lit[:, 0]
+    ys = lit[:, 1]
+    components = labels[ys, xs]
+    distances = np.hypot(xs - centroids[components, 0], ys - centroids[components, 1])
+    furthest = np.zeros(count)
+    np.maximum.at(furthest, components, distances)
+    roundness = np.bincount(components, distances, count) / np.maximum(furthest * areas, 1e-9)
+
+    objects = np.arange(count) > 0
+    large = objects & (areas > particle_area)
+    ship = None
+    ship_facing = None
+    ship_sized = (furthest > 1.2 * ship_height) & (furthest < 1.8 * ship_height)
+    ship_candidates = np.flatnonzero(large & ship_sized & (roundness < ship_roundness))
+    if ship_candidates.size > 0:
+        # Asteroids cut off by the edge of the frame can look like the ship, so prefer components inside it
+        touches_edge = ((stats[:, cv2.CC_STAT_LEFT] == 0) | (stats[:, cv2.CC_STAT_TOP] == 0) |
+                        (stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] == frame.shape[1]) |
+                        (stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] == frame.shape[0]))
+        ship_component = ship_candidates[np.lexsort((roundness[ship_candidates], touches_edge[ship_candidates]))[0]]
+        large[ship_component] = False
+        tip = np.argmax(np.where(components == ship_component, distances, -1.0))
+        ship_facing = atan2(ys[tip] - centroids[ship_component, 1], xs[tip] - centroids[ship_component, 0])
+        ship = (xs[tip] - 2 * ship_height * cos(ship_facing), ys[tip] - 2 * ship_height * sin(ship_facing))
+
+    asteroid_stats = stats[large]
+    asteroid_centres = np.stack((asteroid_stats[:, cv2.CC_STAT_LEFT] + (asteroid_stats[:, cv2.CC_STAT_WIDTH] - 1) / 2,
+                                 asteroid_stats[:, cv2.CC_STAT_TOP] + (asteroid_stats[:, cv2.CC_STAT_HEIGHT] - 1) / 2),
+                                axis=1)
+    asteroid_radii = (asteroid_stats[:, cv2.CC_STAT_WIDTH] + asteroid_stats[:, cv2.CC_STAT_HEIGHT]) / 4
+    particles = centroids[objects & (areas <= particle_area)]
+    return Detections(asteroid_centres, asteroid_radii, particles, ship, ship_facing)
+
+
+def get_closest_asteroid_from_image(image: Union[ColorBufferImage, np.ndarray],
+                                    ship_position: List[float] = None) -> Tuple[List[int], int]:
+    """
+    Detect the asteroid closest to the ship in an image of the game.
+
+    :param image: The image of the game.
+    :param ship_position: The position of the ship, otherwise the ship is detected in the image as well.
+    :return: The centre and radius of the closest asteroid, or [0, 0] and 0 if there are no asteroids.
+    """
+    frame = image_to_array(image)
+    detections = detect_objects(frame)
+    if detections.asteroid_radii.size == 0:
+        return [0, 0], 0
+    if ship_position is None:
+        ship_position = detections.ship if detections.ship is not None else (frame.shape[1] / 2, frame.shape[0] / 2)
+    offsets = detections.asteroid_centres - np.asarray(ship_position, dtype=np.float64)
+    closest = int(np.argmin(np.einsum('ij,ij->i', offsets, offsets)))
+    centre_x, centre_y = detections.asteroid_centres[closest]
+    return [int(centre_x), int(centre_y)], int(round(detections.asteroid_radii[closest]))
+
+
+def load_template(template: str, scale: float = 1.0) -> np.ndarray:
+    """
+    Load a grayscale template image, resized by scale, reading each file and resizing it at most once.
+
+    :param template: The template image filename.
+    :param scale: The factor to resize the template by.
+    :return: A numpy array of the template image.
+    """
+    key = (template, scale)
+    template_image = _template_cache.get(key)
+    if template_image is None:
+        template_image = cv2.imread(template, cv2.IMREAD_GRAYSCALE)
+        if template_image is None:
+            raise FileNotFoundError("Could not read template image: {}".format(template))
+        if scale != 1.0:
+            template_image = cv2.resize(template_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        _template_cache[key] = template_image
+    return template_image
 
 
 def detect_window_in_image(templates: List[str], cv_img) -> np.ndarray:
@@ -23,7 +143,7 @@ def detect_window_in_image(templates: List[str], cv_img) -> np.ndarray:
     heights = []
 
     for index, template in enumerate(templates):
-        template_image = cv2.imread(template, cv2.IMREAD_GRAYSCALE)
+        template_image = load_template(template)
         w, h = template_image.shape[::-1]
         res = cv2.matchTemplate(cv_img, template_image, cv2.TM_CCOEFF)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
@@ -39,3 +159,127 @@ def detect_window_in_image(templates: List[str], cv_img) -> np.ndarray:
 
     im_cropped = cv_img[median_top:median_top+median_height, median_left:median_left+median_width]
     return im_cropped
+
+
+class WindowDetector:
+    """
+    Detects the game window in successive screen images. Templates are loaded once at each of the given scales.
+    After the window has been found only a small region around its last position is searched, at a reduced
+    resolution, falling back to a search of the whole image when the match confidence drops well below the
+    confidence the window was first tracked with.
+    """
+
+    def __init__(self, templates: List[str], scales: Sequence[float] = (1.0,), margin: int = 16,
+                 track_scale: float = 0.25, confidence_ratio: float = 0.8):
+        """
+        Load the templates at each scale.
+
+        :param templates: The template image filenames to detect the window with.
+        :param scales: The scales to search for the window at.
+        :param margin: How far in pixels the window may move between images and still be tracked.
+        :param track_scale: The factor to shrink the region around the window by when tracking it.
+        :param confidence_ratio: The fraction of the initial tracking match score below which the window is
+         considered lost and the whole image is searched again.
+        """
+        self.templates: List[str] = templates
+        self.scales: Sequence[float] = scales
+        self.margin: int = margin
+        self.track_scale: float = track_scale
+        self.confidence_ratio: float = confidence_ratio
+        self.scale: float = scales[0]
+        self.window: Optional[Tuple[int, int, int, int]] = None
+        self.confidence: float = 0.0
+        self.reference_confidence: float = 0.0
+        for scale in scales:
+            for template in templates:
+                load_template(template, scale)
+                load_template(template, scale * track_scale)
+
+    def match(self, cv_img: np.ndarray, scale: float) -> Tuple[Tuple[int, int, int, int], float]:
+        """
+        Match every template at one scale against the image and combine them by taking medians.
+
+        :param cv_img: The image, or region of an image, to search.
+        :param scale: The scale of the templates to use.
+        :return: The window as left, top, width and height in the image and the median match score.
+        """
+        lefts = []
+        tops = []
+        widths = []
+        heights = []
+        scores = []
+        for template in self.templates:
+            template_image = load_template(template, scale)
+            h, w = template_image.shape
+            if h > cv_img.shape[0] or w > cv_img.shape[1]:
+                continue
+            res = cv2.matchTemplate(cv_img, template_image, cv2.TM_CCOEFF_NORMED)
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+            lefts.append(max_loc[0])
+            tops.append(max_loc[1])
+            widths.append(w)
+            heights.append(h)
+            scores.append(max_val)
+        if not scores:
+            return (0, 0, 0, 0), -1.0
+        window = (int(np.median(lefts)), int(np.median(tops)), int(np.median(widths)), int(np.median(heights)))
+        return window, float(np.median(scores))
+
+    def search(self, cv_img: np.ndarray) -> Tuple[Tuple[int, int, int, int], float]:
+        """
+        Search the whole image at every scale.
+
+        :param cv_img: The image to search.
+        :return: The best window found and its match score.
+        """
+        best_window, best_confidence = (0, 0, 0, 0), -1.0
+        for scale in self.scales:
+            window, confidence = self.match(cv_img, scale)
+            if confidence > best_confidence:
+                best_window, best_confidence = window, confidence
+                self.scale = scale
+        return best_window, best_confidence
+
+    def track(self, cv_img: np.ndarray) -> Tuple[Tuple[int, int, int, int], float]:
+        """
+        Search a shrunken copy of the region around the last detected window, at the scale it was last found at.
+
+        :param cv_img: The image to search.
+        :return: The window found and its match score.
+        """
+        left, top, width, height = self.window
+        region_left = max(left - self.margin, 0)
+        region_top = max(top - self.margin, 0)
+        region_right = min(left + width + self.margin, cv_img.shape[1])
+        region_bottom = min(top + height + self.margin, cv_img.shape[0])
+        region = cv2.resize(cv_img[region_top:region_bottom, region_left:region_right], None,
+                            fx=self.track_scale, fy=self.track_scale, interpolation=cv2.INTER_AREA)
+        (found_left, found_top, _, _), confidence = self.match(region, self.scale * self.track_scale)
+        return (region_left + int(round(found_left / self.track_scale)),
+                region_top + int(round(found_top / self.track_scale)), width, height), confidence
+
+    def locate(self, cv_img: np.ndarray) -> Tuple[int, int, int, int]:
+        """
+        Find where the window is in the image, tracking it from where it was last found if possible.
+
+        :param cv_img: The image to detect the window in.
+        :return: The left, top, width and height of the window.
+        """
+        if self.window is not None:
+            window, confidence = self.track(cv_img)
+            if confidence >= self.confidence_ratio * self.reference_confidence:
+                self.window, self.confidence = window, confidence
+                return window
+        self.window, self.confidence = self.search(cv_img)
+        self.reference_confidence = self.track(cv_img)[1]
+        return self.window
+
+    def detect(self, cv_img: np.ndarray) -> np.ndarray:
+        """
+        Detect the window in the image and return that section of the image.
+
+        :param cv_img: The image to detect the window in.
+        :return: A numpy array representing the cropped image.
+        """
+        left, top, width, height = self.locate(cv_img)
+        return cv_img[top:top+height, left:left+width]
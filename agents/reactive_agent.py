@@ -1,10 +1,10 @@
-from typing import Type, List
-import math
+from typing import Type, List, Dict, Tuple
+
+import numpy as np
 
 from game.agent import Agent, Action
 from game.perception import Perception, VectorPerception
 from game.entities import Ship
-from game.physics import dist
 
 from agents.decide import attack_nearest_asteroid
 
@@ -13,29 +13,36 @@ class ReactiveAgent(Agent):
     """
     A simple reactive agent that looks for the closest asteroid, aims and shoots.
     """
+    # The range of each parameter of the agent that is worth searching
+    PARAMETERS: Dict[str, Tuple[float, float]] = {'aim_scale': (0.1, 2.0), 'lead_ticks': (0.0, 40.0)}
 
-    def __init__(self, ship: Ship):
+    def __init__(self, ship: Ship, aim_scale: float = 1.0, lead_ticks: float = 0.0):
         """
         Initialise the agents knowledge.
+
+        :param ship: The ship the agent is controlling.
+        :param aim_scale: How far off the centre of an asteroid to fire, as a multiple of its radius.
+        :param lead_ticks: How many ticks ahead of where the asteroid is now to aim.
         """
         self.closest_asteroid: List[int, int] = [0, 0]
         self.asteroid_radius = 0
+        self.aim_scale = aim_scale
+        self.lead_ticks = lead_ticks
         super().__init__(ship)
 
     def perceive(self, perception: VectorPerception):
-        shortest_dist = math.inf
-        for asteroid in perception.asteroid_data:
-            asteroid_dist = dist(
-                [asteroid["centre_x"], asteroid["centre_y"]],
-                [self.ship.centre_x, self.ship.centre_y]
-            )
-            if asteroid_dist < shortest_dist:
-                shortest_dist = asteroid_dist
-                self.closest_asteroid = [asteroid["centre_x"], asteroid["centre_y"]]
-                self.asteroid_radius = asteroid["radius"]
+        asteroids = perception.asteroid_array
+        if not len(asteroids):
+            return
+        offsets = perception.asteroid_offsets
+        # The first of the closest asteroids, as found by comparing the distances one by one
+        closest = int(np.argmin(np.sqrt(offsets[:, 0] * offsets[:, 0] + offsets[:, 1] * offsets[:, 1])))
+        centre_x, centre_y, velocity_x, velocity_y, radius = asteroids[closest].tolist()
+        self.closest_asteroid = [centre_x + self.lead_ticks * velocity_x, centre_y + self.lead_ticks * velocity_y]
+        self.asteroid_radius = radius
 
     def decide(self) -> Action:
-        return attack_nearest_asteroid(self.ship, self.closest_asteroid, self.asteroid_radius)
+        return attack_nearest_asteroid(self.ship, self.closest_asteroid, self.asteroid_radius, self.aim_scale)
 
     @staticmethod
     def get_perception_type() -> Type[Perception]:
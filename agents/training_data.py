@@ -0,0 +1,144 @@
+import argparse
+import os
+import random
+from functools import partial
+from multiprocessing import Pool
+from typing import List, Type, Dict
+
+import numpy as np
+
+from game.agent import Agent
+from game.control import GameState
+from game.entities import Ship, Asteroid, Particle
+from game.headless import create_game
+from game.raster import rasterize, asteroid_vertices, ship_vertices
+
+from agents.reactive_agent import ReactiveAgent
+
+
+LABELS = ['asteroid_boxes', 'asteroid_centres', 'asteroid_radii', 'particle_centres', 'ship_boxes', 'ship_centres',
+          'ship_facings']
+
+
+def label_frame(ships: List[Ship], asteroids: List[Asteroid], particles: List[Particle]) -> Dict[str, np.ndarray]:
+    """
+    Label the entities in a frame with their exact positions. Boxes are the left, bottom, right and top of the
+    drawn outline, in the same coordinates as the frame.
+
+    :param ships: The ships in the frame.
+    :param asteroids: The asteroids in the frame.
+    :param particles: The particles in the frame.
+    :return: The labels of the frame, with one row per entity.
+    """
+    asteroid_outlines = asteroid_vertices(asteroids)
+    ship_outlines = ship_vertices(ships)
+    return {
+        'asteroid_boxes': np.concatenate((asteroid_outlines.min(axis=1), asteroid_outlines.max(axis=1)), axis=1)
+        if asteroids else np.empty((0, 4), dtype=np.int64),
+        'asteroid_centres': np.array([(asteroid.centre_x, asteroid.centre_y) for asteroid in asteroids],
+                                     dtype=np.float32).reshape(-1, 2),
+        'asteroid_radii': np.array([asteroid.radius for asteroid in asteroids], dtype=np.float32),
+        'particle_centres': np.array([(particle.centre_x, particle.centre_y) for particle in particles],
+                                     dtype=np.float32).reshape(-1, 2),
+        'ship_boxes': np.concatenate((ship_outlines.min(axis=1), ship_outlines.max(axis=1)), axis=1),
+        'ship_centres': np.array([(ship.centre_x, ship.centre_y) for ship in ships], dtype=np.float32).reshape(-1, 2),
+        'ship_facings': np.array([ship.facing for ship in ships], dtype=np.float32)
+    }
+
+
+def concatenate_labels(labels: Dict[str, List[np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatenate the labels of many frames, with an offsets array for each label giving where the rows of each frame
+    start, e.g. the asteroid centres of frame i are asteroid_centres[asteroid_centres_offsets[i]:
+    asteroid_centres_offsets[i + 1]].
+
+    :param labels: The labels of each frame by name.
+    :return: The concatenated labels and their offsets.
+    """
+    arrays = {}
+    for label, values in labels.items():
+        arrays[label] = np.concatenate(values)
+        arrays[label + '_offsets'] = np.cumsum([0] + [len(value) for value in values])
+    return arrays
+
+
+def generate_shard(shard: int, output_dir: str, frames: int, seed: int = 0, frame_interval: int = 10,
+                   agent_type: Type[Agent] = ReactiveAgent, width: int = 640, height: int = 480,
+                   part_frames: int = 100) -> List[str]:
+    """
+    Play seeded headless games, drawing a frame every frame_interval ticks, and save the frames and their labels
+    to compressed files of at most part_frames frames each, so that only one part is held in memory at a time. A
+    new game is started whenever one ends. The labels of all frames of a part are concatenated by
+    concatenate_labels.
+
+    :param shard: The number of the shard, used with the seed to seed its games.
+    :param output_dir: The directory to save the shard in.
+    :param frames: The number of frames in the shard.
+    :param seed: The seed of the whole data set.
+    :param frame_interval: The number of ticks between frames.
+    :param agent_type: The type of agent playing the games.
+    :param width: The width of the games.
+    :param height: The height of the games.
+    :param part_frames: The most frames in each file.
+    :return: The filenames of the parts of the shard, in order.
+    """
+    episode_seeds = random.Random("{}-{}".format(seed, shard))
+    images = np.zeros((min(frames, part_frames), height, width), dtype=np.uint8)
+    labels: Dict[str, List[np.ndarray]] = {label: [] for label in LABELS}
+    filenames: List[str] = []
+    game = None
+    frame = 0
+    while frame < frames:
+        if game is None or game.state is GameState.OVER:
+            game = create_game([agent_type], episode_seeds.getrandbits(32), width, height)
+        game.step()
+        if game.state is GameState.INPLAY and game.ticks % frame_interval == 0:
+            ships = [agent.get_ship() for agent in game.agents]
+            part_frame = frame % len(images)
+            rasterize(width, height, ships, game.asteroids, game.particles, images[part_frame])
+            for label, value in label_frame(ships, game.asteroids, game.particles).items():
+                labels[label].append(value)
+            frame += 1
+            if part_frame == len(images) - 1 or frame == frames:
+                filename = os.path.join(output_dir, "shard_{:05d}_{:04d}.npz".format(shard, len(filenames)))
+                np.savez_compressed(filename, frames=images[:part_frame + 1], **concatenate_labels(labels))
+                filenames.append(filename)
+                labels = {label: [] for label in LABELS}
+    return filenames
+
+
+def generate(output_dir: str, shards: int, frames_per_shard: int = 1000, seed: int = 0, frame_interval: int = 10,
+             agent_type: Type[Agent] = ReactiveAgent, processes: int = None, part_frames: int = 100) -> List[str]:
+    """
+    Generate shards of labeled frames in parallel, one shard per task in a pool of processes.
+
+    :param output_dir: The directory to save the shards in.
+    :param shards: The number of shards.
+    :param frames_per_shard: The number of frames in each shard.
+    :param seed: The seed of the whole data set.
+    :param frame_interval: The number of ticks between frames.
+    :param agent_type: The type of agent playing the games.
+    :param processes: The number of processes, defaulting to the number of cores.
+    :param part_frames: The most frames in each file, which bounds the memory of each process.
+    :return: The filenames of the parts of every shard.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    task = partial(generate_shard, output_dir=output_dir, frames=frames_per_shard, seed=seed,
+                   frame_interval=frame_interval, agent_type=agent_type, part_frames=part_frames)
+    with Pool(processes) as pool:
+        return sorted(filename for filenames in pool.imap_unordered(task, range(shards)) for filename in filenames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate labeled frames of headless games.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=1000, help="frames per shard")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=int, default=10, help="ticks between frames")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--part-frames", type=int, default=100, help="most frames in each file")
+    args = parser.parse_args()
+    for shard_filename in generate(args.output_dir, args.shards, args.frames, args.seed, args.interval,
+                                   processes=args.processes, part_frames=args.part_frames):
+        print(shard_filename)
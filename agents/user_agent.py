@@ -1,20 +1,24 @@
-from typing import Type
+from typing import Type, List
 
 from pyglet.window import key
 
 from game.agent import Agent, Action
+from game.keyboard import Keyboard
 from game.perception import Perception, NoPerception
 from game.entities import Ship
 
 
 class UserAgent(Agent):
     """
-    An agent that is an actual user.
+    An agent that is an actual user. The keys held decide how the ship turns and boosts, and every key event since the
+    last tick is acted on in the next one.
     """
 
     def __init__(self, ship: Ship):
         super().__init__(ship)
-        self.actions = []
+        self.keyboard = Keyboard()
+        self.turn = Action.STOPTURN
+        self.boost = Action.STOPBOOST
 
     @staticmethod
     def get_perception_type() -> Type[Perception]:
@@ -23,27 +27,24 @@ class UserAgent(Agent):
     def perceive(self, perception: NoPerception):
         pass
 
-    def decide(self) -> Action:
-        if len(self.actions) > 0:
-            return self.actions.pop(0)
-        else:
-            return Action.NOACTION
-
-    def add_action(self, action: Action):
-        self.actions.append(action)
+    def decide(self) -> List[Action]:
+        presses = self.keyboard.tick()
+        actions = []
+        turning = self.keyboard.last_held(key.A, key.D)
+        turn = Action.STOPTURN if turning is None else Action.TURNLEFT if turning == key.A else Action.TURNRIGHT
+        if turn is not self.turn:
+            actions.append(turn)
+            self.turn = turn
+        boost = Action.BOOST if self.keyboard.is_held(key.W) else Action.STOPBOOST
+        if boost is not self.boost:
+            actions.append(boost)
+            self.boost = boost
+        if any(symbol == key.SPACE for _, symbol, _ in presses):
+            actions.append(Action.FIRE)
+        return actions
 
     def on_key_press(self, symbol, modifiers):
-        if symbol == key.W:
-            self.add_action(Action.BOOST)
-        elif symbol == key.D:
-            self.add_action(Action.TURNRIGHT)
-        elif symbol == key.A:
-            self.add_action(Action.TURNLEFT)
-        elif symbol == key.SPACE:
-            self.add_action(Action.FIRE)
+        self.keyboard.on_key_press(symbol, modifiers)
 
     def on_key_release(self, symbol, modifiers):
-        if symbol == key.A or symbol == key.D:
-            self.add_action(Action.STOPTURN)
-        if symbol == key.W:
-            self.add_action(Action.STOPBOOST)
+        self.keyboard.on_key_release(symbol, modifiers)
@@ -0,0 +1 @@
+# Puts the root of the repository on the path when the tests are run with pytest
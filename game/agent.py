@@ -2,7 +2,7 @@ from enum import Enum
 from game.perception import Perception, NoPerception
 from game.entities import Ship
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Type, List, Dict, Tuple, Any, Union
 
 
 class Action(Enum):
@@ -16,6 +16,38 @@ class Action(Enum):
     NOACTION = 7
 
 
+# An action, or several actions to be enacted in order in the same tick
+Decision = Union[Action, List[Action]]
+
+
+def pack_decision(decision: Decision) -> int:
+    """
+    :param decision: A decision.
+    :return: A number that stands for the decision, the value of an action or the values of a list of actions as the
+     digits in base 8 of the number, the first action being the lowest digit.
+    """
+    if isinstance(decision, Action):
+        return decision.value
+    code = 0
+    for action in reversed(decision):
+        code = code << 3 | action.value
+    return code or Action.NOACTION.value
+
+
+def unpack_decision(code: int) -> Decision:
+    """
+    :param code: A number given by pack_decision.
+    :return: The decision.
+    """
+    if code < 8:
+        return Action(code)
+    actions = []
+    while code:
+        actions.append(Action(code & 7))
+        code >>= 3
+    return actions
+
+
 class Agent(ABC):
     """
     An interface for agent that is capable of perceiving it's environment,
@@ -45,11 +77,11 @@ class Agent(ABC):
         self.ship.draw()
 
     @abstractmethod
-    def decide(self) -> Action:
+    def decide(self) -> Decision:
         """
         Decide an action to take at this point in time.
 
-        :return: The action to take.
+        :return: The action to take, or a list of actions to take in order.
         """
         raise NotImplementedError
 
@@ -85,3 +117,98 @@ class Agent(ABC):
         :param modifiers: ?
         """
         pass
+
+    def close(self):
+        """
+        Release anything the agent holds, such as threads or files, once its ship is out of the game. This may be
+        called more than once.
+        """
+        pass
+
+
+class BatchPolicy(ABC):
+    """
+    A policy that decides the actions of many agents at once, e.g. a neural network that is cheaper to run on a batch
+    of observations than on each observation individually.
+    """
+
+    @abstractmethod
+    def decide_batch(self, observations: List[Any]) -> List[Action]:
+        """
+        Decide an action for each of the observations.
+
+        :param observations: The observations of the agents using this policy.
+        :return: The actions to take, in the same order as the observations.
+        """
+        raise NotImplementedError
+
+
+class BatchedAgent(Agent):
+    """
+    An agent whose decisions are made by a policy that may be shared with other agents.
+    The game collects the observations of all agents sharing a policy and decides their actions in one call.
+    """
+
+    def __init__(self, ship: Ship, policy: BatchPolicy):
+        """
+        Associate the agent with a ship and the policy that decides its actions.
+
+        :param ship: The ship the agent is controlling.
+        :param policy: The policy deciding the actions of the agent.
+        """
+        super().__init__(ship)
+        self.policy = policy
+        self.observation = None
+
+    def perceive(self, perception: Perception):
+        """
+        Store the observation of the perception until the policy next decides.
+
+        :param perception: The perception received
+        :return: None
+        """
+        self.observation = self.observe(perception)
+
+    def observe(self, perception: Perception):
+        """
+        Turn a perception into the observation given to the policy.
+
+        :param perception: The perception received
+        :return: The observation to give to the policy.
+        """
+        return perception.get_perception_data()
+
+    def decide(self) -> Action:
+        """
+        Decide the action of this agent alone, as a batch of one.
+
+        :return: The action to take.
+        """
+        return self.policy.decide_batch([self.observation])[0]
+
+    def get_policy(self) -> BatchPolicy:
+        """
+        :return: The policy deciding the actions of the agent.
+        """
+        return self.policy
+
+
+def decide_all(agents: List[Agent]) -> List[Decision]:
+    """
+    Decide the actions of the agents, calling each batch policy once for all of the agents that share it.
+
+    :param agents: The agents to decide actions for, which may come from several games.
+    :return: The action of each agent, in the same order as the agents.
+    """
+    decisions: List[Decision] = [Action.NOACTION] * len(agents)
+    batches: Dict[int, Tuple[BatchPolicy, List[int]]] = {}
+    for index, agent in enumerate(agents):
+        if isinstance(agent, BatchedAgent):
+            batches.setdefault(id(agent.get_policy()), (agent.get_policy(), []))[1].append(index)
+        else:
+            decisions[index] = agent.decide()
+    for policy, indices in batches.values():
+        actions = policy.decide_batch([agents[index].observation for index in indices])
+        for index, action in zip(indices, actions):
+            decisions[index] = action
+    return decisions
@@ -0,0 +1,95 @@
+import json
+from dataclasses import dataclass, asdict, replace
+from typing import Dict, Any
+
+from game.entities import Ship
+
+# What a game does when a new asteroid or particle would pass its cap: drop the new one, drop the oldest one or raise
+# an error
+OVERFLOW_POLICIES = ('drop_new', 'drop_oldest', 'error')
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """ The constants that decide how hard a game is and how much it costs to run. """
+    # The ships
+    ship_height: float = 10
+    turn_speed: float = 0.1
+    thrust_max: float = 0.2
+    thrust_incr: float = 0.02
+    particle_canon_speed: float = 15
+    reload_time: float = 0.25
+    # The asteroids, whose speed across the screen is between the min and max and whose speed along it is up to max
+    asteroid_size: float = 15
+    asteroid_min_speed: int = 1
+    asteroid_max_speed: int = 3
+    # How often asteroids are created and how that changes every level
+    seconds_between_asteroids: float = 0.5
+    min_seconds_between_asteroids: float = 0.01
+    spawn_decay: float = 1.25
+    points_per_level: int = 5
+    # The seconds a tick of a headless game lasts
+    tick_seconds: float = 1 / 60
+    # The most asteroids and particles alive at once, 0 for no cap, and the policy of each for going over it
+    max_asteroids: int = 0
+    asteroid_overflow: str = 'drop_new'
+    max_particles: int = 0
+    particle_overflow: str = 'drop_new'
+
+    def __post_init__(self):
+        """
+        :raises ValueError: If an overflow policy is not one of OVERFLOW_POLICIES.
+        """
+        for policy in (self.asteroid_overflow, self.particle_overflow):
+            if policy not in OVERFLOW_POLICIES:
+                raise ValueError("Unknown overflow policy {}, expected one of {}".format(policy, OVERFLOW_POLICIES))
+
+    def configure_ship(self, ship: Ship):
+        """
+        Set the constants of a ship to those of the config.
+
+        :param ship: The ship to configure.
+        """
+        ship.height = self.ship_height
+        ship.turn_speed = self.turn_speed
+        ship.thrust_max = self.thrust_max
+        ship.thrust_incr = self.thrust_incr
+        ship.particle_canon_speed = self.particle_canon_speed
+        ship.reload_time = self.reload_time
+
+    def with_values(self, **values) -> 'GameConfig':
+        """
+        :return: A copy of the config with some values changed.
+        """
+        return replace(self, **values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: The values of the config by name.
+        """
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(values: Dict[str, Any]) -> 'GameConfig':
+        """
+        :param values: Values by name, defaulting any that are missing.
+        :return: The config.
+        :raises TypeError: If there is a value that is not part of the config.
+        """
+        return GameConfig(**values)
+
+    @staticmethod
+    def load(path: str) -> 'GameConfig':
+        """
+        :param path: A JSON file of an object of values by name.
+        :return: The config.
+        """
+        with open(path) as config_file:
+            return GameConfig.from_dict(json.load(config_file))
+
+    def save(self, path: str):
+        """
+        :param path: The JSON file to save the config to.
+        """
+        with open(path, "w") as config_file:
+            json.dump(self.to_dict(), config_file, indent=4)
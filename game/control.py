@@ -1,16 +1,26 @@
-import pyglet
+from __future__ import annotations
+
+import copy
 import random
 from enum import Enum
 from math import cos, sin, sqrt
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Callable, Type
 from time import time
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from game.entities import Asteroid, Particle
-from game.agent import Agent, Action
+import numpy as np
 
-key = pyglet.window.key
+from game.config import GameConfig
+from game.entities import Asteroid, Particle, Ship
+from game.agent import Agent, Action, Decision, decide_all
+from game.kernels import ship_hits, point_hits
+from game.kinetic import KineticCollisions
+from game.perception import Perception
+from game.raster import ship_vertices
+from game.world_hash import WorldHash
+from game.snapshot import GameSnapshot, pack_ships, unpack_ship, pack_asteroids, unpack_asteroids, pack_particles,\
+    unpack_particles
 
 
 class GameState(Enum):
@@ -23,20 +33,49 @@ class GameState(Enum):
 class Game:
     """ Handles the interaction between the agents and the environment. Handles the updating of the environment. """
 
-    def __init__(self, window, agents: List[Agent]):
+    def __init__(self, window, agents: List[Agent], seed: int = None, headless: bool = False, kinetic: bool = False,
+                 config: GameConfig = None):
         """
         Initialise the agents, particles, asteroids (and asteroid creator), state of the game, points and agents.
         :param window: The window to create the entities on.
+        :param seed: The seed of the games random number generator.
+        :param headless: Whether the game runs on its own clock, advancing tick_seconds every update, rather than in
+         real time. A headless game creates its asteroids during updates instead of in a background thread,
+         so a seeded headless game plays out the same every time given the same decisions.
+        :param kinetic: Whether to detect collisions by predicting when they happen rather than testing every pair of
+         entities every tick.
+        :param config: The constants of the game, which are also set on the ships of the agents.
         """
         self.window = window
+        self.config: GameConfig = config if config is not None else GameConfig()
         self.agents: List[Agent] = agents
+        self.players: List[Agent] = list(agents)
         self.particles: List[Particle] = []
         self.asteroids: List[Asteroid] = []
+        self.rng = random.Random(seed)
+        self.headless = headless
+        self.tick_seconds = self.config.tick_seconds
+        self.ticks = 0
+        self.collisions: KineticCollisions = KineticCollisions(self) if kinetic else None
+        self.tick_listeners: List[Callable[[Game], None]] = []
+        self.decisions: List[Decision] = []
+        self.world_hash = WorldHash()
+        # The telemetry slot timing the phases of each tick, if telemetry is attached
+        self.telemetry = None
 
-        self.asteroid_creator = BackgroundScheduler()
-        self.seconds_between_asteroid_generation = 0.5
-        self.asteroid_creator.add_job(lambda: self.asteroid_generate(window), 'interval',
-                                      seconds=self.seconds_between_asteroid_generation, id='asteroid generator')
+        for agent in agents:
+            self.config.configure_ship(agent.get_ship())
+        self.seconds_between_asteroid_generation = self.config.seconds_between_asteroids
+        if headless:
+            self.asteroid_creator = None
+            self.next_asteroid_time = self.seconds_between_asteroid_generation
+            for agent in agents:
+                agent.get_ship().clock = self.clock
+                agent.get_ship().last_fire_time = self.clock()
+        else:
+            self.asteroid_creator = BackgroundScheduler()
+            self.asteroid_creator.add_job(lambda: self.asteroid_generate(window), 'interval',
+                                          seconds=self.seconds_between_asteroid_generation, id='asteroid generator')
         self.level = 1
 
         self.state: GameState = GameState.INPLAY
@@ -53,29 +92,154 @@ class Game:
         for particle in self.particles:
             particle.draw()
 
-    def update(self):
-        """ Update the state of the entities """
+    def update(self, decisions: List[Decision] = None):
+        """
+        Update the state of the entities
+
+        :param decisions: The actions of the agents if they have already been decided, otherwise the agents perceive
+         and decide as part of the update.
+        """
         if self.state == GameState.INPLAY:
-            self.particles, self.asteroids, self.agents, reward = \
-                self.entity_update(self.window_width, self.window_height, self.particles, self.asteroids, self.agents)
-            self.points += reward
-            if not self.agents:
-                self.game_over()
-        if self.points / 5 > self.level and self.seconds_between_asteroid_generation > 0.01:
+            self.start_tick()
+            self.finish_tick(decisions)
+        else:
+            self.advance_level()
+
+    def start_tick(self):
+        """
+        Begin a tick of a game in play. A headless game moves its clock on and creates the asteroids due by it, so
+        they are there to be perceived.
+        """
+        if self.telemetry is not None:
+            self.telemetry.start()
+        if self.headless:
+            self.ticks += 1
+            while self.next_asteroid_time <= self.clock():
+                self.asteroid_generate(self.window)
+                self.next_asteroid_time += self.seconds_between_asteroid_generation
+
+    def finish_tick(self, decisions: List[Decision] = None):
+        """
+        Move and collide the entities of a game in play once start_tick has begun the tick.
+
+        :param decisions: The actions of the agents if they have already been decided, otherwise the agents perceive
+         and decide first.
+        """
+        self.particles, self.asteroids, self.agents, reward = \
+            self.entity_update(self.window_width, self.window_height, self.particles, self.asteroids, self.agents,
+                               decisions)
+        self.points += reward
+        self.world_hash.tick(self)
+        if not self.agents:
+            self.game_over()
+        for listener in self.tick_listeners:
+            listener(self)
+        self.advance_level()
+
+    def advance_level(self):
+        """ Go up a level once enough points have been scored, creating asteroids more often from then on. """
+        if self.points / self.config.points_per_level > self.level and \
+                self.seconds_between_asteroid_generation > self.config.min_seconds_between_asteroids:
             self.level += 1
-            self.asteroid_creator.remove_all_jobs()
-            self.seconds_between_asteroid_generation /= 1.25
-            self.asteroid_creator.add_job(lambda: self.asteroid_generate(self.window), 'interval',
-                                          seconds=self.seconds_between_asteroid_generation, id='asteroid generator')
+            self.seconds_between_asteroid_generation /= self.config.spawn_decay
+            if self.headless:
+                self.next_asteroid_time = self.clock() + self.seconds_between_asteroid_generation
+            else:
+                self.asteroid_creator.remove_all_jobs()
+                self.asteroid_creator.add_job(lambda: self.asteroid_generate(self.window), 'interval',
+                                              seconds=self.seconds_between_asteroid_generation,
+                                              id='asteroid generator')
+
+    def step(self, decisions: List[Decision] = None) -> Tuple[int, bool, Dict]:
+        """
+        Update the game by one tick and report what happened, for running games without a screen.
+
+        :param decisions: The actions of the agents if they have already been decided.
+        :return: The points scored in the tick, whether the game is over and information about the game.
+        """
+        points = self.points
+        self.update(decisions)
+        return self.points - points, self.state is GameState.OVER, {
+            'ticks': self.ticks, 'level': self.level, 'points': self.points,
+            'asteroids': len(self.asteroids), 'particles': len(self.particles), 'world_hash': self.world_hash.value
+        }
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Copy the state of the game, including the position of its random number generator, so that it can be
+        restored later. The agents themselves are not copied, only the states of their ships.
+
+        :return: The snapshot.
+        """
+        if self.headless:
+            seconds_to_next_asteroid = self.next_asteroid_time - self.clock()
+        else:
+            seconds_to_next_asteroid = self.seconds_between_asteroid_generation
+        return GameSnapshot(self.ticks, self.points, self.level, self.state, self.seconds_between_asteroid_generation,
+                            seconds_to_next_asteroid, self.rng.getstate(),
+                            pack_ships([player.get_ship() for player in self.players]),
+                            np.array([player in self.agents for player in self.players], dtype=bool),
+                            pack_asteroids(list(self.asteroids)), pack_particles(self.particles),
+                            self.world_hash.value)
+
+    def restore(self, snapshot: GameSnapshot):
+        """
+        Return the game to the state in a snapshot of it, or of the game it was forked from, reusing the games
+        entities where possible.
+
+        :param snapshot: The snapshot to restore.
+        """
+        self.ticks = snapshot.ticks
+        self.points = snapshot.points
+        self.level = snapshot.level
+        self.state = snapshot.state
+        self.seconds_between_asteroid_generation = snapshot.seconds_between_asteroid_generation
+        if self.headless:
+            self.next_asteroid_time = self.clock() + snapshot.seconds_to_next_asteroid
+        self.rng.setstate(snapshot.rng_state)
+        self.world_hash.reset(snapshot.world_hash)
+        for player, row in zip(self.players, snapshot.ships):
+            unpack_ship(row, player.get_ship())
+        self.agents = [player for player, alive in zip(self.players, snapshot.alive) if alive]
+        unpack_asteroids(snapshot.asteroids, self.asteroids)
+        unpack_particles(snapshot.particles, self.particles)
+        if self.collisions is not None:
+            self.collisions.reset()
+
+    def fork(self) -> Game:
+        """
+        Create an independent headless copy of the game in its current state, for example to simulate ahead.
+        Each agent is shallow copied and given its own ship. To run many simulations from one state it is cheaper to
+        fork once and restore a snapshot before each simulation than to fork for every simulation.
+
+        :return: The copy of the game.
+        """
+        players = []
+        for player in self.players:
+            forked_player = copy.copy(player)
+            forked_player.ship = Ship(0, 0, self.window)
+            players.append(forked_player)
+        game = Game(self.window, players, headless=True, kinetic=self.collisions is not None, config=self.config)
+        game.tick_seconds = self.tick_seconds
+        game.restore(self.snapshot())
+        return game
+
+    def clock(self) -> float:
+        """
+        :return: The number of seconds of the game that have been played on its own clock.
+        """
+        return self.ticks * self.tick_seconds
 
     def pause_toggle(self):
         """ Sets the game state from INPLAY to PAUSED and vice versa. """
         if self.state is GameState.INPLAY:
             self.state = GameState.PAUSED
-            self.asteroid_creator.pause_job('asteroid generator')
+            if not self.headless:
+                self.asteroid_creator.pause_job('asteroid generator')
         else:
             self.state = GameState.INPLAY
-            self.asteroid_creator.resume_job('asteroid generator')
+            if not self.headless:
+                self.asteroid_creator.resume_job('asteroid generator')
 
     def add_particle(self, particle):
         """ Adds a particle to the list of current particles. """
@@ -86,70 +250,153 @@ class Game:
         Creates an asteroid. This also seems like it should be in the entity class. As in the calculations
         could be in the Asteroid class and then we just call here asteroid.generate().
         """
-        if random.randint(0, 1) == 0:
-            start_x = random.choice([0, window.width])
-            start_y = random.randint(0, window.height)
+        min_speed = self.config.asteroid_min_speed
+        max_speed = self.config.asteroid_max_speed
+        if self.rng.randint(0, 1) == 0:
+            start_x = self.rng.choice([0, window.width])
+            start_y = self.rng.randint(0, window.height)
             if start_x == 0:
-                velocity_x = random.randint(1, 3)
+                velocity_x = self.rng.randint(min_speed, max_speed)
             else:
-                velocity_x = random.randint(-3, -1)
-            velocity_y = random.randint(-3, 3)
+                velocity_x = self.rng.randint(-max_speed, -min_speed)
+            velocity_y = self.rng.randint(-max_speed, max_speed)
         else:
-            start_x = random.randint(0, window.width)
-            start_y = random.choice([0, window.height])
+            start_x = self.rng.randint(0, window.width)
+            start_y = self.rng.choice([0, window.height])
             if start_y == 0:
-                velocity_y = random.randint(1, 3)
+                velocity_y = self.rng.randint(min_speed, max_speed)
             else:
-                velocity_y = random.randint(-3, -1)
-            velocity_x = random.randint(-3, 3)
-        self.asteroids.append(Asteroid(start_x, start_y, velocity_x, velocity_y, 15))
+                velocity_y = self.rng.randint(-max_speed, -min_speed)
+            velocity_x = self.rng.randint(-max_speed, max_speed)
+        asteroid = Asteroid.create(start_x, start_y, velocity_x, velocity_y, self.config.asteroid_size, self.rng)
+        self.world_hash.spawn(asteroid)
+        self.asteroids.append(asteroid)
 
     def out_of_window(self, asteroid,  window_width, window_height):
         """ Calculates if an asteroid is visible. """
         return (window_height + asteroid.radius < asteroid.centre_y or asteroid.centre_y < -asteroid.radius) or\
                (window_width + asteroid.radius < asteroid.centre_x or asteroid.centre_x < -asteroid.radius)
 
+    def perceive(self, particles: List[Particle], asteroids: List[Asteroid], agents: List[Agent]):
+        """
+        Give each agent a perception of the current state of the game. The perceptions of each type are created
+        together, so that what they have in common is only worked out once.
+        """
+        agents_by_perception: Dict[Type[Perception], List[Agent]] = {}
+        for agent in agents:
+            agents_by_perception.setdefault(agent.get_perception_type(), []).append(agent)
+        for perception_type, perceiving_agents in agents_by_perception.items():
+            perceptions = perception_type.perceive_all([agent.get_ship() for agent in perceiving_agents], particles,
+                                                       asteroids)
+            for agent, perception in zip(perceiving_agents, perceptions):
+                agent.perceive(perception)
+
     def entity_update(self, window_width, window_height, particles: List[Particle], asteroids: List[Asteroid],
-                      agents: List[Agent]) -> Tuple[List[Particle], List[Asteroid], List[Agent], int]:
-        """ Updates the game entity objects. This includes the particles, asteroids and the agents ships. """
-        destroyed_particles = []
-        preserved_particles = []
-        preserved_asteroids = []
+                      agents: List[Agent], decisions: List[Decision] = None
+                      ) -> Tuple[List[Particle], List[Asteroid], List[Agent], int]:
+        """
+        Updates the game entity objects. This includes the particles, asteroids and the agents ships.
+        The particle and asteroid lists are compacted in place and destroyed entities are returned to their pools.
+        """
         preserved_agents = agents
         reward = 0
-        for agent in agents:
-            agent.perceive(agent.get_perception_type()(agent.get_ship(), particles, asteroids, []))
-            self.enact_decision(agent, agent.decide())
+        telemetry = self.telemetry
+        if decisions is None:
+            self.perceive(particles, asteroids, agents)
+            if telemetry is not None:
+                telemetry.perceived()
+            decisions = decide_all(agents)
+            if telemetry is not None:
+                telemetry.decided()
+        self.decisions = decisions
+        for agent, decision in zip(agents, decisions):
+            self.enact_decision(agent, decision)
             agent.get_ship().update()
-        for asteroid in asteroids:
-            for agent in agents:
-                if self.intersecting_ship(asteroid, agent.get_ship()):
-                    preserved_agents.remove(agent)
-            destroyed_asteroid = False
-            if self.out_of_window(asteroid,  window_width, window_height):
-                destroyed_asteroid = True
-            for particle in particles:
-                if self.is_inside(particle.centre_x, particle.centre_y, asteroid):
-                    reward += 1
-                    destroyed_asteroid = True
-                    destroyed_particles.append(particle)
-            if not destroyed_asteroid:
-                preserved_asteroids.append(asteroid)
+        if self.config.max_asteroids:
+            self.enforce_cap(asteroids, self.config.max_asteroids, self.config.asteroid_overflow)
+        if self.config.max_particles:
+            self.enforce_cap(particles, self.config.max_particles, self.config.particle_overflow)
+        if telemetry is not None:
+            telemetry.moved()
+        if self.collisions is not None:
+            preserved_agents, reward = self.collisions.update(window_width, window_height, particles, asteroids,
+                                                              agents)
+            if telemetry is not None:
+                telemetry.collided()
+            return particles, asteroids, preserved_agents, reward
+        # Asteroids may be appended by the asteroid creator while updating, so only compact those present now
+        num_of_asteroids = len(asteroids)
+        present_asteroids = asteroids[:num_of_asteroids]
+        asteroid_state = np.array([(asteroid.centre_x, asteroid.centre_y, asteroid.radius)
+                                   for asteroid in present_asteroids], dtype=np.float64).reshape(-1, 3)
+        ship_hit = ship_hits(ship_vertices([agent.get_ship() for agent in agents]), asteroid_state).any(axis=1)
+        # Backwards, so that removing an agent does not skip the next one
+        for agent_index in np.flatnonzero(ship_hit)[::-1]:
+            del preserved_agents[agent_index]
+        particle_hit = point_hits(np.array([(particle.centre_x, particle.centre_y) for particle in particles],
+                                           dtype=np.float64).reshape(-1, 2), asteroid_state)
+        reward += int(particle_hit.sum())
+        for particle, hit in zip(particles, particle_hit.any(axis=1).tolist()):
+            if hit:
+                particle.destroyed = True
+        asteroid_hit = particle_hit.any(axis=0).tolist()
+        preserved = 0
+        for asteroid, hit in zip(present_asteroids, asteroid_hit):
+            if hit or self.out_of_window(asteroid, window_width, window_height):
+                asteroid.release()
+            else:
+                asteroids[preserved] = asteroid
+                preserved += 1
                 asteroid.update()
+        del asteroids[preserved:num_of_asteroids]
+        preserved = 0
         for particle in particles:
-            if particle not in destroyed_particles and\
+            if not particle.destroyed and\
                     0 < particle.centre_x < window_width and 0 < particle.centre_y < window_height:
                 particle.update()
-                preserved_particles.append(particle)
-        return preserved_particles, preserved_asteroids, preserved_agents, reward
+                particles[preserved] = particle
+                preserved += 1
+            else:
+                particle.release()
+        del particles[preserved:]
+        if telemetry is not None:
+            telemetry.collided()
+        return particles, asteroids, preserved_agents, reward
 
-    def enact_decision(self, agent: Agent, decision: Action):
+    def enforce_cap(self, entities: List, cap: int, policy: str):
+        """
+        Remove the entities over a cap, returning them to their pool.
+
+        :param entities: The asteroids or particles of the game, oldest first.
+        :param cap: The most that may be alive.
+        :param policy: Which to remove: drop_new for the newest, drop_oldest for the oldest, or error to raise.
+        :raises RuntimeError: If there are too many entities and the policy is error.
+        """
+        # Asteroids may be appended by the asteroid creator meanwhile, so only those present now are counted
+        num_of_entities = len(entities)
+        excess = num_of_entities - cap
+        if excess <= 0:
+            return
+        if policy == 'error':
+            raise RuntimeError("{} entities are alive, more than the cap of {}".format(num_of_entities, cap))
+        removed = slice(0, excess) if policy == 'drop_oldest' else slice(cap, num_of_entities)
+        for entity in entities[removed]:
+            if self.collisions is not None:
+                self.collisions.forget(entity)
+            entity.release()
+        del entities[removed]
+
+    def enact_decision(self, agent: Agent, decision: Decision):
         """
         Enact the decisions made by the agent in the order they are given.
 
         :param agent: The agent that is carrying out the action
-        :param decision: The action to enact.
+        :param decision: The action to enact, or the actions to enact in order.
         """
+        if isinstance(decision, list):
+            for action in decision:
+                self.enact_decision(agent, action)
+            return
         agent_ship = agent.get_ship()
         if decision is Action.TURNRIGHT:
             agent_ship.turn_right()
@@ -183,7 +430,7 @@ class Game:
         # Check if circle center inside the ship
         if ((v2y - v1y)*(asteroid.centre_x - v1x) - (v2x - v1x)*(asteroid.centre_y - v1y)) >= 0 and \
                 ((v3y - v2y)*(asteroid.centre_x - v2x) - (v3x - v2x)*(asteroid.centre_y - v2y)) >= 0 and \
-                ((v1y - v3y)*(asteroid.centre_x - v3x) - (v1x - v3x)*(asteroid.centre_y - v3x)) >= 0:
+                ((v1y - v3y)*(asteroid.centre_x - v3x) - (v1x - v3x)*(asteroid.centre_y - v3y)) >= 0:
             return True
         # Check if edges intersect circle
         # First edge
@@ -241,11 +488,13 @@ class Game:
 
     def start(self):
         """ Run the game. """
-        self.asteroid_creator.start()
+        if not self.headless:
+            self.asteroid_creator.start()
 
     def game_over(self):
         """ The end of the game when the player dies. """
-        self.asteroid_creator.pause()
+        if not self.headless:
+            self.asteroid_creator.pause()
         self.state = GameState.OVER
 
     def on_key_press(self, symbol, modifiers):
@@ -267,3 +516,28 @@ class Game:
         """
         for agent in self.agents:
             agent.on_key_release(symbol, modifiers)
+
+
+def update_games(games: List[Game]):
+    """
+    Update several games at once. The agents of every game in play perceive first and are then decided together,
+    so agents sharing a batched policy across games are decided in one call. Each game plays exactly as it would
+    updated on its own.
+
+    :param games: The games to update.
+    """
+    playing = [game for game in games if game.state is GameState.INPLAY]
+    agents: List[Agent] = []
+    for game in playing:
+        game.start_tick()
+        game.perceive(game.particles, game.asteroids, game.agents)
+        agents.extend(game.agents)
+    decisions = decide_all(agents)
+    start = 0
+    for game in games:
+        if game in playing:
+            end = start + len(game.agents)
+            game.finish_tick(decisions[start:end])
+            start = end
+        else:
+            game.update()
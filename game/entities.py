@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 import pyglet
 import random
 from enum import Enum
 from math import cos, sin, pi
 from abc import ABC, abstractmethod
 from time import time
+from typing import List, Callable
 
 
 class TurnState(Enum):
@@ -20,6 +23,7 @@ class BoostState(Enum):
 
 
 class Entity(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def update(self):
@@ -36,14 +40,57 @@ class Entity(ABC):
         raise NotImplementedError
 
 
-class Particle(Entity):
+class PooledEntity(Entity):
+    """
+    An entity that is recycled through a free list of released instances rather than being allocated anew,
+    so that creating and destroying many entities over a long game does not grow the allocation profile.
+    Once released an entity may be handed out again by create, so it must no longer be referenced.
+    """
+    __slots__ = ()
+    pool: List[PooledEntity] = []
+
+    @classmethod
+    def create(cls, *args):
+        """
+        Take an entity from the pool and reset it with the arguments, or construct a new one if the pool is empty.
+
+        :param args: The arguments the entity is initialised with.
+        :return: The entity.
+        """
+        try:
+            entity = cls.pool.pop()
+        except IndexError:
+            return cls(*args)
+        entity.reset(*args)
+        return entity
+
+    def release(self):
+        """ Return the entity to the pool once it has been removed from the game. """
+        self.pool.append(self)
+
+    @abstractmethod
+    def reset(self, *args):
+        """
+        Reinitialise the entity as if it had just been constructed with the arguments.
+        """
+        raise NotImplementedError
+
+
+class Particle(PooledEntity):
     """ Particles which are fired from the particle canon. """
+    __slots__ = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'destroyed')
+    pool: List[Particle] = []
 
     def __init__(self, centre_x, centre_y, velocity_x, velocity_y):
+        self.reset(centre_x, centre_y, velocity_x, velocity_y)
+
+    def reset(self, centre_x, centre_y, velocity_x, velocity_y):
+        """ Set the position and velocity of the particle. """
         self.centre_x = centre_x
         self.centre_y = centre_y
         self.velocity_x = velocity_x
         self.velocity_y = velocity_y
+        self.destroyed = False
 
     def update(self):
         """ Update the position of the particle. """
@@ -57,15 +104,20 @@ class Particle(Entity):
 
 class Ship(Entity):
     """ A ship that is in the game. """
+    __slots__ = ('facing', 'centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'height', 'turn_speed', 'turn_state',
+                 'boost_state', 'thrust', 'thrust_max', 'thrust_incr', 'particle_canon_speed', 'window_width',
+                 'window_height', 'reload_time', 'last_fire_time', 'clock')
 
-    def __init__(self, centre_x, centre_y, window):
+    def __init__(self, centre_x, centre_y, window, clock: Callable[[], float] = time):
         """
         Initialise the position, velocity, where the ship is facing, size of the ship, thrust,
          turning settings and particle canon.
 
         :param centre_x: The x coordinate of the center of the ship.
         :param centre_y: The y coordinate of the center of the ship
+        :param clock: The clock the particle canon reloads by.
         """
+        self.clock = clock
         self.facing = 0
         self.centre_x = centre_x
         self.centre_y = centre_y
@@ -82,7 +134,7 @@ class Ship(Entity):
         self.window_width = window.width
         self.window_height = window.height
         self.reload_time = 0.25
-        self.last_fire_time = time()
+        self.last_fire_time = clock()
 
     def turn_right(self):
         """ Changes the state of the ship to turn right. """
@@ -117,10 +169,10 @@ class Ship(Entity):
 
     def fire(self):
         """ Returns a particle object that is spawned from the front of the ship or None if not ready to fire. """
-        current_time = time()
+        current_time = self.clock()
         if current_time - self.last_fire_time > self.reload_time:
             self.last_fire_time = current_time
-            return Particle(
+            return Particle.create(
                 self.centre_x + (2 * self.height * cos(self.facing)),
                 self.centre_y + (2 * self.height * sin(self.facing)),
                 self.particle_canon_speed * cos(self.facing),
@@ -171,23 +223,37 @@ class Ship(Entity):
                                      )
 
 
-class Asteroid(Entity):
+class Asteroid(PooledEntity):
     """ Handles how the asteroids are being drawn and their velocity and positioning. """
+    __slots__ = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'radius', 'points', 'num_of_points')
+    pool: List[Asteroid] = []
 
-    def __init__(self, centre_x, centre_y, velocity_x, velocity_y, size):
-        """ Initialise the velocity, position and shape of the asteroid. """
+    def __init__(self, centre_x, centre_y, velocity_x, velocity_y, size, rng: random.Random = random,
+                 points: List[float] = None):
+        """ Initialise the velocity, position and shape of the asteroid, shaped using rng unless points are given. """
+        self.num_of_points = 7
+        self.points = [0.0] * (self.num_of_points * 2)
+        self.reset(centre_x, centre_y, velocity_x, velocity_y, size, rng, points)
+
+    def reset(self, centre_x, centre_y, velocity_x, velocity_y, size, rng: random.Random = random,
+              points: List[float] = None):
+        """
+        Set the velocity and position of the asteroid and reshape it, reusing its list of points.
+        The shape is given by points, the offsets of the asteroids vertices from its centre, or is random otherwise.
+        """
         self.centre_x = centre_x
         self.centre_y = centre_y
         self.velocity_x = velocity_x
         self.velocity_y = velocity_y
         self.radius = size
-        self.points = []
-        self.num_of_points = 7
+        if points is not None:
+            self.points[:] = points
+            return
         for i in range(0, self.num_of_points):
-            self.points.append(random.uniform(self.radius-(self.radius/5), self.radius+(self.radius/5))
-                               * cos(i*((2 * pi)/self.num_of_points)))
-            self.points.append(random.uniform(self.radius-(self.radius/5), self.radius+(self.radius/5))
-                               * sin(i*((2 * pi)/self.num_of_points)))
+            self.points[2*i] = (rng.uniform(self.radius-(self.radius/5), self.radius+(self.radius/5))
+                                * cos(i*((2 * pi)/self.num_of_points)))
+            self.points[2*i+1] = (rng.uniform(self.radius-(self.radius/5), self.radius+(self.radius/5))
+                                  * sin(i*((2 * pi)/self.num_of_points)))
 
     def update(self):
         """ Update the position of the asteroid. """
@@ -0,0 +1,203 @@
+import argparse
+from functools import partial
+from importlib import import_module
+from math import erf, sqrt
+from multiprocessing import Pool
+from time import perf_counter
+from typing import Dict, List, Tuple, Type, NamedTuple
+
+import numpy as np
+
+from game.agent import Agent
+from game.config import GameConfig
+from game.headless import create_game
+from game.results import ResultStore, EpisodeResult, agent_name
+from game.shared_frame import publish_game
+
+Parameters = Dict[str, float]
+
+
+class Episode(NamedTuple):
+    """ The outcome of one game. """
+    points: float
+    ticks: int
+    capped: bool
+    level: int
+    seconds: float
+
+
+class Comparison(NamedTuple):
+    """ The outcome of comparing two agents on the same seeds. """
+    pairs: int
+    mean_first: float
+    mean_second: float
+    mean_difference: float
+    half_width: float
+    significant: bool
+    ticks: int
+
+
+def play_episode(agent_type: Type[Agent], parameters: Parameters, seed: int, max_ticks: int = 20000,
+                 max_seconds: float = None, publish: str = None) -> Episode:
+    """
+    Play one headless game with an agent constructed with the parameters.
+
+    :param agent_type: The type of agent, which takes the parameters as keyword arguments after its ship.
+    :param parameters: The parameters of the agent.
+    :param seed: The seed of the game.
+    :param max_ticks: The number of ticks after which the game is stopped if still in play.
+    :param max_seconds: The time after which the game is stopped if still in play, if any.
+    :param publish: A name to publish the game under every tick, for game.viewer to watch, if any.
+    :return: The points scored, the ticks played, whether the game was stopped by a cap, the level reached and the
+     seconds it took.
+    """
+    game = create_game([partial(agent_type, **parameters)], seed)
+    publisher = publish_game(game, publish) if publish is not None else None
+    start = perf_counter()
+    deadline = start + max_seconds if max_seconds is not None else None
+    done = False
+    try:
+        while not done and game.ticks < max_ticks and (deadline is None or perf_counter() < deadline):
+            _, done, _ = game.step()
+    finally:
+        if publisher is not None:
+            publisher.close()
+    return Episode(float(game.points), game.ticks, not done, game.level, perf_counter() - start)
+
+
+def store_episode(store: ResultStore, agent_type: Type[Agent], parameters: Parameters, seed: int, episode: Episode):
+    """
+    Add an episode played by play_episode, with the default config, to a result store.
+
+    :param store: The store.
+    :param agent_type: The type of agent that played.
+    :param parameters: The parameters of the agent.
+    :param seed: The seed of the game.
+    :param episode: The episode.
+    """
+    store.add(EpisodeResult(agent_name(agent_type), parameters, GameConfig().to_dict(), seed, episode.points,
+                            episode.ticks, episode.level, not episode.capped, episode.seconds))
+
+
+def _play_task(task: Tuple) -> Episode:
+    """ Play an episode of a task in a process of the pool. """
+    return play_episode(*task)
+
+
+def import_agent(path: str) -> Type[Agent]:
+    """
+    :param path: The module and name of an agent class, e.g. agents.reactive_agent.ReactiveAgent.
+    :return: The agent class.
+    """
+    module_name, class_name = path.rsplit(".", 1)
+    return getattr(import_module(module_name), class_name)
+
+
+def normal_quantile(probability: float) -> float:
+    """
+    :return: The value below which the probability of a standard normal variable falls, found by bisection.
+    """
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + erf(middle / sqrt(2))) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def look_sizes(min_pairs: int, max_pairs: int) -> List[int]:
+    """
+    :return: The numbers of pairs after which the results are looked at, doubling from min_pairs up to max_pairs.
+    """
+    sizes = [min_pairs]
+    while sizes[-1] < max_pairs:
+        sizes.append(min(sizes[-1] * 2, max_pairs))
+    return sizes
+
+
+def compare(first: Type[Agent], second: Type[Agent], first_parameters: Parameters = None,
+            second_parameters: Parameters = None, target_half_width: float = 1.0, alpha: float = 0.05,
+            min_pairs: int = 16, max_pairs: int = 1024, max_ticks: int = 20000, max_seconds: float = None,
+            seed: int = 0, processes: int = None, store: ResultStore = None, publish: str = None) -> Comparison:
+    """
+    Compare the points of two agents, playing both on the same seeds so the difference between their games is
+    not swamped by the difference between the games. The results are looked at after a number of pairs that
+    doubles each time, and the comparison stops as soon as the confidence interval of the mean difference
+    excludes zero or is narrower than the target. The confidence is split evenly between the looks, so stopping
+    early does not overstate it.
+
+    :param first: The first type of agent.
+    :param second: The second type of agent.
+    :param first_parameters: The parameters of the first agent.
+    :param second_parameters: The parameters of the second agent.
+    :param target_half_width: The half width of the confidence interval of the mean difference to stop at.
+    :param alpha: The chance of the interval not containing the true mean difference.
+    :param min_pairs: The number of pairs played before the first look.
+    :param max_pairs: The most pairs played.
+    :param max_ticks: The number of ticks after which a game is stopped if still in play.
+    :param max_seconds: The time after which a game is stopped if still in play, if any.
+    :param seed: The first seed played.
+    :param processes: The number of processes, defaulting to the number of cores.
+    :param store: A store to add the result of every game to, if any.
+    :param publish: A name to publish the first game of the first agent under, for game.viewer to watch, if any.
+    :return: The comparison, where the difference is the points of the first agent minus those of the second.
+    """
+    sizes = look_sizes(min_pairs, max_pairs)
+    z = normal_quantile(1 - alpha / (2 * len(sizes)))
+    differences: List[float] = []
+    points = {0: [], 1: []}
+    ticks = 0
+    with Pool(processes) as pool:
+        for size in sizes:
+            seeds = range(seed + len(differences), seed + size)
+            tasks = [(agent_type, parameters or {}, game_seed, max_ticks, max_seconds,
+                      publish if game_seed == seed and index == 0 else None) for game_seed in seeds
+                     for index, (agent_type, parameters) in enumerate(((first, first_parameters),
+                                                                       (second, second_parameters)))]
+            episodes = pool.map(_play_task, tasks)
+            if store is not None:
+                for (agent_type, parameters, game_seed, _, _, _), episode in zip(tasks, episodes):
+                    store_episode(store, agent_type, parameters, game_seed, episode)
+            for first_episode, second_episode in zip(episodes[::2], episodes[1::2]):
+                points[0].append(first_episode.points)
+                points[1].append(second_episode.points)
+                differences.append(first_episode.points - second_episode.points)
+                ticks += first_episode.ticks + second_episode.ticks
+            mean = float(np.mean(differences))
+            half_width = z * float(np.std(differences, ddof=1)) / sqrt(len(differences))
+            significant = abs(mean) > half_width
+            if significant or half_width <= target_half_width:
+                break
+    return Comparison(len(differences), float(np.mean(points[0])), float(np.mean(points[1])), mean, half_width,
+                      significant, ticks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two agents on the same seeded headless games, stopping "
+                                                 "once the difference is known well enough.")
+    parser.add_argument("first", help="the module and name of the first agent class")
+    parser.add_argument("second", help="the module and name of the second agent class")
+    parser.add_argument("--half-width", type=float, default=1.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--min-pairs", type=int, default=16)
+    parser.add_argument("--max-pairs", type=int, default=1024)
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--results", default=None, help="an SQLite database to add the result of every game to")
+    parser.add_argument("--publish", default=None, metavar="NAME",
+                        help="publish the first game of the first agent under NAME, to watch with game.viewer")
+    arguments = parser.parse_args()
+    result_store = ResultStore(arguments.results) if arguments.results else None
+    result = compare(import_agent(arguments.first), import_agent(arguments.second),
+                     target_half_width=arguments.half_width, alpha=arguments.alpha, min_pairs=arguments.min_pairs,
+                     max_pairs=arguments.max_pairs, max_ticks=arguments.max_ticks, max_seconds=arguments.max_seconds,
+                     seed=arguments.seed, processes=arguments.processes, store=result_store, publish=arguments.publish)
+    if result_store is not None:
+        result_store.close()
+    print("{} pairs: {:.2f} vs {:.2f} points, difference {:.2f} +/- {:.2f}{}".format(
+        result.pairs, result.mean_first, result.mean_second, result.mean_difference, result.half_width,
+        " (significant)" if result.significant else ""))
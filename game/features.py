@@ -0,0 +1,331 @@
+from typing import List, Tuple, Sequence, Dict
+
+import numpy as np
+
+from game.control import Game
+from game.perception import VectorPerception
+
+# The columns of the ship arrays that pipelines take
+SHIP_COLUMNS = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'facing')
+
+
+class Pairs:
+    """
+    Every pairing of a ship with an entity in its game, with the entity as seen from the ship, which the transforms
+    of a pipeline change in turn.
+    """
+
+    def __init__(self, ships: np.ndarray, entities: np.ndarray, ship_index: np.ndarray, entity_index: np.ndarray,
+                 offsets: np.ndarray = None, velocities: np.ndarray = None):
+        """
+        :param ships: The ships, with a row of the SHIP_COLUMNS of each.
+        :param entities: The entities, with a row of the centre, velocity and any further values of each.
+        :param ship_index: The ship of each pair.
+        :param entity_index: The entity of each pair.
+        :param offsets: An array of shape (number of pairs, 2) to hold the offsets, rather than allocating one.
+        :param velocities: An array of shape (number of pairs, 2) to hold the velocities, rather than allocating one.
+        """
+        self.ships = ships
+        self.entities = entities
+        self.ship_index = ship_index
+        self.entity_index = entity_index
+        if offsets is None:
+            offsets = np.empty((len(entity_index), 2), dtype=np.float64)
+        if velocities is None:
+            velocities = np.empty((len(entity_index), 2), dtype=np.float64)
+        # The velocities hold the centres of the ships until the offsets are worked out
+        np.take(entities[:, :2], entity_index, axis=0, out=offsets, mode='clip')
+        np.subtract(offsets, np.take(ships[:, :2], ship_index, axis=0, out=velocities, mode='clip'), out=offsets)
+        np.take(entities[:, 2:4], entity_index, axis=0, out=velocities, mode='clip')
+        self.offsets = offsets
+        self.velocities = velocities
+        self.rotated = False
+
+
+class Transform:
+    """ A step of a feature pipeline, which may change the pairs and may write columns of features. """
+    # The number of columns of features the transform writes
+    width = 0
+
+    def apply(self, pairs: Pairs):
+        """
+        Change the pairs.
+
+        :param pairs: The pairs.
+        """
+        pass
+
+    def write(self, pairs: Pairs, out: np.ndarray):
+        """
+        Write the columns of the transform.
+
+        :param pairs: The pairs.
+        :param out: The columns to write, of shape (number of pairs, width).
+        """
+        pass
+
+
+class RelativeVelocity(Transform):
+    """ Make the velocity of each entity relative to the ship. """
+
+    def apply(self, pairs: Pairs):
+        if pairs.rotated:
+            raise ValueError("Velocities must be made relative before they are rotated")
+        pairs.velocities -= pairs.ships[pairs.ship_index, 2:4]
+
+
+class Wrap(Transform):
+    """
+    Take the offset of each entity from the ship the shortest way round the screen, which the ship wraps around
+    with a margin either side.
+    """
+
+    def __init__(self, width: float, height: float, margin: float = 10):
+        """
+        :param width: The width of the game.
+        :param height: The height of the game.
+        :param margin: How far past each edge the ship goes before it wraps to the other side.
+        """
+        self.period = np.array([width + 2 * margin, height + 2 * margin], dtype=np.float64)
+
+    def apply(self, pairs: Pairs):
+        if pairs.rotated:
+            raise ValueError("Offsets must be wrapped before they are rotated")
+        pairs.offsets += self.period / 2
+        np.mod(pairs.offsets, self.period, out=pairs.offsets)
+        pairs.offsets -= self.period / 2
+
+
+class RotateToFacing(Transform):
+    """ Rotate the offsets and velocities into the frame of the ship, x being ahead of it and y to its left. """
+
+    def apply(self, pairs: Pairs):
+        facings = pairs.ships[pairs.ship_index, 4]
+        cosines, sines = np.cos(facings), np.sin(facings)
+        for vectors in (pairs.offsets, pairs.velocities):
+            x = vectors[:, 0].copy()
+            vectors[:, 0] = x * cosines + vectors[:, 1] * sines
+            vectors[:, 1] = vectors[:, 1] * cosines - x * sines
+        pairs.rotated = True
+
+
+class Offset(Transform):
+    """ Write the offset of the entity from the ship. """
+    width = 2
+
+    def write(self, pairs: Pairs, out: np.ndarray):
+        out[:] = pairs.offsets
+
+
+class Velocity(Transform):
+    """ Write the velocity of the entity. """
+    width = 2
+
+    def write(self, pairs: Pairs, out: np.ndarray):
+        out[:] = pairs.velocities
+
+
+class Distance(Transform):
+    """ Write the distance of the entity from the ship. """
+    width = 1
+
+    def write(self, pairs: Pairs, out: np.ndarray):
+        out[:, 0] = np.hypot(pairs.offsets[:, 0], pairs.offsets[:, 1])
+
+
+class Column(Transform):
+    """ Write a column of the entities as it is, e.g. the radius of asteroids. """
+    width = 1
+
+    def __init__(self, index: int):
+        """
+        :param index: The column of the entity arrays, e.g. 4 for the radius of asteroids.
+        """
+        self.index = index
+
+    def write(self, pairs: Pairs, out: np.ndarray):
+        out[:, 0] = pairs.entities[pairs.entity_index, self.index]
+
+
+class FeaturePipeline:
+    """
+    Turns the ships and entities of any number of games into fixed size features for learning agents. The
+    transforms are applied in order to every pairing of a ship with an entity of its game at once, the entities of
+    each ship are sorted nearest first and the nearest top_k are written to buffers that are allocated once and
+    reused, padded with zeros where a ship has fewer entities. The offsets, velocities and values of the pairs are
+    worked out in scratch buffers that are also reused, growing when there are more pairs than ever before; only
+    the indices of the pairs and the temporaries of the transforms are allocated on each call.
+    For example the nearest 8 asteroids around each ship, wrapped and rotated into its frame, with their radii:
+        FeaturePipeline([Wrap(640, 480), RelativeVelocity(), RotateToFacing(), Offset(), Velocity(), Column(4)], 8)
+    """
+
+    def __init__(self, transforms: Sequence[Transform], top_k: int, max_ships: int = 64, dtype=np.float32):
+        """
+        Lay out the columns of the features and allocate the buffers.
+
+        :param transforms: The transforms, in the order they are applied.
+        :param top_k: The number of entities of each ship to keep.
+        :param max_ships: The number of ships to allocate buffers for, which grow if more are given.
+        :param dtype: The type of the features.
+        """
+        self.transforms = list(transforms)
+        self.top_k = top_k
+        self.columns: List[slice] = []
+        width = 0
+        for transform in self.transforms:
+            self.columns.append(slice(width, width + transform.width))
+            width += transform.width
+        self.width = width
+        self.dtype = dtype
+        self.allocate(max_ships)
+        self.pair_offsets = np.empty((0, 2), dtype=np.float64)
+        self.pair_velocities = np.empty((0, 2), dtype=np.float64)
+        self.pair_values = np.empty((0, width), dtype=np.float64)
+
+    def allocate(self, max_ships: int):
+        """
+        :param max_ships: The number of ships to allocate buffers for.
+        """
+        self.features = np.zeros((max_ships, self.top_k, self.width), dtype=self.dtype)
+        self.mask = np.zeros((max_ships, self.top_k), dtype=bool)
+
+    def allocate_pairs(self, num_of_pairs: int):
+        """
+        :param num_of_pairs: The number of pairs to allocate scratch buffers for.
+        """
+        self.pair_offsets = np.empty((num_of_pairs, 2), dtype=np.float64)
+        self.pair_velocities = np.empty((num_of_pairs, 2), dtype=np.float64)
+        self.pair_values = np.empty((num_of_pairs, self.width), dtype=np.float64)
+
+    def transform(self, ships: np.ndarray, entities: np.ndarray, entity_offsets: np.ndarray = None,
+                  ship_games: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the features of many ships, which may be from several games.
+
+        :param ships: The ships, with a row of the SHIP_COLUMNS of each.
+        :param entities: The entities of every game one after another, with a row of the centre_x, centre_y,
+         velocity_x, velocity_y and any further values of each, e.g. the asteroid_array of a perception.
+        :param entity_offsets: Where the entities of each game start, and after them the number of entities, if
+         there is more than one game.
+        :param ship_games: The game of each ship, if there is more than one game.
+        :return: The features, of shape (number of ships, top_k, width), and a mask of shape (number of ships,
+         top_k) of which rows are entities rather than padding. These are views of the buffers of the pipeline, so
+         they are overwritten by the next call.
+        :raises ValueError: If only one of entity_offsets and ship_games is given.
+        """
+        if (entity_offsets is None) != (ship_games is None):
+            raise ValueError("entity_offsets and ship_games must be given together")
+        num_of_ships = len(ships)
+        if num_of_ships > len(self.features):
+            self.allocate(max(num_of_ships, 2 * len(self.features)))
+        if entity_offsets is None:
+            entity_offsets = np.array([0, len(entities)])
+            ship_games = np.zeros(num_of_ships, dtype=np.int64)
+        starts = entity_offsets[ship_games]
+        counts = entity_offsets[ship_games + 1] - starts
+        # The index of the first pair of each ship, and of the ship and entity of each pair
+        firsts = np.cumsum(counts) - counts
+        ship_index = np.repeat(np.arange(num_of_ships), counts)
+        ranks = np.arange(len(ship_index)) - firsts[ship_index]
+        num_of_pairs = len(ship_index)
+        if num_of_pairs > len(self.pair_values):
+            self.allocate_pairs(max(num_of_pairs, 2 * len(self.pair_values)))
+        pairs = Pairs(np.asarray(ships, dtype=np.float64), np.asarray(entities, dtype=np.float64), ship_index,
+                      starts[ship_index] + ranks, self.pair_offsets[:num_of_pairs],
+                      self.pair_velocities[:num_of_pairs])
+        values = self.pair_values[:num_of_pairs]
+        for transform, columns in zip(self.transforms, self.columns):
+            transform.apply(pairs)
+            transform.write(pairs, values[:, columns])
+        # Nearest first within each ship, which stay in order of ship
+        order = np.lexsort((np.hypot(pairs.offsets[:, 0], pairs.offsets[:, 1]), ship_index))
+        kept = ranks < self.top_k
+        features = self.features[:num_of_ships]
+        mask = self.mask[:num_of_ships]
+        features.fill(0)
+        mask.fill(False)
+        features[ship_index[kept], ranks[kept]] = values[order[kept]]
+        mask[ship_index[kept], ranks[kept]] = True
+        return features, mask
+
+    def observe_games(self, games: List[Game], particles: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the features of every ship of the games.
+
+        :param games: The games.
+        :param particles: Whether the entities are the particles of the games rather than the asteroids.
+        :return: The features and mask, in the order of the agents of each game in turn.
+        """
+        return self.transform(*game_arrays(games, particles))
+
+    def observe_perceptions(self, perceptions: List[VectorPerception], particles: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the features of the ships of vector perceptions, e.g. the observations of a batch policy.
+
+        :param perceptions: The perceptions, which may be of several games.
+        :param particles: Whether the entities are the particles rather than the asteroids.
+        :return: The features and mask, in the order of the perceptions.
+        """
+        return self.transform(*perception_arrays(perceptions, particles))
+
+
+def stack_entities(entity_arrays: List[np.ndarray], columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :param entity_arrays: The entities of each game.
+    :param columns: The number of columns of an entity.
+    :return: The entities of every game one after another and where those of each game start.
+    """
+    offsets = np.cumsum([0] + [len(entities) for entities in entity_arrays])
+    stacked = np.concatenate(entity_arrays) if entity_arrays else np.empty((0, columns))
+    return stacked, offsets
+
+
+def game_arrays(games: List[Game], particles: bool = False) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param games: The games.
+    :param particles: Whether the entities are the particles of the games rather than the asteroids.
+    :return: The ships, entities, entity offsets and ship games of the games, to be given to a pipeline.
+    """
+    ships: List[Tuple[float, ...]] = []
+    ship_games: List[int] = []
+    entity_arrays = []
+    for index, game in enumerate(games):
+        for agent in game.agents:
+            ship = agent.get_ship()
+            ships.append((ship.centre_x, ship.centre_y, ship.velocity_x, ship.velocity_y, ship.facing))
+            ship_games.append(index)
+        if particles:
+            entity_arrays.append(np.array([(particle.centre_x, particle.centre_y, particle.velocity_x,
+                                            particle.velocity_y) for particle in game.particles],
+                                          dtype=np.float64).reshape(-1, 4))
+        else:
+            entity_arrays.append(np.array([(asteroid.centre_x, asteroid.centre_y, asteroid.velocity_x,
+                                            asteroid.velocity_y, asteroid.radius) for asteroid in game.asteroids],
+                                          dtype=np.float64).reshape(-1, 5))
+    entities, offsets = stack_entities(entity_arrays, 4 if particles else 5)
+    return (np.array(ships, dtype=np.float64).reshape(-1, 5), entities, offsets,
+            np.array(ship_games, dtype=np.int64))
+
+
+def perception_arrays(perceptions: List[VectorPerception], particles: bool = False) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param perceptions: The perceptions, those of the same tick of a game sharing the arrays of their world.
+    :param particles: Whether the entities are the particles rather than the asteroids.
+    :return: The ships, entities, entity offsets and ship games of the perceptions, to be given to a pipeline.
+    """
+    worlds: Dict[int, int] = {}
+    entity_arrays = []
+    ship_games = []
+    for perception in perceptions:
+        world = perception.world
+        if id(world) not in worlds:
+            worlds[id(world)] = len(entity_arrays)
+            entity_arrays.append(world.particle_array if particles else world.asteroid_array)
+        ship_games.append(worlds[id(world)])
+    ships = np.array([[perception.ship_state[column] for column in SHIP_COLUMNS] for perception in perceptions],
+                     dtype=np.float64).reshape(-1, 5)
+    entities, offsets = stack_entities(entity_arrays, 4 if particles else 5)
+    return ships, entities, offsets, np.array(ship_games, dtype=np.int64)
@@ -0,0 +1,35 @@
+from typing import List, Type
+
+from game.agent import Agent
+from game.config import GameConfig
+from game.control import Game
+from game.entities import Ship
+
+
+class HeadlessWindow:
+    """ The size of a game that is run without a window, standing in for the window the game is created with. """
+
+    def __init__(self, width: int = 640, height: int = 480):
+        """
+        :param width: The width of the game.
+        :param height: The height of the game.
+        """
+        self.width = width
+        self.height = height
+
+
+def create_game(agent_types: List[Type[Agent]], seed: int = None, width: int = 640, height: int = 480,
+                config: GameConfig = None) -> Game:
+    """
+    Create a headless game with a ship in the middle of the game for each of the agents.
+
+    :param agent_types: The types of agent to play the game.
+    :param seed: The seed of the game.
+    :param width: The width of the game.
+    :param height: The height of the game.
+    :param config: The constants of the game, the defaults if not given.
+    :return: The game.
+    """
+    window = HeadlessWindow(width, height)
+    agents = [agent_type(Ship(width // 2, height // 2, window)) for agent_type in agent_types]
+    return Game(window, agents, seed=seed, headless=True, config=config)
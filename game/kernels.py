@@ -0,0 +1,186 @@
+import os
+from math import sqrt
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# The backend used for the kernels, numba when it is installed unless ASTEROIDS_KERNELS=numpy is set
+BACKEND = 'numba' if numba is not None and os.environ.get('ASTEROIDS_KERNELS', 'numba') == 'numba' else 'numpy'
+
+
+def _ship_hits_loop(vertices: np.ndarray, asteroids: np.ndarray, hits: np.ndarray):
+    """
+    The collision test of Game.intersecting_ship for every ship and asteroid, written as plain loops so that numba
+    can compile it.
+
+    :param vertices: The vertices of the ships, of shape (number of ships, 3, 2).
+    :param asteroids: The centre_x, centre_y and radius of each asteroid, of shape (number of asteroids, 3).
+    :param hits: The array of shape (number of ships, number of asteroids) to set to whether each pair collide.
+    """
+    for ship in range(vertices.shape[0]):
+        for asteroid in range(asteroids.shape[0]):
+            centre_x = asteroids[asteroid, 0]
+            centre_y = asteroids[asteroid, 1]
+            radius = asteroids[asteroid, 2]
+            hit = False
+            # The vertices of the ship inside the asteroid
+            for vertex in range(3):
+                x = vertices[ship, vertex, 0]
+                y = vertices[ship, vertex, 1]
+                if (x - centre_x) * (x - centre_x) + (y - centre_y) * (y - centre_y) <= radius * radius:
+                    hit = True
+            # The centre of the asteroid inside the ship
+            if not hit:
+                inside = True
+                for vertex in range(3):
+                    start_x = vertices[ship, vertex, 0]
+                    start_y = vertices[ship, vertex, 1]
+                    end_x = vertices[ship, (vertex + 1) % 3, 0]
+                    end_y = vertices[ship, (vertex + 1) % 3, 1]
+                    if (end_y - start_y) * (centre_x - start_x) - (end_x - start_x) * (centre_y - start_y) < 0:
+                        inside = False
+                hit = inside
+            # The edges of the ship crossing the asteroid
+            for vertex in range(3):
+                if hit:
+                    break
+                to_centre_x = centre_x - vertices[ship, vertex, 0]
+                to_centre_y = centre_y - vertices[ship, vertex, 1]
+                edge_x = vertices[ship, (vertex + 1) % 3, 0] - vertices[ship, vertex, 0]
+                edge_y = vertices[ship, (vertex + 1) % 3, 1] - vertices[ship, vertex, 1]
+                k = to_centre_x * edge_x + to_centre_y * edge_y
+                if k > 0:
+                    length = sqrt(edge_x * edge_x + edge_y * edge_y)
+                    k = k / length
+                    if k < length:
+                        if sqrt(max(to_centre_x * to_centre_x + to_centre_y * to_centre_y - k * k, 0.0)) <= radius:
+                            hit = True
+            hits[ship, asteroid] = hit
+
+
+def _ship_hits_numpy(vertices: np.ndarray, asteroids: np.ndarray, hits: np.ndarray):
+    """ The same as _ship_hits_loop, working on every pair at once. """
+    xs = vertices[:, :, 0][:, :, None]
+    ys = vertices[:, :, 1][:, :, None]
+    centre_x = asteroids[None, None, :, 0]
+    centre_y = asteroids[None, None, :, 1]
+    radius = asteroids[None, :, 2]
+    vertex_inside = ((xs - centre_x) * (xs - centre_x) + (ys - centre_y) * (ys - centre_y) <=
+                     asteroids[None, None, :, 2] * asteroids[None, None, :, 2]).any(axis=1)
+    end_xs = np.roll(xs, -1, axis=1)
+    end_ys = np.roll(ys, -1, axis=1)
+    centre_inside = ((end_ys - ys) * (centre_x - xs) - (end_xs - xs) * (centre_y - ys) >= 0).all(axis=1)
+    to_centre_x = centre_x - xs
+    to_centre_y = centre_y - ys
+    edge_x = end_xs - xs
+    edge_y = end_ys - ys
+    k = to_centre_x * edge_x + to_centre_y * edge_y
+    length = np.sqrt(edge_x * edge_x + edge_y * edge_y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        projection = k / length
+        distance = np.sqrt(np.maximum(to_centre_x * to_centre_x + to_centre_y * to_centre_y -
+                                      projection * projection, 0.0))
+    edge_crossing = ((k > 0) & (projection < length) & (distance <= radius[:, None, :])).any(axis=1)
+    np.logical_or(vertex_inside | centre_inside, edge_crossing, out=hits)
+
+
+def _point_hits_loop(points: np.ndarray, asteroids: np.ndarray, hits: np.ndarray):
+    """
+    The test of Game.is_inside for every point and asteroid, written as plain loops so that numba can compile it.
+
+    :param points: The x and y coordinates of each point, of shape (number of points, 2).
+    :param asteroids: The centre_x, centre_y and radius of each asteroid, of shape (number of asteroids, 3).
+    :param hits: The array of shape (number of points, number of asteroids) to set to whether each point is inside.
+    """
+    for point in range(points.shape[0]):
+        x = points[point, 0]
+        y = points[point, 1]
+        for asteroid in range(asteroids.shape[0]):
+            centre_x = asteroids[asteroid, 0]
+            centre_y = asteroids[asteroid, 1]
+            radius = asteroids[asteroid, 2]
+            hits[point, asteroid] = (x - centre_x) * (x - centre_x) + (y - centre_y) * (y - centre_y) <= \
+                radius * radius
+
+
+def _point_hits_numpy(points: np.ndarray, asteroids: np.ndarray, hits: np.ndarray):
+    """ The same as _point_hits_loop, working on every pair at once. """
+    offsets_x = points[:, 0, None] - asteroids[None, :, 0]
+    offsets_y = points[:, 1, None] - asteroids[None, :, 1]
+    np.less_equal(offsets_x * offsets_x + offsets_y * offsets_y, asteroids[None, :, 2] * asteroids[None, :, 2],
+                  out=hits)
+
+
+if BACKEND == 'numba':
+    _ship_hits = numba.njit(cache=True)(_ship_hits_loop)
+    _point_hits = numba.njit(cache=True)(_point_hits_loop)
+else:
+    _ship_hits = _ship_hits_numpy
+    _point_hits = _point_hits_numpy
+
+
+def ship_hits(vertices: np.ndarray, asteroids: np.ndarray) -> np.ndarray:
+    """
+    Test every ship against every asteroid exactly as Game.intersecting_ship does.
+
+    :param vertices: The vertices of the ships as drawn, of shape (number of ships, 3, 2).
+    :param asteroids: The centre_x, centre_y and radius of each asteroid, of shape (number of asteroids, 3).
+    :return: Whether each ship and asteroid collide, of shape (number of ships, number of asteroids).
+    """
+    hits = np.zeros((len(vertices), len(asteroids)), dtype=np.bool_)
+    if hits.size:
+        _ship_hits(np.ascontiguousarray(vertices, dtype=np.float64), np.ascontiguousarray(asteroids, np.float64),
+                   hits)
+    return hits
+
+
+def point_hits(points: np.ndarray, asteroids: np.ndarray) -> np.ndarray:
+    """
+    Test every point against every asteroid exactly as Game.is_inside does.
+
+    :param points: The x and y coordinates of each point, of shape (number of points, 2).
+    :param asteroids: The centre_x, centre_y and radius of each asteroid, of shape (number of asteroids, 3).
+    :return: Whether each point is inside each asteroid, of shape (number of points, number of asteroids).
+    """
+    hits = np.zeros((len(points), len(asteroids)), dtype=np.bool_)
+    if hits.size:
+        _point_hits(np.ascontiguousarray(points, dtype=np.float64), np.ascontiguousarray(asteroids, np.float64),
+                    hits)
+    return hits
+
+
+def compare_backends(trials: int = 1000, seed: int = 0) -> int:
+    """
+    Check that the numpy and loop forms of the kernels, and the numba form when installed, agree on random
+    ships, points and asteroids placed close enough to often touch.
+
+    :param trials: The number of random scenes to check.
+    :param seed: The seed of the scenes.
+    :return: The number of scenes in which the backends disagree.
+    """
+    rng = np.random.default_rng(seed)
+    disagreements = 0
+    for _ in range(trials):
+        vertices = np.trunc(rng.uniform(0, 100, (4, 1, 2)) + rng.uniform(-20, 20, (4, 3, 2)))
+        points = rng.uniform(0, 100, (8, 2))
+        asteroids = np.column_stack((rng.uniform(0, 100, (16, 2)), rng.uniform(5, 40, 16)))
+        results = []
+        for ship_kernel, point_kernel in ((_ship_hits_numpy, _point_hits_numpy), (_ship_hits_loop, _point_hits_loop),
+                                          (_ship_hits, _point_hits)):
+            ships = np.zeros((len(vertices), len(asteroids)), dtype=np.bool_)
+            inside = np.zeros((len(points), len(asteroids)), dtype=np.bool_)
+            ship_kernel(vertices, asteroids, ships)
+            point_kernel(points, asteroids, inside)
+            results.append((ships, inside))
+        if any(not (np.array_equal(ships, results[0][0]) and np.array_equal(inside, results[0][1]))
+               for ships, inside in results[1:]):
+            disagreements += 1
+    return disagreements
+
+
+if __name__ == "__main__":
+    print("Backend {}, {} disagreements".format(BACKEND, compare_backends()))
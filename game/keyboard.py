@@ -0,0 +1,170 @@
+from time import perf_counter
+from typing import List, Tuple, Dict, Callable
+
+import numpy as np
+
+# A key event: the time it arrived, the key and whether it was pressed rather than released
+KeyEvent = Tuple[float, int, bool]
+
+
+class KeyEventBuffer:
+    """
+    A fixed size ring buffer of timestamped key events, filled as the window receives them and emptied once per tick.
+    If it fills up between ticks the oldest events are overwritten and counted as dropped.
+    """
+
+    def __init__(self, capacity: int = 256, clock: Callable[[], float] = perf_counter):
+        """
+        :param capacity: The number of events held between ticks.
+        :param clock: The clock events are timestamped with, in seconds.
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.times = [0.0] * capacity
+        self.symbols = [0] * capacity
+        self.pressed = [False] * capacity
+        self.start = 0
+        self.count = 0
+        self.dropped = 0
+
+    def push(self, symbol: int, pressed: bool):
+        """
+        Add an event stamped with the time now.
+
+        :param symbol: The key.
+        :param pressed: Whether the key was pressed rather than released.
+        """
+        index = (self.start + self.count) % self.capacity
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.dropped += 1
+        else:
+            self.count += 1
+        self.times[index] = self.clock()
+        self.symbols[index] = symbol
+        self.pressed[index] = pressed
+
+    def drain(self) -> List[KeyEvent]:
+        """
+        :return: The events since the last drain, oldest first.
+        """
+        events = []
+        for offset in range(self.count):
+            index = (self.start + offset) % self.capacity
+            events.append((self.times[index], self.symbols[index], self.pressed[index]))
+        self.start = (self.start + self.count) % self.capacity
+        self.count = 0
+        return events
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class LatencyStats:
+    """ The delays from key events to the ticks that enact them, keeping the most recent in a ring buffer. """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        :param capacity: The number of recent delays kept for percentiles.
+        """
+        self.recent = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self.maximum = 0.0
+
+    def add(self, seconds: float):
+        """
+        :param seconds: The delay of an event.
+        """
+        self.recent[self.count % len(self.recent)] = seconds
+        self.count += 1
+        self.maximum = max(self.maximum, seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        :return: The number of events, the mean, median and 95th percentile of the recent delays and the largest
+         delay, in milliseconds.
+        """
+        if self.count == 0:
+            return {'events': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        recent = self.recent[:min(self.count, len(self.recent))] * 1000
+        return {'events': self.count, 'mean_ms': float(recent.mean()), 'p50_ms': float(np.percentile(recent, 50)),
+                'p95_ms': float(np.percentile(recent, 95)), 'max_ms': self.maximum * 1000}
+
+
+class Keyboard:
+    """
+    The keys held down, brought up to date once per tick from a buffer of key events. A key pressed and released
+    within one tick still counts as held for that tick, its release being applied in the next, so that a quick tap
+    has an effect.
+    """
+
+    def __init__(self, capacity: int = 256, clock: Callable[[], float] = perf_counter):
+        """
+        :param capacity: The number of events held between ticks.
+        :param clock: The clock events are timestamped with, in seconds.
+        """
+        self.events = KeyEventBuffer(capacity, clock)
+        self.latency = LatencyStats()
+        # When each held key was pressed, in the order they were pressed
+        self.held: Dict[int, float] = {}
+        self.deferred: List[KeyEvent] = []
+        self.pressed: List[KeyEvent] = []
+
+    def on_key_press(self, symbol, modifiers):
+        """
+        Record a key press, so the keyboard can be pushed onto a window as an event handler.
+
+        :param symbol: The key pressed.
+        :param modifiers: ?
+        """
+        self.events.push(symbol, True)
+
+    def on_key_release(self, symbol, modifiers):
+        """
+        Record a key release.
+
+        :param symbol: The key released.
+        :param modifiers: ?
+        """
+        self.events.push(symbol, False)
+
+    def tick(self) -> List[KeyEvent]:
+        """
+        Apply the events since the last tick to the keys held, recording the delay of each from when it arrived.
+
+        :return: The presses in this tick.
+        """
+        now = self.events.clock()
+        events = self.deferred + self.events.drain()
+        self.deferred = []
+        self.pressed = []
+        for event in events:
+            time, symbol, pressed = event
+            if pressed:
+                # Pressed again after a release that was put off, which is then superseded
+                self.deferred = [deferred for deferred in self.deferred if deferred[1] != symbol]
+                self.held.pop(symbol, None)
+                self.held[symbol] = time
+                self.pressed.append(event)
+            elif any(press_symbol == symbol for _, press_symbol, _ in self.pressed):
+                self.deferred.append(event)
+                continue
+            else:
+                self.held.pop(symbol, None)
+            self.latency.add(now - time)
+        return self.pressed
+
+    def is_held(self, symbol: int) -> bool:
+        """
+        :param symbol: The key.
+        :return: Whether the key was held in this tick.
+        """
+        return symbol in self.held
+
+    def last_held(self, *symbols: int):
+        """
+        :param symbols: The keys.
+        :return: Whichever of the keys held was pressed most recently, or None if none of them are held.
+        """
+        held = [symbol for symbol in symbols if symbol in self.held]
+        return max(held, key=self.held.__getitem__) if held else None
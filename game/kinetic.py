@@ -0,0 +1,251 @@
+from heapq import heappush, heappop
+from math import ceil, inf
+from typing import List, Tuple, Dict, Set
+
+import numpy as np
+
+from game.agent import Agent
+from game.entities import Asteroid, Particle, Ship
+
+
+PARTICLE_ASTEROID = 0
+SHIP_ASTEROID = 1
+ASTEROID_EXIT = 2
+PARTICLE_EXIT = 3
+
+# Extra reach given to predicted contacts, so rounding in the per tick integration can not make one be missed
+SLACK = 1e-6
+
+
+def contact_windows(positions_a: np.ndarray, velocities_a: np.ndarray, positions_b: np.ndarray,
+                    velocities_b: np.ndarray, reach: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the ticks during which each pair of linearly moving bodies a and b are within reach of each other.
+
+    :param positions_a: The positions of the bodies a, of shape (n, 2).
+    :param velocities_a: The velocities of the bodies a per tick, of shape (n, 2).
+    :param positions_b: The positions of the bodies b, of shape (m, 2).
+    :param velocities_b: The velocities of the bodies b per tick, of shape (m, 2).
+    :param reach: The distance between the centres at which a pair touch, broadcastable to (n, m).
+    :return: The first and last tick from now, both of shape (n, m), that each pair touch. The first is after the
+     last for pairs that never touch and the last is infinite for pairs that always touch.
+    """
+    offsets = positions_a[:, None, :] - positions_b[None, :, :]
+    relative_velocities = velocities_a[:, None, :] - velocities_b[None, :, :]
+    a = np.einsum('ijk,ijk->ij', relative_velocities, relative_velocities)
+    b = np.einsum('ijk,ijk->ij', offsets, relative_velocities)
+    c = np.einsum('ijk,ijk->ij', offsets, offsets) - reach * reach
+    discriminant = b * b - a * c
+    moving = a > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(discriminant, 0.0))
+        first = np.where(moving, (-b - root) / a, np.where(c <= 0, 0.0, inf))
+        last = np.where(moving, (-b + root) / a, np.where(c <= 0, inf, -inf))
+    never = moving & (discriminant < 0)
+    first[never] = inf
+    last[never] = -inf
+    return np.maximum(np.ceil(first), 0.0), np.floor(last)
+
+
+def exit_tick(position: float, velocity: float, low: float, high: float) -> float:
+    """
+    :return: The number of ticks until a coordinate moving at velocity first reaches low or high, infinite if never.
+     A coordinate already at or beyond either has left at once, e.g. a particle fired by a ship wrapping around
+     the screen.
+    """
+    if position <= low or position >= high:
+        return 0
+    if velocity > 0:
+        return max(ceil((high - position) / velocity), 0)
+    if velocity < 0:
+        return max(ceil((position - low) / -velocity), 0)
+    return inf
+
+
+class KineticCollisions:
+    """
+    Detects the collisions of a game by predicting when they can happen instead of testing every pair every tick.
+    Every body moves in a straight line between the decisions of the agents, so the ticks during which a particle
+    and asteroid, or a ship and asteroid, can touch are solved for once when either appears and kept in a priority
+    queue. A ships pairs are only solved again when its motion changes, e.g. it boosts or wraps around the screen.
+    Predicted contacts are confirmed with the games exact tests on the tick they are due, so the results are the
+    same as testing every pair, but the cost of a tick follows the number of events rather than of pairs.
+    """
+
+    def __init__(self, game):
+        """
+        :param game: The game to detect collisions for.
+        """
+        self.game = game
+        self.reset()
+
+    def reset(self):
+        """ Forget every prediction, e.g. after the state of the game has been restored. """
+        self.tick = 0
+        self.events: List[Tuple] = []
+        self.sequence = 0
+        self.tokens: Dict[int, int] = {}
+        self.next_token = 0
+        self.ship_motion: Dict[int, Tuple[int, float, float, float, float]] = {}
+
+    def schedule(self, tick: int, kind: int, first, second, last: float):
+        """
+        Queue a check of a predicted event.
+
+        :param tick: The tick to check on.
+        :param kind: The kind of event.
+        :param first: The first entity of the event.
+        :param second: The second entity of the event, or None.
+        :param last: The last tick the event could happen on.
+        """
+        self.sequence += 1
+        heappush(self.events, (tick, self.sequence, kind, first, second, self.tokens[id(first)],
+                               self.tokens.get(id(second)), last))
+
+    def track(self, entity):
+        """ Give an entity a new token, which invalidates any events already queued for it. """
+        self.next_token += 1
+        self.tokens[id(entity)] = self.next_token
+
+    def forget(self, entity):
+        """ Stop tracking an entity that has left the game. """
+        self.tokens.pop(id(entity), None)
+        self.ship_motion.pop(id(entity), None)
+
+    def schedule_contacts(self, kind: int, bodies_a: List, bodies_b: List, reach: np.ndarray):
+        """
+        Predict and queue the contacts between every pair of bodies from the two lists.
+
+        :param kind: The kind of event.
+        :param bodies_a: The first bodies of the pairs, particles or ships.
+        :param bodies_b: The second bodies of the pairs, asteroids.
+        :param reach: The distances at which the pairs touch, broadcastable to (len(bodies_a), len(bodies_b)).
+        """
+        if not bodies_a or not bodies_b:
+            return
+        state_a = np.array([(body.centre_x, body.centre_y, body.velocity_x, body.velocity_y) for body in bodies_a],
+                           dtype=np.float64)
+        state_b = np.array([(body.centre_x, body.centre_y, body.velocity_x, body.velocity_y) for body in bodies_b],
+                           dtype=np.float64)
+        first, last = contact_windows(state_a[:, :2], state_a[:, 2:], state_b[:, :2], state_b[:, 2:], reach)
+        for index_a, index_b in zip(*np.nonzero(first <= last)):
+            self.schedule(self.tick + int(first[index_a, index_b]), kind, bodies_a[index_a], bodies_b[index_b],
+                          self.tick + last[index_a, index_b])
+
+    def ship_moved(self, ship: Ship) -> bool:
+        """
+        :return: Whether the ship is not where the motion it was last predicted with would have taken it.
+        """
+        motion = self.ship_motion.get(id(ship))
+        if motion is None:
+            return True
+        tick, centre_x, centre_y, velocity_x, velocity_y = motion
+        elapsed = self.tick - tick
+        return (ship.velocity_x != velocity_x or ship.velocity_y != velocity_y or
+                abs(centre_x + velocity_x * elapsed - ship.centre_x) > SLACK or
+                abs(centre_y + velocity_y * elapsed - ship.centre_y) > SLACK)
+
+    def register(self, window_width, window_height, particles: List[Particle], asteroids: List[Asteroid],
+                 agents: List[Agent]):
+        """ Predict the events of entities that have appeared and of ships whose motion has changed. """
+        new_asteroids = [asteroid for asteroid in asteroids if id(asteroid) not in self.tokens]
+        new_particles = [particle for particle in particles if id(particle) not in self.tokens]
+        old_particles = [particle for particle in particles if id(particle) in self.tokens]
+        for asteroid in new_asteroids:
+            self.track(asteroid)
+            ticks = min(exit_tick(asteroid.centre_x, asteroid.velocity_x, -asteroid.radius,
+                                  window_width + asteroid.radius),
+                        exit_tick(asteroid.centre_y, asteroid.velocity_y, -asteroid.radius,
+                                  window_height + asteroid.radius))
+            if ticks < inf:
+                self.schedule(self.tick + max(ticks - 1, 0), ASTEROID_EXIT, asteroid, None, inf)
+        for particle in new_particles:
+            self.track(particle)
+            ticks = min(exit_tick(particle.centre_x, particle.velocity_x, 0, window_width),
+                        exit_tick(particle.centre_y, particle.velocity_y, 0, window_height))
+            self.schedule(self.tick + (max(ticks - 1, 0) if ticks < inf else 0), PARTICLE_EXIT, particle, None, inf)
+
+        radii = np.array([asteroid.radius for asteroid in asteroids], dtype=np.float64) + SLACK
+        new_radii = np.array([asteroid.radius for asteroid in new_asteroids], dtype=np.float64) + SLACK
+        self.schedule_contacts(PARTICLE_ASTEROID, new_particles, asteroids, radii[None, :])
+        self.schedule_contacts(PARTICLE_ASTEROID, old_particles, new_asteroids, new_radii[None, :])
+
+        for agent in agents:
+            ship = agent.get_ship()
+            # The ship is inside a circle of twice its height, plus the rounding of its drawn vertices
+            reach = 2 * ship.height + 2
+            if self.ship_moved(ship):
+                self.track(ship)
+                self.ship_motion[id(ship)] = (self.tick, ship.centre_x, ship.centre_y,
+                                              ship.velocity_x, ship.velocity_y)
+                self.schedule_contacts(SHIP_ASTEROID, [ship], asteroids, (radii + reach)[None, :])
+            else:
+                self.schedule_contacts(SHIP_ASTEROID, [ship], new_asteroids, (new_radii + reach)[None, :])
+
+    def update(self, window_width, window_height, particles: List[Particle], asteroids: List[Asteroid],
+               agents: List[Agent]) -> Tuple[List[Agent], int]:
+        """
+        Carry out the collision and movement part of Game.entity_update, checking only the events that are due.
+
+        :return: The agents whose ships survived and the reward for the asteroids destroyed.
+        """
+        num_of_asteroids = len(asteroids)
+        present_asteroids = asteroids[:num_of_asteroids]
+        self.register(window_width, window_height, particles, present_asteroids, agents)
+        ship_agents = {id(agent.get_ship()): agent for agent in agents}
+        destroyed_asteroids: Set[int] = set()
+        reward = 0
+        game = self.game
+        while self.events and self.events[0][0] <= self.tick:
+            event = heappop(self.events)
+            tick, _, kind, first, second, first_token, second_token, last = event
+            if self.tokens.get(id(first)) != first_token or self.tokens.get(id(second)) != second_token:
+                continue
+            if kind == PARTICLE_ASTEROID:
+                happened = game.is_inside(first.centre_x, first.centre_y, second)
+                if happened:
+                    reward += 1
+                    first.destroyed = True
+                    destroyed_asteroids.add(id(second))
+            elif kind == SHIP_ASTEROID:
+                happened = game.intersecting_ship(second, first)
+                if happened and ship_agents[id(first)] in agents:
+                    agents.remove(ship_agents[id(first)])
+            elif kind == ASTEROID_EXIT:
+                happened = game.out_of_window(first, window_width, window_height)
+                if happened:
+                    destroyed_asteroids.add(id(first))
+            else:
+                happened = not (0 < first.centre_x < window_width and 0 < first.centre_y < window_height)
+                if happened:
+                    first.destroyed = True
+            if not happened and self.tick < last:
+                self.sequence += 1
+                heappush(self.events, (self.tick + 1, self.sequence) + event[2:])
+
+        for ship_id in [ship_id for ship_id in self.ship_motion if ship_agents.get(ship_id) not in agents]:
+            self.tokens.pop(ship_id, None)
+            del self.ship_motion[ship_id]
+        preserved = 0
+        for index in range(num_of_asteroids):
+            asteroid = asteroids[index]
+            if id(asteroid) in destroyed_asteroids:
+                self.forget(asteroid)
+                asteroid.release()
+            else:
+                asteroids[preserved] = asteroid
+                preserved += 1
+                asteroid.update()
+        del asteroids[preserved:num_of_asteroids]
+        preserved = 0
+        for particle in particles:
+            if particle.destroyed:
+                self.forget(particle)
+                particle.release()
+            else:
+                particle.update()
+                particles[preserved] = particle
+                preserved += 1
+        del particles[preserved:]
+        self.tick += 1
+        return agents, reward
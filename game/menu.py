@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import List, Type
+from typing import List, Type, Callable
 
+import numpy as np
 import pyglet
-import random
 from abc import ABC, abstractmethod
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from game.config import GameConfig
 from game.control import Game, GameState
 from game.agent import Agent
 from game.entities import Ship
@@ -17,6 +18,17 @@ from agents.agent_loader import load_agents
 key = pyglet.window.key
 
 
+def set_label_text(label: pyglet.text.Label, text: str):
+    """
+    Change the text of a label, which lays the label out again, only if the text is different.
+
+    :param label: The label.
+    :param text: The text to show.
+    """
+    if label.text != text:
+        label.text = text
+
+
 class ScreenListener(ABC):
     """ A base class to be implemented by anything that listens for screen changes. """
 
@@ -99,6 +111,14 @@ class Screen(ABC):
         """
         pass
 
+    def leave(self, window):
+        """
+        Release anything held on the window before another screen replaces this one.
+
+        :param window: The window drawn on.
+        """
+        pass
+
 
 class MenuScreen(Screen):
     """
@@ -117,16 +137,27 @@ class MenuScreen(Screen):
         self.window = window
         super().__init__(screen_listener)
 
+        self.batch = pyglet.graphics.Batch()
         self.label = pyglet.text.Label("Welcome to Asteroids", font_name="Arial", font_size=36,
                                        x=(window.width // 2) - 10, y=3*(window.height // 4) - 10,
-                                       anchor_x="center", anchor_y="center")
+                                       anchor_x="center", anchor_y="center", batch=self.batch)
+        pyglet.text.Label("L to Launch, P to Pause, K to Quit", font_name="Arial", font_size=12,
+                          x=window.width // 2, y=window.height // 2, anchor_x="center", anchor_y="bottom",
+                          batch=self.batch)
+        pyglet.text.Label("W to Boost, D and A to turn and Space to Shoot", font_name="Arial", font_size=12,
+                          x=window.width // 2, y=window.height // 2, anchor_x="center", anchor_y="top",
+                          batch=self.batch)
+        self.agent_label = pyglet.text.Label("", font_name="Arial", font_size=12,
+                                             x=window.width // 2, y=(window.height // 2) - 18,
+                                             anchor_x="center", anchor_y="top", batch=self.batch)
 
-        initial_stars = tuple([random.randint(0, window.width) if i % 2 == 0 else
-                               random.randint(0, window.height) for i in range(0, 40)])
-        self.stars = pyglet.graphics.vertex_list(len(initial_stars)//2, ('v2i', initial_stars))
+        initial_stars = np.random.randint(0, (window.width + 1, window.height + 1), (20, 2))
+        self.stars = self.batch.add(len(initial_stars), pyglet.gl.GL_POINTS, None,
+                                    ('v2i', initial_stars.ravel().tolist()))
 
         self.agents: List[Type[Agent]] = load_agents()
         self.agent_selector_current = 0
+        self.show_agent()
 
     def on_key_press(self, symbol, modifiers):
         if symbol == key.RIGHT:
@@ -140,6 +171,11 @@ class MenuScreen(Screen):
                 Ship(self.window.width // 2, self.window.height // 2, self.window)
             )
             self.screen = GameScreen(self.window, self.screen_listener, [agent])
+        self.show_agent()
+
+    def show_agent(self):
+        """ Show the name of the agent selected. """
+        set_label_text(self.agent_label, "Agent: " + self.agents[self.agent_selector_current].__name__)
 
     def draw(self, window):
         """
@@ -147,16 +183,7 @@ class MenuScreen(Screen):
 
         :param window: The window to draw on.
         """
-        self.stars.draw(pyglet.graphics.GL_POINTS)
-        self.label.draw()
-        pyglet.text.Label("L to Launch, P to Pause, K to Quit", font_name="Arial", font_size=12,
-                          x=window.width // 2, y=window.height // 2, anchor_x="center", anchor_y="bottom").draw()
-        pyglet.text.Label("W to Boost, D and A to turn and Space to Shoot", font_name="Arial", font_size=12,
-                          x=window.width // 2, y=window.height // 2,
-                          anchor_x="center", anchor_y="top").draw()
-        pyglet.text.Label("Agent: " + self.agents[self.agent_selector_current].__name__, font_name="Arial", font_size=12,
-                          x=window.width // 2, y=(window.height // 2) - 18,
-                          anchor_x="center", anchor_y="top").draw()
+        self.batch.draw()
 
     def update(self, window):
         """
@@ -168,25 +195,17 @@ class MenuScreen(Screen):
 
     def passing_stars(self, window):
         """
-        Cause stars to appear to be passing.
-        """
-        for i in range(0, len(self.stars.vertices), 2):
-            # If the star has reached the edge of the screen reset it into the middle
-            if self.stars.vertices[i] >= window.width or self.stars.vertices[i+1] >= window.height:
-                self.stars.vertices[i] = random.randint((window.width/2)-(window.width/10),
-                                                        (window.width/2)+(window.width/10))
-                self.stars.vertices[i+1] = random.randint((window.height/2)-(window.height/10),
-                                                          (window.height/2)+(window.height/10))
-            else:
-                # If the star has not reached the edge keep showing it passing through space
-                if self.stars.vertices[i] > window.width-self.stars.vertices[i]:
-                    self.stars.vertices[i] += window.width//300
-                else:
-                    self.stars.vertices[i] -= window.width//300
-                if self.stars.vertices[i+1] > window.height-self.stars.vertices[i+1]:
-                    self.stars.vertices[i+1] += window.height//300
-                else:
-                    self.stars.vertices[i+1] -= window.height//300
+        Cause stars to appear to be passing, moving every star at once in the vertex buffer.
+        """
+        stars = np.ctypeslib.as_array(self.stars.vertices).reshape(-1, 2)
+        size = np.array((window.width, window.height))
+        # Stars that have reached the edge of the screen are reset into the middle
+        passed = ((stars < 0) | (stars >= size)).any(axis=1)
+        middle = size // 2
+        stars[passed] = np.random.randint(middle - size // 10, middle + size // 10 + 1, (int(passed.sum()), 2))
+        # The rest keep moving away from the middle
+        moving = ~passed
+        stars[moving] += np.where(stars[moving] > size - stars[moving], size // 300, -(size // 300))
 
 
 class GameScreen(Screen):
@@ -197,13 +216,21 @@ class GameScreen(Screen):
     def __init__(self, window, screen_listener: ScreenListener, agents: List[Agent]):
         """
         Initialise the listener to detect changes in the screen, an agent, the game and key press handler.
+        The agents handle key events straight from the window, rather than through the screen and the game, so
+        user agents receive them as soon as they arrive.
 
         :param window: The window to draw on.
         :param screen_listener: The listener to detect changes in the screen.
         """
         super().__init__(screen_listener)
         self.game: Game = Game(window, agents)
+        # The agents whose ships were in the game after the last update
+        self.alive: List[Agent] = list(agents)
+        for agent in agents:
+            window.push_handlers(agent)
         self.game.start()
+        self.points_label = pyglet.text.Label("Points: 0", font_name="Arial", font_size=12, x=0, y=window.height,
+                                              anchor_x="left", anchor_y="top")
 
     def update(self, window):
         """
@@ -213,6 +240,11 @@ class GameScreen(Screen):
         """
         if self.game.state is not GameState.OVER:
             self.game.update()
+            if len(self.game.agents) != len(self.alive):
+                for agent in self.alive:
+                    if agent not in self.game.agents:
+                        agent.close()
+                self.alive = list(self.game.agents)
         else:
             self.game_over(window)
 
@@ -222,9 +254,8 @@ class GameScreen(Screen):
 
         :param window: The window to draw on.
         """
-        pyglet.text.Label("Points: " + str(self.game.points), font_name="Arial", font_size=12,
-                          x=0, y=window.height,
-                          anchor_x="left", anchor_y="top").draw()
+        set_label_text(self.points_label, "Points: " + str(self.game.points))
+        self.points_label.draw()
         if self.game.state is not GameState.OVER:
             self.game.draw()
         else:
@@ -240,23 +271,23 @@ class GameScreen(Screen):
 
     def on_key_press(self, symbol, modifiers):
         """
-        Pause if P is pressed and delegate presses to the game.
+        Pause if P is pressed.
 
         :param symbol: The key pressed.
         :param modifiers: ?
         """
         if symbol == key.P:
             self.game.pause_toggle()
-        self.game.on_key_press(symbol, modifiers)
 
-    def on_key_release(self, symbol, modifiers):
+    def leave(self, window):
         """
-        Delegate releases to the game.
+        Stop the agents handling key events and close them.
 
-        :param symbol: The key released.
-        :param modifiers: ?
+        :param window: The window drawn on.
         """
-        self.game.on_key_release(symbol, modifiers)
+        for agent in self.game.players:
+            window.remove_handlers(agent)
+            agent.close()
 
 
 class GameOverScreen(Screen):
@@ -274,6 +305,16 @@ class GameOverScreen(Screen):
         """
         super().__init__(screen_listener)
         self.points = points
+        self.batch = pyglet.graphics.Batch()
+        pyglet.text.Label("Game Over", font_name="Arial", font_size=36,
+                          x=(window.width // 2) - 10, y=3 * (window.height // 4) - 10,
+                          anchor_x="center", anchor_y="center", batch=self.batch)
+        pyglet.text.Label("Points: " + str(self.points), font_name="Arial", font_size=12,
+                          x=window.width // 2, y=window.height // 2,
+                          anchor_x="center", anchor_y="bottom", batch=self.batch)
+        pyglet.text.Label("K to Quit to menu", font_name="Arial", font_size=12,
+                          x=window.width // 2, y=window.height // 2, anchor_x="center", anchor_y="top",
+                          batch=self.batch)
 
     def draw(self, window):
         """
@@ -281,14 +322,7 @@ class GameOverScreen(Screen):
 
         :param window: The window to draw on.
         """
-        pyglet.text.Label("Game Over", font_name="Arial", font_size=36,
-                          x=(window.width // 2) - 10, y=3 * (window.height // 4) - 10,
-                          anchor_x="center", anchor_y="center").draw()
-        pyglet.text.Label("Points: " + str(self.points), font_name="Arial", font_size=12,
-                          x=window.width // 2, y=window.height // 2,
-                          anchor_x="center", anchor_y="bottom").draw()
-        pyglet.text.Label("K to Quit to menu", font_name="Arial", font_size=12,
-                          x=window.width // 2, y=window.height // 2, anchor_x="center", anchor_y="top").draw()
+        self.batch.draw()
 
     def update(self, window):
         """
@@ -303,36 +337,41 @@ class Controller(ScreenListener):
     """
     Starts the program, controls the screens on show.
     """
-    def __init__(self):
+    def __init__(self, create_screen: Callable[[pyglet.window.Window, ScreenListener], Screen] = MenuScreen):
+        """
+        Open the window and run the program.
+
+        :param create_screen: Creates the first screen to show from the window and the screen listener.
+        """
         self.window = pyglet.window.Window()
-        self.screen = MenuScreen(self.window, self)
+        self.screen = create_screen(self.window, self)
 
         @self.window.event
         def on_draw():
-            self.clear_update_draw(self.window)
+            self.clear_draw(self.window)
 
         @self.window.event
         def on_key_press(symbol, modifiers):
             if symbol == key.K:
-                self.screen = MenuScreen(self.window, self)
+                self.notify(MenuScreen(self.window, self))
             self.screen.on_key_press(symbol, modifiers)
 
         @self.window.event
         def on_key_release(symbol, modifiers):
             self.screen.on_key_release(symbol, modifiers)
 
-        pyglet.clock.schedule(lambda dt: 1 / 60)
+        # The screen is updated on a clock of its own, so games play at the same speed as headless games however
+        # often the window is drawn, and the window is drawn after each update
+        pyglet.clock.schedule_interval(lambda dt: self.screen.update(self.window), GameConfig().tick_seconds)
         pyglet.app.run()
 
-    def clear_update_draw(self, window):
+    def clear_draw(self, window):
         """
-        Clear the window, update the screen and draw the screen.
+        Clear the window and draw the screen.
 
-        :param window: The window to update and draw with.
-        :return: None
+        :param window: The window to draw on.
         """
         window.clear()
-        self.screen.update(window)
         self.screen.draw(window)
 
     def notify(self, screen):
@@ -341,4 +380,5 @@ class Controller(ScreenListener):
 
         :param screen: The new screen to  be the current one.
         """
+        self.screen.leave(self.window)
         self.screen = screen
@@ -0,0 +1,138 @@
+import argparse
+from math import ceil, sqrt
+from typing import List, Tuple
+
+import numpy as np
+import pyglet
+
+from game.control import Game, GameState, update_games
+from game.headless import create_game
+from game.menu import Screen, ScreenListener, Controller, set_label_text
+from game.raster import ship_vertices, asteroid_vertices
+
+from agents.agent_loader import load_agents
+
+
+def tile_layout(num_of_games: int, width: int, height: int, game_width: int, game_height: int) \
+        -> Tuple[np.ndarray, float]:
+    """
+    Arrange games in a grid of tiles that fills the window as closely to square as possible.
+
+    :param num_of_games: The number of games.
+    :param width: The width of the window.
+    :param height: The height of the window.
+    :param game_width: The width of each game.
+    :param game_height: The height of each game.
+    :return: The bottom left corner of the tile of each game, of shape (number of games, 2), and the scale the games
+     are drawn at to fit their tiles.
+    """
+    columns = max(ceil(sqrt(num_of_games * width * game_height / (height * game_width))), 1)
+    rows = max(ceil(num_of_games / columns), 1)
+    scale = min(width / (columns * game_width), height / (rows * game_height))
+    indices = np.arange(num_of_games)
+    origins = np.stack((indices % columns * game_width * scale,
+                        height - (indices // columns + 1) * game_height * scale), axis=1)
+    return origins, scale
+
+
+def polygon_edges(vertices: np.ndarray) -> np.ndarray:
+    """
+    :param vertices: An array of shape (number of polygons, vertices per polygon, 2).
+    :return: The edges of the closed polygons as pairs of line vertices, of shape (number of edges * 2, 2).
+    """
+    return np.stack((vertices, np.roll(vertices, -1, axis=1)), axis=2).reshape(-1, 2)
+
+
+def mosaic_vertices(games: List[Game], origins: np.ndarray, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate everything to draw for all the games at once, each moved into its tile.
+
+    :param games: The games.
+    :param origins: The bottom left corner of the tile of each game.
+    :param scale: The scale the games are drawn at.
+    :return: The vertices of the lines, pairs of which are the outlines of the ships and asteroids and the borders
+     of the tiles, and the vertices of the points of the particles.
+    """
+    lines = []
+    points = []
+    for game, origin in zip(games, origins):
+        if game.state is GameState.OVER:
+            continue
+        ships = ship_vertices([agent.get_ship() for agent in game.agents])
+        outlines = [polygon_edges(ships)]
+        if game.asteroids:
+            outlines.append(polygon_edges(asteroid_vertices(list(game.asteroids))))
+        lines.append(np.concatenate(outlines) * scale + origin)
+        if game.particles:
+            points.append(np.array([(particle.centre_x, particle.centre_y) for particle in game.particles],
+                                   dtype=np.float64) * scale + origin)
+    if games:
+        width, height = games[0].window.width * scale, games[0].window.height * scale
+        corners = np.array([(0, 0), (width, 0), (width, height), (0, height)], dtype=np.float64)
+        lines.append(polygon_edges(corners[None, :, :] + origins[:, None, :]))
+    return (np.concatenate(lines) if lines else np.empty((0, 2)),
+            np.concatenate(points) if points else np.empty((0, 2)))
+
+
+class MosaicScreen(Screen):
+    """
+    Play many headless games side by side, each in a tile of the window. Every frame all the games are stepped
+    together and everything they contain is drawn in one batch, so the cost of drawing does not grow with the
+    number of draw calls per game.
+    """
+
+    def __init__(self, window, screen_listener: ScreenListener, games: List[Game]):
+        """
+        Lay out the games and create the batch they are drawn with.
+
+        :param window: The window to draw on.
+        :param screen_listener: The listener for changes to the screen.
+        :param games: The games to play.
+        """
+        super().__init__(screen_listener)
+        self.games = games
+        game_window = games[0].window
+        self.origins, self.scale = tile_layout(len(games), window.width, window.height, game_window.width,
+                                               game_window.height)
+        self.batch = pyglet.graphics.Batch()
+        self.lines = self.batch.add(0, pyglet.gl.GL_LINES, None, 'v2f/stream')
+        self.points = self.batch.add(0, pyglet.gl.GL_POINTS, None, 'v2f/stream')
+        self.labels = [pyglet.text.Label("0", font_name="Arial", font_size=8, x=int(x) + 2,
+                                         y=int(y + game_window.height * self.scale) - 2, anchor_x="left",
+                                         anchor_y="top", batch=self.batch) for x, y in self.origins]
+
+    def update(self, window):
+        """
+        Step every game and rebuild the vertices to draw.
+
+        :param window: The window to draw on.
+        """
+        update_games(self.games)
+        lines, points = mosaic_vertices(self.games, self.origins, self.scale)
+        for vertex_list, vertices in ((self.lines, lines), (self.points, points)):
+            if vertex_list.get_size() != len(vertices):
+                vertex_list.resize(len(vertices))
+            vertex_list.vertices[:] = vertices.ravel().tolist()
+        for game, label in zip(self.games, self.labels):
+            set_label_text(label, str(game.points) if game.state is not GameState.OVER
+                           else "{} Game Over".format(game.points))
+
+    def draw(self, window):
+        """
+        Draw every game.
+
+        :param window: The window to draw on.
+        """
+        self.batch.draw()
+
+
+if __name__ == '__main__':
+    agent_types = {agent_type.__name__: agent_type for agent_type in load_agents()}
+    parser = argparse.ArgumentParser(description="Watch many headless games at once.")
+    parser.add_argument("--games", type=int, default=16)
+    parser.add_argument("--agent", choices=sorted(agent_types), default="ReactiveAgent")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    Controller(lambda window, listener: MosaicScreen(
+        window, listener, [create_game([agent_types[arguments.agent]], arguments.seed + index)
+                           for index in range(arguments.games)]))
@@ -1,8 +1,81 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import List
-import pyglet
+from typing import List, Dict
+
+import numpy as np
 
 from game.entities import Ship, Particle, Asteroid
+from game.raster import rasterize, ship_vertices, draw_polygons
+
+
+class WorldView:
+    """
+    The parts of a perception that are the same for every ship, shared by the perceptions of one type made in the
+    same tick. Each part is only worked out the first time it is asked for, so should be asked for before the game
+    next updates, e.g. while perceiving.
+    """
+
+    def __init__(self, particles: List[Particle], asteroids: List[Asteroid], window_width: int = 0,
+                 window_height: int = 0):
+        """
+        :param particles: The particles in the game.
+        :param asteroids: The asteroids in the game.
+        :param window_width: The width of the game.
+        :param window_height: The height of the game.
+        """
+        self.particles = list(particles)
+        self.asteroids = list(asteroids)
+        self.window_width = window_width
+        self.window_height = window_height
+        self._asteroid_data: List[Dict] = None
+        self._particle_data: List[Dict] = None
+        self._asteroid_array: np.ndarray = None
+        self._particle_array: np.ndarray = None
+        self._background: np.ndarray = None
+
+    @property
+    def asteroid_data(self) -> List[Dict]:
+        """ The state of each asteroid in a dictionary. """
+        if self._asteroid_data is None:
+            self._asteroid_data = [{'centre_x': asteroid.centre_x, 'centre_y': asteroid.centre_y,
+                                    'velocity_x': asteroid.velocity_x, 'velocity_y': asteroid.velocity_y,
+                                    'radius': asteroid.radius} for asteroid in self.asteroids]
+        return self._asteroid_data
+
+    @property
+    def particle_data(self) -> List[Dict]:
+        """ The state of each particle in a dictionary. """
+        if self._particle_data is None:
+            self._particle_data = [{'centre_x': particle.centre_x, 'centre_y': particle.centre_y,
+                                    'velocity_x': particle.velocity_x, 'velocity_y': particle.velocity_y}
+                                   for particle in self.particles]
+        return self._particle_data
+
+    @property
+    def asteroid_array(self) -> np.ndarray:
+        """ An array with a row of the centre_x, centre_y, velocity_x, velocity_y and radius of each asteroid. """
+        if self._asteroid_array is None:
+            self._asteroid_array = np.array(
+                [(asteroid.centre_x, asteroid.centre_y, asteroid.velocity_x, asteroid.velocity_y, asteroid.radius)
+                 for asteroid in self.asteroids], dtype=np.float64).reshape(-1, 5)
+        return self._asteroid_array
+
+    @property
+    def particle_array(self) -> np.ndarray:
+        """ An array with a row of the centre_x, centre_y, velocity_x and velocity_y of each particle. """
+        if self._particle_array is None:
+            self._particle_array = np.array(
+                [(particle.centre_x, particle.centre_y, particle.velocity_x, particle.velocity_y)
+                 for particle in self.particles], dtype=np.float64).reshape(-1, 4)
+        return self._particle_array
+
+    @property
+    def background(self) -> np.ndarray:
+        """ An image of the asteroids and particles, without any ships. """
+        if self._background is None:
+            self._background = rasterize(self.window_width, self.window_height, [], self.asteroids, self.particles)
+        return self._background
 
 
 class Perception(ABC):
@@ -23,6 +96,20 @@ class Perception(ABC):
         """
         pass
 
+    @classmethod
+    def perceive_all(cls, ships: List[Ship], particles: List[Particle], asteroids: List[Asteroid]) \
+            -> List[Perception]:
+        """
+        Create the perceptions of several ships of the same game at once. Perceptions that have parts in common
+        override this to work them out once for all of the ships.
+
+        :param ships: The ships to create perceptions for.
+        :param particles: The particles in the game.
+        :param asteroids: The asteroids in the game.
+        :return: The perception of each ship.
+        """
+        return [cls(ship, particles, asteroids, []) for ship in ships]
+
     @abstractmethod
     def get_perception_data(self):
         """
@@ -37,29 +124,73 @@ class VectorPerception(Perception):
     """
     A perception of the the state of the ship, asteroids and particles in the game at one point.
     Representation of velocities, position etc. are given as vectors.
+    The asteroid and particle data is shared with the other ships perceiving the same tick and is only recorded
+    when first used, so it should be read while perceiving and not changed. Their positions relative to the ship
+    are likewise only worked out when first used.
     """
 
-    def __init__(self, ship: Ship, particles: List[Particle], asteroids: List[Asteroid], other_ships: List[Ship]):
+    def __init__(self, ship: Ship, particles: List[Particle], asteroids: List[Asteroid], other_ships: List[Ship],
+                 world: WorldView = None):
         """
-        Record the state of the ship, asteroid and particle at time of creation in a dictionary.
+        Record the state of the ship at time of creation in a dictionary.
 
         :param ship: The ship this perception is from.
         :param particles: The particles in the game.
         :param asteroids: The asteroids in the game.
         :param other_ships: The other ships in the game.
+        :param world: The view of the particles and asteroids shared with other perceptions, if there is one.
         """
         self.ship_state = {'centre_x': ship.centre_x, 'centre_y': ship.centre_y,
                            'velocity_x': ship.velocity_x, 'velocity_y': ship.velocity_y,
                            'facing': ship.facing, 'thrust': ship.thrust,
                            'turn_speed': ship.turn_speed, 'height': ship.height}
-        self.asteroid_data = [{'centre_x': asteroid.centre_x, 'centre_y': asteroid.centre_y,
-                               'velocity_x': asteroid.velocity_x, 'velocity_y': asteroid.velocity_y,
-                               'radius': asteroid.radius} for asteroid in asteroids]
-        self.particle_data = [{'centre_x': particle.centre_x, 'centre_y': particle.centre_y,
-                               'velocity_x': particle.velocity_x, 'velocity_y': particle.velocity_y}
-                              for particle in particles]
+        self.world = world if world is not None else WorldView(particles, asteroids)
+        self._asteroid_offsets: np.ndarray = None
+        self._particle_offsets: np.ndarray = None
         super().__init__()
 
+    @classmethod
+    def perceive_all(cls, ships: List[Ship], particles: List[Particle], asteroids: List[Asteroid]) \
+            -> List[VectorPerception]:
+        world = WorldView(particles, asteroids)
+        return [cls(ship, particles, asteroids, [], world) for ship in ships]
+
+    @property
+    def asteroid_data(self) -> List[Dict]:
+        """ The state of each asteroid in a dictionary. """
+        return self.world.asteroid_data
+
+    @property
+    def particle_data(self) -> List[Dict]:
+        """ The state of each particle in a dictionary. """
+        return self.world.particle_data
+
+    @property
+    def asteroid_array(self) -> np.ndarray:
+        """ The state of the asteroids as an array with a row of the values of the dictionaries of asteroid_data. """
+        return self.world.asteroid_array
+
+    @property
+    def particle_array(self) -> np.ndarray:
+        """ The state of the particles as an array with a row of the values of the dictionaries of particle_data. """
+        return self.world.particle_array
+
+    @property
+    def asteroid_offsets(self) -> np.ndarray:
+        """ An array with a row of the x and y of each asteroid relative to the centre of the ship. """
+        if self._asteroid_offsets is None:
+            self._asteroid_offsets = self.asteroid_array[:, :2] - (self.ship_state['centre_x'],
+                                                                  self.ship_state['centre_y'])
+        return self._asteroid_offsets
+
+    @property
+    def particle_offsets(self) -> np.ndarray:
+        """ An array with a row of the x and y of each particle relative to the centre of the ship. """
+        if self._particle_offsets is None:
+            self._particle_offsets = self.particle_array[:, :2] - (self.ship_state['centre_x'],
+                                                                  self.ship_state['centre_y'])
+        return self._particle_offsets
+
     def get_perception_data(self):
         """
         Return the perception data that was recorded at the time of this perceptions initialisation.
@@ -105,22 +236,48 @@ class NoPerception(Perception):
 
 
 class ImagePerception(Perception):
+    """
+    A perception of the game as a grayscale image of the screen, drawn from the state of the game at one point
+    so that it does not depend on what is currently in the windows buffer.
+    """
 
-    def __init__(self, ship: Ship, particles: List[Particle], asteroids: List[Asteroid], other_ships: List[Ship]):
+    def __init__(self, ship: Ship, particles: List[Particle], asteroids: List[Asteroid], other_ships: List[Ship],
+                 world: WorldView = None):
         """
-        Initialise nothing.
+        Record the position of the ships, to be drawn with the asteroids and particles when first used.
 
         :param ship: The ship this perception is from.
         :param particles: The particles in the game.
         :param asteroids: The asteroids in the game.
         :param other_ships: The other ships in the game.
+        :param world: The view of the particles and asteroids shared with other perceptions, if there is one.
         """
+        self.world = world if world is not None else WorldView(particles, asteroids, ship.window_width,
+                                                               ship.window_height)
+        self.ship_vertices = ship_vertices([ship] + list(other_ships or []))
+        self._image: np.ndarray = None
         super().__init__()
 
+    @classmethod
+    def perceive_all(cls, ships: List[Ship], particles: List[Particle], asteroids: List[Asteroid]) \
+            -> List[ImagePerception]:
+        if not ships:
+            return []
+        world = WorldView(particles, asteroids, ships[0].window_width, ships[0].window_height)
+        return [cls(ship, particles, asteroids, [], world) for ship in ships]
+
+    @property
+    def image(self) -> np.ndarray:
+        """ The image of the screen, drawn from the shared image of the asteroids and particles. """
+        if self._image is None:
+            self._image = self.world.background.copy()
+            draw_polygons(self._image, self.ship_vertices)
+        return self._image
+
     def get_perception_data(self):
         """
-        Return an image of the current state of the screen
+        Return an image of the state of the screen at the time of this perceptions initialisation.
 
-        :rtype: :py:class:`~pyglet.image.ColorBufferImage`
+        :return: A numpy array of the grayscale image indexed by [y, x], with y increasing up the screen.
         """
-        pyglet.image.get_buffer_manager().get_color_buffer()
+        return self.image
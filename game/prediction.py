@@ -0,0 +1,125 @@
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+
+def asteroid_arrays(asteroid_data: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert the asteroid data of a VectorPerception into arrays.
+
+    :param asteroid_data: The asteroid data.
+    :return: The centres and velocities, both of shape (number of asteroids, 2), and the radii of the asteroids.
+    """
+    centres = np.array([(asteroid['centre_x'], asteroid['centre_y']) for asteroid in asteroid_data],
+                       dtype=np.float64).reshape(-1, 2)
+    velocities = np.array([(asteroid['velocity_x'], asteroid['velocity_y']) for asteroid in asteroid_data],
+                          dtype=np.float64).reshape(-1, 2)
+    radii = np.array([asteroid['radius'] for asteroid in asteroid_data], dtype=np.float64)
+    return centres, velocities, radii
+
+
+def future_positions(centres: np.ndarray, velocities: np.ndarray, ticks: float) -> np.ndarray:
+    """
+    :param centres: The current centres of the bodies, of shape (n, 2).
+    :param velocities: The velocities of the bodies per tick, of shape (n, 2).
+    :param ticks: The number of ticks ahead.
+    :return: Where each body will be after the number of ticks, moving as it is now.
+    """
+    return centres + velocities * ticks
+
+
+def _first_root(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Find the first non-negative time t at which a t^2 + 2 b t + c <= 0 starts to hold, for many quadratics at once.
+
+    :return: The times, infinite where it never holds.
+    """
+    times = np.full(np.shape(c), np.inf)
+    already = c <= 0
+    times[already] = 0.0
+    discriminant = b * b - a * c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(discriminant, 0.0))
+        quadratic = np.where(a != 0, (-b - root) / a, np.inf)
+        linear = np.where(b < 0, -c / (2 * b), np.inf)
+    solvable = ~already & (discriminant >= 0)
+    solution = np.where(np.abs(a) > 1e-12, quadratic, linear)
+    times[solvable] = np.where(solution[solvable] >= 0, solution[solvable], np.inf)
+    return times
+
+
+def closest_approach(ship_position: np.ndarray, ship_velocity: np.ndarray, centres: np.ndarray,
+                     velocities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate when and how closely each asteroid passes the ship if both keep moving as they are.
+
+    :param ship_position: The centre of the ship.
+    :param ship_velocity: The velocity of the ship per tick.
+    :param centres: The centres of the asteroids, of shape (n, 2).
+    :param velocities: The velocities of the asteroids per tick, of shape (n, 2).
+    :return: The number of ticks until the closest approach of each asteroid (0 if it is moving away) and the
+     distance between the centres at that time.
+    """
+    offsets = centres - np.asarray(ship_position, dtype=np.float64)
+    relative_velocities = velocities - np.asarray(ship_velocity, dtype=np.float64)
+    speeds_squared = np.einsum('ij,ij->i', relative_velocities, relative_velocities)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        times = -np.einsum('ij,ij->i', offsets, relative_velocities) / speeds_squared
+    times = np.where(speeds_squared > 0, np.maximum(times, 0.0), 0.0)
+    closest = offsets + relative_velocities * times[:, None]
+    return times, np.hypot(closest[:, 0], closest[:, 1])
+
+
+def collision_times(ship_position: np.ndarray, ship_velocity: np.ndarray, ship_radius: float, centres: np.ndarray,
+                    velocities: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    Calculate when each asteroid will first touch a circle around the ship if both keep moving as they are.
+
+    :param ship_position: The centre of the ship.
+    :param ship_velocity: The velocity of the ship per tick.
+    :param ship_radius: The radius of a circle around the ship, e.g. twice the ships height to contain it.
+    :param centres: The centres of the asteroids, of shape (n, 2).
+    :param velocities: The velocities of the asteroids per tick, of shape (n, 2).
+    :param radii: The radii of the asteroids.
+    :return: The number of ticks until each collision, 0 if already touching and infinite if it never happens.
+    """
+    offsets = centres - np.asarray(ship_position, dtype=np.float64)
+    relative_velocities = velocities - np.asarray(ship_velocity, dtype=np.float64)
+    reach = radii + ship_radius
+    return _first_root(np.einsum('ij,ij->i', relative_velocities, relative_velocities),
+                       np.einsum('ij,ij->i', offsets, relative_velocities),
+                       np.einsum('ij,ij->i', offsets, offsets) - reach * reach)
+
+
+def intercepts(ship_position: np.ndarray, centres: np.ndarray, velocities: np.ndarray, particle_speed: float,
+               muzzle_distance: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the direction to fire in to hit each asteroid. A particle does not take on the velocity of the ship,
+    so after t ticks it is muzzle_distance + particle_speed * t from where the ship was when it fired.
+
+    :param ship_position: The centre of the ship.
+    :param centres: The centres of the asteroids, of shape (n, 2).
+    :param velocities: The velocities of the asteroids per tick, of shape (n, 2).
+    :param particle_speed: The distance a particle moves per tick.
+    :param muzzle_distance: How far in front of the ships centre particles are fired from, i.e. twice its height.
+    :return: The angle to fire at for each asteroid and the number of ticks until the particle hits it, infinite if
+     it cannot be hit.
+    """
+    offsets = centres - np.asarray(ship_position, dtype=np.float64)
+    times = _first_root(np.einsum('ij,ij->i', velocities, velocities) - particle_speed * particle_speed,
+                        np.einsum('ij,ij->i', offsets, velocities) - muzzle_distance * particle_speed,
+                        np.einsum('ij,ij->i', offsets, offsets) - muzzle_distance * muzzle_distance)
+    aim = offsets + velocities * np.where(np.isfinite(times), times, 0.0)[:, None]
+    return np.arctan2(aim[:, 1], aim[:, 0]), times
+
+
+def rank_threats(collision_ticks: np.ndarray, approach_distances: np.ndarray) -> np.ndarray:
+    """
+    Order asteroids from the most to the least threatening: those that will collide soonest first, then those that
+    will pass closest.
+
+    :param collision_ticks: The ticks until each asteroid collides with the ship.
+    :param approach_distances: The distance each asteroid will pass the ship at.
+    :return: The indices of the asteroids in order of threat.
+    """
+    return np.lexsort((approach_distances, collision_ticks))
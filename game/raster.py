@@ -0,0 +1,97 @@
+from math import cos, sin
+from typing import List
+
+import numpy as np
+
+from game.entities import Ship, Particle, Asteroid
+
+
+def ship_vertices(ships: List[Ship]) -> np.ndarray:
+    """
+    Calculate the vertices of the ships as they are drawn.
+
+    :param ships: The ships.
+    :return: An array of shape (number of ships, 3, 2) of the x and y coordinates of each ships vertices.
+    """
+    vertices = np.empty((len(ships), 3, 2), dtype=np.int64)
+    for index, ship in enumerate(ships):
+        vertices[index] = (
+            (int(ship.centre_x + (2 * ship.height * cos(ship.facing))),
+             int(ship.centre_y + (2 * ship.height * sin(ship.facing)))),
+            (int(ship.centre_x + (ship.height * cos(ship.facing + 140))),
+             int(ship.centre_y + (ship.height * sin(ship.facing + 140)))),
+            (int(ship.centre_x + (ship.height * cos(ship.facing - 140))),
+             int(ship.centre_y + (ship.height * sin(ship.facing - 140))))
+        )
+    return vertices
+
+
+def asteroid_vertices(asteroids: List[Asteroid]) -> np.ndarray:
+    """
+    Calculate the vertices of the asteroids as they are drawn.
+
+    :param asteroids: The asteroids.
+    :return: An array of shape (number of asteroids, points per asteroid, 2) of the x and y coordinates.
+    """
+    if not asteroids:
+        return np.empty((0, 0, 2), dtype=np.int64)
+    centres = np.array([(asteroid.centre_x, asteroid.centre_y) for asteroid in asteroids], dtype=np.float64)
+    points = np.array([asteroid.points for asteroid in asteroids], dtype=np.float64).reshape(len(asteroids), -1, 2)
+    return (centres[:, None, :] + points).astype(np.int64)
+
+
+def draw_polygons(frame: np.ndarray, vertices: np.ndarray, value: int = 255):
+    """
+    Draw the outlines of closed polygons onto the frame, all edges at once.
+
+    :param frame: The frame to draw on, indexed by [y, x].
+    :param vertices: An array of shape (number of polygons, vertices per polygon, 2).
+    :param value: The pixel value to draw with.
+    """
+    if vertices.size == 0:
+        return
+    starts = vertices.reshape(-1, 2)
+    ends = np.roll(vertices, -1, axis=1).reshape(-1, 2)
+    samples = int(np.abs(ends - starts).max()) + 1
+    steps = np.linspace(0.0, 1.0, samples)
+    line_points = np.rint(starts[:, None, :] + (ends - starts)[:, None, :] * steps[None, :, None]).astype(np.int64)
+    draw_points(frame, line_points.reshape(-1, 2), value)
+
+
+def draw_points(frame: np.ndarray, points: np.ndarray, value: int = 255):
+    """
+    Draw single pixels onto the frame, ignoring any that fall outside of it.
+
+    :param frame: The frame to draw on, indexed by [y, x].
+    :param points: An array of shape (number of points, 2) of x and y coordinates.
+    :param value: The pixel value to draw with.
+    """
+    height, width = frame.shape[:2]
+    visible = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+    frame[points[visible, 1], points[visible, 0]] = value
+
+
+def rasterize(width: int, height: int, ships: List[Ship], asteroids: List[Asteroid], particles: List[Particle],
+              frame: np.ndarray = None) -> np.ndarray:
+    """
+    Draw the entities into a grayscale image without needing a window, the same way they are drawn on the screen.
+    Rows are ordered bottom to top as in the games coordinates and pyglet buffers, so a pixel is frame[y, x].
+
+    :param width: The width of the game.
+    :param height: The height of the game.
+    :param ships: The ships to draw.
+    :param asteroids: The asteroids to draw.
+    :param particles: The particles to draw.
+    :param frame: An array of shape (height, width) to draw into rather than allocating a new frame.
+    :return: The frame.
+    """
+    if frame is None:
+        frame = np.zeros((height, width), dtype=np.uint8)
+    else:
+        frame.fill(0)
+    draw_polygons(frame, asteroid_vertices(asteroids))
+    draw_polygons(frame, ship_vertices(ships))
+    if particles:
+        draw_points(frame, np.array([(int(particle.centre_x), int(particle.centre_y)) for particle in particles],
+                                    dtype=np.int64))
+    return frame
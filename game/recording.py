@@ -0,0 +1,201 @@
+import argparse
+import json
+from typing import List, Optional, Type
+
+import numpy as np
+
+from game.agent import Agent, Action, Decision, pack_decision, unpack_decision
+from game.config import GameConfig
+from game.control import Game
+from game.headless import create_game
+from game.perception import Perception, NoPerception
+from game.snapshot import GameSnapshot
+
+
+class ReplayAgent(Agent):
+    """ An agent that stands in for a recorded agent, whose recorded actions are given to the game instead. """
+
+    def perceive(self, perception: Perception):
+        pass
+
+    def decide(self) -> Action:
+        return Action.NOACTION
+
+    @staticmethod
+    def get_perception_type() -> Type[Perception]:
+        return NoPerception
+
+
+class Recording:
+    """
+    The seed, config and actions of a headless game created with create_game, enough to play it again exactly,
+    along with the world hash after every tick to check a replay, or another run, against.
+    """
+
+    def __init__(self, seed: int, num_of_agents: int, width: int = 640, height: int = 480,
+                 config: GameConfig = None):
+        """
+        :param seed: The seed of the game.
+        :param num_of_agents: The number of agents that started the game.
+        :param width: The width of the game.
+        :param height: The height of the game.
+        :param config: The config of the game.
+        """
+        self.seed = seed
+        self.num_of_agents = num_of_agents
+        self.width = width
+        self.height = height
+        self.config = config if config is not None else GameConfig()
+        # The decisions of the agents in each tick, packed by pack_decision
+        self.actions: List[List[int]] = []
+        self.hashes: List[int] = []
+
+    def record(self, game: Game):
+        """
+        Record the tick the game has just played. Add this to the tick_listeners of the game to record it.
+
+        :param game: The game.
+        """
+        self.actions.append([pack_decision(decision) for decision in game.decisions])
+        self.hashes.append(game.world_hash.value)
+
+    def decisions(self, tick: int) -> List[Decision]:
+        """
+        :param tick: The tick, counting from 0 for the first.
+        :return: The decisions of the agents that were in the game in the tick.
+        """
+        return [unpack_decision(code) for code in self.actions[tick]]
+
+    def create_game(self) -> Game:
+        """
+        :return: The game at its start, with agents that stand in for those that played it.
+        """
+        return create_game([ReplayAgent] * self.num_of_agents, self.seed, self.width, self.height, self.config)
+
+    def replay(self, ticks: int = None) -> Game:
+        """
+        Play the recorded actions again.
+
+        :param ticks: The number of ticks to play, all of them if not given.
+        :return: The game after the ticks.
+        """
+        game = self.create_game()
+        for tick in range(len(self.actions) if ticks is None else ticks):
+            game.step(self.decisions(tick))
+        return game
+
+    def save(self, path: str):
+        """
+        Save the recording in a compressed numpy file.
+
+        :param path: The file to save to.
+        """
+        actions = np.zeros((len(self.actions), self.num_of_agents), dtype=np.uint64)
+        for tick, values in enumerate(self.actions):
+            actions[tick, :len(values)] = values
+        np.savez_compressed(path, actions=actions, hashes=np.array(self.hashes, dtype=np.uint64),
+                            header=json.dumps({'seed': self.seed, 'num_of_agents': self.num_of_agents,
+                                               'width': self.width, 'height': self.height,
+                                               'config': self.config.to_dict()}))
+
+    @staticmethod
+    def load(path: str) -> 'Recording':
+        """
+        :param path: A file saved by save.
+        :return: The recording.
+        """
+        with np.load(path) as data:
+            header = json.loads(str(data['header']))
+            recording = Recording(header['seed'], header['num_of_agents'], header['width'], header['height'],
+                                  GameConfig.from_dict(header['config']))
+            recording.actions = [[value for value in row if value] for row in data['actions'].tolist()]
+            recording.hashes = [int(value) for value in data['hashes']]
+        return recording
+
+
+def record_game(agent_types: List[Type[Agent]], seed: int, max_ticks: int = 20000, width: int = 640,
+                height: int = 480, config: GameConfig = None) -> Recording:
+    """
+    Play and record a headless game.
+
+    :param agent_types: The types of agent to play the game.
+    :param seed: The seed of the game.
+    :param max_ticks: The number of ticks after which the game is stopped if still in play.
+    :param width: The width of the game.
+    :param height: The height of the game.
+    :param config: The config of the game.
+    :return: The recording.
+    """
+    game = create_game(agent_types, seed, width, height, config)
+    recording = Recording(seed, len(agent_types), width, height, game.config)
+    game.tick_listeners.append(recording.record)
+    done = False
+    while not done and game.ticks < max_ticks:
+        _, done, _ = game.step()
+    return recording
+
+
+def first_divergence(first: List[int], second: List[int]) -> Optional[int]:
+    """
+    Find the first tick at which two runs differ from their world hashes. A world hash is rolled forward from the
+    ones before it, so once two runs differ their hashes never match again and the tick can be bisected for.
+
+    :param first: The world hash after every tick of the first run.
+    :param second: The world hash after every tick of the second run.
+    :return: The first tick, counting from 0, whose hashes differ or that only one run played, or None if the runs
+     are the same.
+    """
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high) // 2
+        if first[middle] == second[middle]:
+            low = middle + 1
+        else:
+            high = middle
+    if low == len(first) == len(second):
+        return None
+    return low
+
+
+def describe_difference(first: GameSnapshot, second: GameSnapshot) -> List[str]:
+    """
+    :return: The parts of two snapshots of games that differ.
+    """
+    differences = [name for name in ('ticks', 'points', 'level', 'state')
+                   if getattr(first, name) != getattr(second, name)]
+    if first.rng_state != second.rng_state:
+        differences.append('rng_state')
+    differences.extend(name for name in ('ships', 'alive', 'asteroids', 'particles')
+                       if not np.array_equal(getattr(first, name), getattr(second, name)))
+    return differences
+
+
+def bisect(first: Recording, second: Recording) -> Optional[int]:
+    """
+    Find the first tick two recordings diverge at and print what differs once it has been played.
+
+    :param first: The first recording.
+    :param second: The second recording.
+    :return: The tick, or None if the recordings are the same.
+    """
+    tick = first_divergence(first.hashes, second.hashes)
+    if tick is None:
+        print("The recordings match for all {} ticks".format(len(first.hashes)))
+        return None
+    print("The recordings diverge at tick {}".format(tick + 1))
+    if tick < len(first.actions) and tick < len(second.actions):
+        if first.actions[tick] != second.actions[tick]:
+            print("Actions: {} and {}".format(first.actions[tick], second.actions[tick]))
+        before = describe_difference(first.replay(tick).snapshot(), second.replay(tick).snapshot())
+        after = describe_difference(first.replay(tick + 1).snapshot(), second.replay(tick + 1).snapshot())
+        print("Different before the tick: {}".format(", ".join(before) or "nothing"))
+        print("Different after the tick: {}".format(", ".join(after) or "nothing"))
+    return tick
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the first tick at which two recorded games diverge.")
+    parser.add_argument("first", help="the first recording")
+    parser.add_argument("second", help="the second recording")
+    arguments = parser.parse_args()
+    bisect(Recording.load(arguments.first), Recording.load(arguments.second))
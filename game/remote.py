@@ -0,0 +1,221 @@
+import argparse
+import os
+import socket
+import socketserver
+import struct
+from multiprocessing import Process
+from types import SimpleNamespace
+from typing import List, Tuple, Callable, Type
+
+import numpy as np
+
+from game.agent import Action, BatchedAgent, BatchPolicy
+from game.entities import Ship
+from game.perception import Perception, VectorPerception
+
+from agents.decide import attack_nearest_asteroid
+
+
+SHIP_STATE = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'facing', 'thrust', 'turn_speed', 'height')
+ASTEROID_STATE = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'radius')
+
+# A request is its length in bytes, the number of observations and the number of asteroids in all of them,
+# followed by the state of each ship, the number of asteroids seen by each ship and the state of every asteroid.
+# A reply is the value of the action for each observation.
+HEADER = struct.Struct('<III')
+
+# Decides the actions for a batch from the ship states, the number of asteroids seen by each ship and the asteroids
+BatchFunction = Callable[[np.ndarray, np.ndarray, np.ndarray], List[Action]]
+
+
+def encode_request(observations: List[Tuple[np.ndarray, np.ndarray]]) -> bytes:
+    """
+    :param observations: The observations of a batch of ships, each a row of its SHIP_STATE and an array of rows of
+     the ASTEROID_STATE of the asteroids it sees.
+    :return: The request for the actions of the ships.
+    """
+    ships = np.array([ship for ship, _ in observations], dtype='<f8').reshape(-1, len(SHIP_STATE))
+    counts = np.array([len(asteroids) for _, asteroids in observations], dtype='<u4')
+    asteroids = np.concatenate([asteroids for _, asteroids in observations]).astype('<f8') if observations \
+        else np.empty((0, len(ASTEROID_STATE)))
+    body = ships.tobytes() + counts.tobytes() + asteroids.tobytes()
+    return HEADER.pack(HEADER.size + len(body), len(ships), len(asteroids)) + body
+
+
+def decode_request(body: bytes, num_of_ships: int, num_of_asteroids: int) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param body: The request after its header.
+    :param num_of_ships: The number of observations in the request.
+    :param num_of_asteroids: The number of asteroids in all of the observations.
+    :return: The ship states, the number of asteroids seen by each ship and the states of the asteroids.
+    """
+    ships = np.frombuffer(body, dtype='<f8', count=num_of_ships * len(SHIP_STATE)).reshape(-1, len(SHIP_STATE))
+    offset = ships.nbytes
+    counts = np.frombuffer(body, dtype='<u4', count=num_of_ships, offset=offset)
+    offset += counts.nbytes
+    asteroids = np.frombuffer(body, dtype='<f8', count=num_of_asteroids * len(ASTEROID_STATE),
+                              offset=offset).reshape(-1, len(ASTEROID_STATE))
+    return ships, counts, asteroids
+
+
+def receive_exactly(connection: socket.socket, size: int) -> bytes:
+    """
+    :return: The next size bytes received from the connection.
+    :raises ConnectionError: If the connection closes first.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = connection.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("The connection closed mid message")
+        received += count
+    return bytes(buffer)
+
+
+class RemotePolicy(BatchPolicy):
+    """
+    A policy that is run by another process, reached through a Unix socket. Every agent sharing the policy is
+    decided in one round trip, including agents of several games updated together with update_games.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: The path of the socket the policy server is listening on.
+        """
+        self.path = path
+        self.connection: socket.socket = None
+
+    def connect(self):
+        """ Connect to the policy server if not already connected. """
+        if self.connection is None:
+            self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.connection.connect(self.path)
+
+    def decide_batch(self, observations: List[Tuple[np.ndarray, np.ndarray]]) -> List[Action]:
+        self.connect()
+        self.connection.sendall(encode_request(observations))
+        return [Action(value) for value in receive_exactly(self.connection, len(observations))]
+
+    def close(self):
+        """ Disconnect from the policy server. """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class RemoteAgent(BatchedAgent):
+    """
+    An agent whose decisions are made by a policy in another process. Its perceptions are sent as the compact
+    state of its ship and the asteroids.
+    """
+
+    def __init__(self, ship: Ship, policy: RemotePolicy):
+        """
+        :param ship: The ship the agent is controlling.
+        :param policy: The remote policy, which should be shared by all the agents it plays.
+        """
+        super().__init__(ship, policy)
+
+    def observe(self, perception: VectorPerception) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: A row of the SHIP_STATE of the ship and an array of rows of the ASTEROID_STATE of the asteroids.
+        """
+        ship = np.array([perception.ship_state[field] for field in SHIP_STATE], dtype=np.float64)
+        return ship, perception.asteroid_array
+
+    @staticmethod
+    def get_perception_type() -> Type[Perception]:
+        return VectorPerception
+
+
+def reactive_batch(ships: np.ndarray, counts: np.ndarray, asteroids: np.ndarray) -> List[Action]:
+    """
+    A stand in policy that attacks the nearest asteroid like the ReactiveAgent.
+
+    :param ships: The states of the ships.
+    :param counts: The number of asteroids seen by each ship.
+    :param asteroids: The states of the asteroids seen by all of the ships.
+    :return: The action of each ship.
+    """
+    actions = []
+    start = 0
+    for ship_state, count in zip(ships, counts):
+        seen = asteroids[start:start + count]
+        start += count
+        ship = SimpleNamespace(**dict(zip(SHIP_STATE, ship_state.tolist())))
+        if len(seen) == 0:
+            actions.append(attack_nearest_asteroid(ship, [0, 0], 0))
+            continue
+        nearest = np.argmin(np.hypot(seen[:, 0] - ship.centre_x, seen[:, 1] - ship.centre_y))
+        actions.append(attack_nearest_asteroid(ship, seen[nearest, :2].tolist(), seen[nearest, 4]))
+    return actions
+
+
+class PolicyServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Serves the decisions of a batch function to RemotePolicy clients over a Unix socket. """
+    daemon_threads = True
+
+    def __init__(self, path: str, decide: BatchFunction = reactive_batch):
+        """
+        :param path: The path of the socket to listen on, replacing any socket already there.
+        :param decide: Decides the actions of each batch.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        self.decide = decide
+        super().__init__(path, PolicyRequestHandler)
+
+
+class PolicyRequestHandler(socketserver.BaseRequestHandler):
+    """ Answers the requests of one client until it disconnects. """
+
+    def handle(self):
+        while True:
+            try:
+                size, num_of_ships, num_of_asteroids = HEADER.unpack(receive_exactly(self.request, HEADER.size))
+                body = receive_exactly(self.request, size - HEADER.size)
+            except ConnectionError:
+                return
+            actions = self.server.decide(*decode_request(body, num_of_ships, num_of_asteroids))
+            self.request.sendall(bytes(action.value for action in actions))
+
+
+def serve(path: str, decide: BatchFunction = reactive_batch):
+    """
+    Run a policy server until the process is stopped.
+
+    :param path: The path of the socket to listen on.
+    :param decide: Decides the actions of each batch.
+    """
+    with PolicyServer(path, decide) as server:
+        server.serve_forever()
+
+
+def start_server(path: str, decide: BatchFunction = reactive_batch) -> Process:
+    """
+    Run a policy server in a new process, e.g. as a local stand in for an external policy.
+
+    :param path: The path of the socket to listen on.
+    :param decide: Decides the actions of each batch, which must be picklable.
+    :return: The process, which is ready for clients once this returns.
+    """
+    process = Process(target=serve, args=(path, decide), daemon=True)
+    process.start()
+    while True:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+                return process
+            except OSError:
+                if not process.is_alive():
+                    raise RuntimeError("The policy server stopped before listening")
+                process.join(0.01)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the stand in reactive policy to remote agents.")
+    parser.add_argument("path", help="The path of the socket to listen on.")
+    serve(parser.parse_args().path)
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+from functools import lru_cache
+from time import time
+from typing import Dict, List, Any, NamedTuple, Sequence, Tuple
+
+from game.config import GameConfig
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY,
+    agent TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    config TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    points REAL NOT NULL,
+    ticks INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    over INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    code_version TEXT NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episodes_by_agent_config ON episodes (agent, config, parameters, points, ticks);
+CREATE INDEX IF NOT EXISTS episodes_by_code_version ON episodes (code_version, agent);
+CREATE INDEX IF NOT EXISTS episodes_by_seed ON episodes (seed, agent);
+"""
+# The columns that can be grouped by in summaries
+GROUP_COLUMNS = ('agent', 'parameters', 'config', 'code_version', 'seed', 'over')
+
+
+class EpisodeResult(NamedTuple):
+    """ The outcome of a headless game and what it was played with. """
+    agent: str
+    parameters: Dict[str, Any]
+    config: Dict[str, Any]
+    seed: int
+    points: float
+    ticks: int
+    level: int
+    over: bool
+    seconds: float
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    :return: The git commit the code is at, ending in -dirty if there are changes not committed, or unknown if it is
+     not in a git repository.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        changes = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "-dirty" if changes else commit
+
+
+def agent_name(agent_type) -> str:
+    """
+    :param agent_type: A type of agent.
+    :return: Its module and name, as taken by import_agent.
+    """
+    return "{}.{}".format(agent_type.__module__, agent_type.__qualname__)
+
+
+def canonical_json(values: Dict[str, Any]) -> str:
+    """
+    :return: The values as JSON with sorted keys, so equal values are stored as equal text and grouped together.
+    """
+    return json.dumps(values, sort_keys=True)
+
+
+class ResultStore:
+    """
+    The results of headless games in an SQLite database. Results are buffered and written in batches, each in one
+    transaction, and the database is in write ahead log mode, so many processes can write to it and read it at once
+    while waiting on each other rarely. Results are indexed by agent and config for summaries, and by code version
+    and seed.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, timeout: float = 60):
+        """
+        Open the database, creating it if needed.
+
+        :param path: The database file.
+        :param batch_size: The number of results buffered before they are written.
+        :param timeout: The seconds to wait for another process writing to the database.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.pending: List[Tuple] = []
+
+    def add(self, result: EpisodeResult):
+        """
+        Buffer a result, writing the buffer once it is full.
+
+        :param result: The result.
+        """
+        self.pending.append((result.agent, canonical_json(result.parameters), canonical_json(result.config),
+                             result.seed, result.points, result.ticks, result.level, int(result.over),
+                             result.seconds, code_version(), time()))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Write the buffered results in one transaction. """
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO episodes (agent, parameters, config, seed, points, ticks, level, over, seconds, "
+                "code_version, recorded) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def summary(self, group_by: Sequence[str] = ('agent', 'config'), where: str = None,
+                arguments: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """
+        Summarise the results in groups.
+
+        :param group_by: The columns to group by, from GROUP_COLUMNS.
+        :param where: An SQL condition on the results to include, e.g. "code_version = ?".
+        :param arguments: The values of the placeholders of the condition.
+        :return: For each group its columns, the number of episodes, the mean and standard deviation of the points,
+         the mean ticks and level and the total seconds played, best mean points first.
+        :raises ValueError: If a column cannot be grouped by.
+        """
+        for column in group_by:
+            if column not in GROUP_COLUMNS:
+                raise ValueError("Cannot group by {}".format(column))
+        self.flush()
+        columns = ", ".join(group_by)
+        cursor = self.connection.execute(
+            "SELECT {0}, COUNT(*), AVG(points), AVG(points * points), AVG(ticks), AVG(level), SUM(seconds) "
+            "FROM episodes {1} GROUP BY {0} ORDER BY AVG(points) DESC".format(
+                columns, "WHERE " + where if where else ""), tuple(arguments))
+        summaries = []
+        for row in cursor:
+            summary = dict(zip(group_by, row))
+            episodes, mean, mean_square, ticks, level, seconds = row[len(group_by):]
+            summary.update(episodes=episodes, mean_points=mean, std_points=max(mean_square - mean * mean, 0) ** 0.5,
+                           mean_ticks=ticks, mean_level=level, seconds=seconds)
+            summaries.append(summary)
+        return summaries
+
+    def close(self):
+        """ Write the buffered results and close the database. """
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the results of headless games in a result store.")
+    parser.add_argument("database")
+    parser.add_argument("--group-by", nargs="+", default=["agent", "config"], choices=GROUP_COLUMNS)
+    parser.add_argument("--code-version", default=None, help="only the results of this code version")
+    arguments = parser.parse_args()
+    with ResultStore(arguments.database) as store:
+        defaults = GameConfig().to_dict()
+        condition = ("code_version = ?", (arguments.code_version,)) if arguments.code_version else (None, ())
+        for group in store.summary(arguments.group_by, *condition):
+            if 'config' in group:
+                # Only show the values of the config that differ from the defaults
+                config = json.loads(group['config'])
+                group['config'] = {name: value for name, value in config.items() if defaults.get(name) != value}
+            print(group)
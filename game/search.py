@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import random
+from multiprocessing import Pool
+from typing import Dict, List, Tuple, Type, Iterable, Optional
+
+import numpy as np
+
+from game.agent import Agent
+from game.evaluation import Parameters, Episode, play_episode, import_agent, store_episode
+from game.results import ResultStore, agent_name
+
+ParameterSpace = Dict[str, Tuple[float, float]]
+
+
+def _evaluate_task(task: Tuple[Type[Agent], Parameters, int, int]) -> Episode:
+    """ Play an episode of a task in a process of the pool. """
+    return play_episode(*task)
+
+
+def cache_key(parameters: Parameters, seed: int) -> str:
+    """
+    :return: The key of the fitness of the parameters on the seed in the cache.
+    """
+    return json.dumps([sorted(parameters.items()), seed])
+
+
+class PopulationSearch:
+    """
+    Search the parameters of an agent with a simple evolution strategy. Each generation every candidate plays the
+    same seeded headless games on a pool of processes and the fittest are kept and mutated to fill the next
+    generation. Candidates that are clearly worse than the rest after the first few games are culled without
+    playing the remaining games, the points of every game played are cached by parameters and seed so no game is
+    played twice, and the search is saved after every generation so it can carry on after being stopped.
+    """
+
+    def __init__(self, agent_type: Type[Agent], space: ParameterSpace, population_size: int = 32,
+                 seeds: Iterable[int] = range(8), elite: int = 4, mutation: float = 0.1, cull_after: int = 2,
+                 cull_fraction: float = 0.5, max_ticks: int = 20000, checkpoint: str = None, seed: int = 0,
+                 processes: int = None, store: ResultStore = None):
+        """
+        :param agent_type: The type of agent to search the parameters of.
+        :param space: The lowest and highest value of each parameter.
+        :param population_size: The number of candidates in each generation.
+        :param seeds: The seeds of the games each candidate plays.
+        :param elite: The number of the fittest candidates carried over unchanged to the next generation.
+        :param mutation: The standard deviation of mutations, as a fraction of the range of each parameter.
+        :param cull_after: The number of games played before the least fit candidates are culled.
+        :param cull_fraction: The fraction of candidates culled.
+        :param max_ticks: The number of ticks after which a game is stopped if still in play.
+        :param checkpoint: The file to save the search to after every generation and resume it from.
+        :param seed: The seed of the search.
+        :param processes: The number of processes, defaulting to the number of cores.
+        :param store: A store to add the result of every game played to, if any.
+        """
+        self.agent_type = agent_type
+        self.space = space
+        self.population_size = population_size
+        self.seeds = list(seeds)
+        self.elite = elite
+        self.mutation = mutation
+        self.cull_after = cull_after
+        self.cull_fraction = cull_fraction
+        self.max_ticks = max_ticks
+        self.checkpoint = checkpoint
+        self.processes = processes
+        self.store = store
+        self.rng = random.Random(seed)
+        self.generation = 0
+        self.cache: Dict[str, float] = {}
+        self.population: List[Parameters] = [self.random_parameters() for _ in range(population_size)]
+        self.history: List[Tuple[Parameters, float]] = []
+
+    def random_parameters(self) -> Parameters:
+        """
+        :return: Parameters chosen uniformly from the space.
+        """
+        return {name: self.rng.uniform(low, high) for name, (low, high) in self.space.items()}
+
+    def mutate(self, parameters: Parameters) -> Parameters:
+        """
+        :return: A copy of the parameters with gaussian noise added, kept within the space.
+        """
+        return {name: min(max(parameters[name] + self.rng.gauss(0, self.mutation * (high - low)), low), high)
+                for name, (low, high) in self.space.items()}
+
+    def crossover(self, first: Parameters, second: Parameters) -> Parameters:
+        """
+        :return: Parameters taking each value from either of two parents.
+        """
+        return {name: (first if self.rng.random() < 0.5 else second)[name] for name in self.space}
+
+    def evaluate(self, pool, candidates: List[Parameters], seeds: List[int]):
+        """
+        Play every game of the candidates on the seeds that is not already in the cache.
+
+        :param pool: The pool of processes to play on.
+        :param candidates: The candidates.
+        :param seeds: The seeds.
+        """
+        tasks = {cache_key(parameters, seed): (self.agent_type, parameters, seed, self.max_ticks)
+                 for parameters in candidates for seed in seeds if cache_key(parameters, seed) not in self.cache}
+        keys = list(tasks)
+        for key, episode in zip(keys, pool.imap(_evaluate_task, [tasks[key] for key in keys], chunksize=1)):
+            self.cache[key] = episode.points
+            if self.store is not None:
+                _, parameters, seed, _ = tasks[key]
+                store_episode(self.store, self.agent_type, parameters, seed, episode)
+
+    def fitness(self, parameters: Parameters, seeds: List[int]) -> float:
+        """
+        :return: The mean points of the parameters over the seeds, which must have been evaluated.
+        """
+        return float(np.mean([self.cache[cache_key(parameters, seed)] for seed in seeds]))
+
+    def rank(self, pool) -> List[Tuple[Parameters, float]]:
+        """
+        Evaluate the population, culling the least fit after the first games.
+
+        :param pool: The pool of processes to play on.
+        :return: Each candidate and its fitness, fittest first. Culled candidates come after the rest.
+        """
+        early_seeds = self.seeds[:self.cull_after]
+        self.evaluate(pool, self.population, early_seeds)
+        early = sorted(self.population, key=lambda parameters: self.fitness(parameters, early_seeds), reverse=True)
+        survivors = early[:max(len(early) - int(len(early) * self.cull_fraction), self.elite, 1)]
+        culled = early[len(survivors):]
+        self.evaluate(pool, survivors, self.seeds)
+        ranked = sorted(((parameters, self.fitness(parameters, self.seeds)) for parameters in survivors),
+                        key=lambda ranking: ranking[1], reverse=True)
+        return ranked + [(parameters, self.fitness(parameters, early_seeds)) for parameters in culled]
+
+    def breed(self, ranked: List[Tuple[Parameters, float]]) -> List[Parameters]:
+        """
+        :param ranked: The candidates of this generation, fittest first.
+        :return: The candidates of the next generation: the elite and mutated offspring of the fitter half.
+        """
+        parents = [parameters for parameters, _ in ranked[:max(len(ranked) // 2, 1)]]
+        population = [parameters for parameters, _ in ranked[:self.elite]]
+        while len(population) < self.population_size:
+            population.append(self.mutate(self.crossover(self.rng.choice(parents), self.rng.choice(parents))))
+        return population
+
+    def run(self, generations: int) -> Optional[Tuple[Parameters, float]]:
+        """
+        Run the search, resuming from the checkpoint if there is one, until the number of generations is reached.
+
+        :param generations: The total number of generations to search for.
+        :return: The fittest parameters found and their fitness, or None if no generation has been searched.
+        :raises ValueError: If the checkpoint is of a search of another agent, space or number of ticks.
+        """
+        self.load()
+        with Pool(self.processes) as pool:
+            while self.generation < generations:
+                ranked = self.rank(pool)
+                self.history.append(ranked[0])
+                self.population = self.breed(ranked)
+                self.generation += 1
+                self.save()
+        if not self.history:
+            return None
+        return max(self.history, key=lambda best: best[1])
+
+    def setup(self) -> Dict:
+        """
+        :return: What the fitnesses in the cache depend on besides the parameters and seed, saved to the checkpoint.
+        """
+        return {'agent': agent_name(self.agent_type),
+                'space': {name: list(bounds) for name, bounds in sorted(self.space.items())},
+                'max_ticks': self.max_ticks}
+
+    def save(self):
+        """ Save the state of the search to the checkpoint, replacing it only once written. """
+        if self.checkpoint is None:
+            return
+        state = {'setup': self.setup(), 'generation': self.generation, 'population': self.population,
+                 'cache': self.cache, 'history': self.history, 'rng': self.rng.getstate()}
+        temporary = self.checkpoint + ".tmp"
+        with open(temporary, "w") as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temporary, self.checkpoint)
+
+    def load(self):
+        """
+        Resume the search from the checkpoint if it exists.
+
+        :raises ValueError: If the checkpoint is of a search of another agent, space or number of ticks, whose cached
+         fitnesses would not hold for this one.
+        """
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint) as checkpoint_file:
+            state = json.load(checkpoint_file)
+        if state.get('setup') != self.setup():
+            raise ValueError("The checkpoint {} is of another search: {} rather than {}".format(
+                self.checkpoint, state.get('setup'), self.setup()))
+        self.generation = state['generation']
+        self.population = state['population']
+        self.cache = state['cache']
+        self.history = [tuple(best) for best in state['history']]
+        version, internal_state, gauss_next = state['rng']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the parameters of an agent over seeded headless games.")
+    parser.add_argument("--agent", default="agents.reactive_agent.ReactiveAgent",
+                        help="the module and name of an agent class with PARAMETERS")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=32)
+    parser.add_argument("--seeds", type=int, default=8, help="games per candidate")
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--results", default=None, help="an SQLite database to add the result of every game to")
+    arguments = parser.parse_args()
+    agent_class = import_agent(arguments.agent)
+    result_store = ResultStore(arguments.results) if arguments.results else None
+    search = PopulationSearch(agent_class, agent_class.PARAMETERS, arguments.population, range(arguments.seeds),
+                              max_ticks=arguments.max_ticks, checkpoint=arguments.checkpoint, seed=arguments.seed,
+                              processes=arguments.processes, store=result_store)
+    result = search.run(arguments.generations)
+    if result_store is not None:
+        result_store.close()
+    if result is None:
+        print("No generations searched")
+    else:
+        print("Best parameters {} with {:.2f} points".format(*result))
@@ -0,0 +1,180 @@
+import mmap
+import os
+import tempfile
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from game.snapshot import SHIP_FIELDS, ASTEROID_FIELDS, PARTICLE_FIELDS, pack_ships, pack_asteroids, pack_particles
+
+MAGIC = 0x41535452
+SHIP_COLUMNS = len(SHIP_FIELDS) + 3
+ASTEROID_COLUMNS = len(ASTEROID_FIELDS) + 14
+PARTICLE_COLUMNS = len(PARTICLE_FIELDS)
+
+# Positions in the header of 64 bit integers at the start of the region
+MAGIC_INDEX, SEQUENCE, WIDTH, HEIGHT, MAX_SHIPS, MAX_ASTEROIDS, MAX_PARTICLES, TICKS, POINTS, LEVEL, STATE,\
+    NUM_OF_SHIPS, NUM_OF_ASTEROIDS, NUM_OF_PARTICLES = range(14)
+HEADER_SIZE = 16
+
+
+class Frame(NamedTuple):
+    """ A copy of the state of a game as published to shared memory. """
+    width: int
+    height: int
+    ticks: int
+    points: int
+    level: int
+    state: int
+    ships: np.ndarray
+    asteroids: np.ndarray
+    particles: np.ndarray
+
+
+def region_path(name: str) -> str:
+    """
+    :param name: The name of the shared memory region.
+    :return: The file backing the region, in memory backed /dev/shm where it is available.
+    """
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "asteroids-" + name)
+
+
+def region_size(max_ships: int, max_asteroids: int, max_particles: int) -> int:
+    """
+    :return: The size in bytes of a region with room for the given numbers of entities.
+    """
+    return 8 * (HEADER_SIZE + max_ships * SHIP_COLUMNS + max_asteroids * ASTEROID_COLUMNS +
+                max_particles * PARTICLE_COLUMNS)
+
+
+def region_arrays(buffer, max_ships: int, max_asteroids: int, max_particles: int):
+    """
+    :return: The header, ship, asteroid and particle arrays laid out over the region.
+    """
+    header = np.frombuffer(buffer, dtype=np.int64, count=HEADER_SIZE)
+    offset = 8 * HEADER_SIZE
+    ships = np.frombuffer(buffer, dtype=np.float64, count=max_ships * SHIP_COLUMNS, offset=offset)
+    offset += ships.nbytes
+    asteroids = np.frombuffer(buffer, dtype=np.float64, count=max_asteroids * ASTEROID_COLUMNS, offset=offset)
+    offset += asteroids.nbytes
+    particles = np.frombuffer(buffer, dtype=np.float64, count=max_particles * PARTICLE_COLUMNS, offset=offset)
+    return (header, ships.reshape(max_ships, SHIP_COLUMNS), asteroids.reshape(max_asteroids, ASTEROID_COLUMNS),
+            particles.reshape(max_particles, PARTICLE_COLUMNS))
+
+
+class FramePublisher:
+    """
+    Publishes the state of a game into a named shared memory region every tick, so another process can watch it.
+    Frames are guarded by a sequence number that is odd while a frame is being written, so the game never waits
+    for a reader and readers can tell when they have read a frame that was being overwritten.
+    Entities beyond the capacities of the region are not published.
+    """
+
+    def __init__(self, name: str, width: int, height: int, max_ships: int = 16, max_asteroids: int = 1024,
+                 max_particles: int = 1024):
+        """
+        Create the region.
+
+        :param name: The name of the region, for viewers to attach to.
+        :param width: The width of the game.
+        :param height: The height of the game.
+        :param max_ships: The number of ships there is room for.
+        :param max_asteroids: The number of asteroids there is room for.
+        :param max_particles: The number of particles there is room for.
+        """
+        self.path = region_path(name)
+        size = region_size(max_ships, max_asteroids, max_particles)
+        with open(self.path, "w+b") as region_file:
+            region_file.truncate(size)
+            self.region = mmap.mmap(region_file.fileno(), size)
+        self.header, self.ships, self.asteroids, self.particles = region_arrays(self.region, max_ships, max_asteroids,
+                                                                                max_particles)
+        self.header[:] = 0
+        self.header[[WIDTH, HEIGHT, MAX_SHIPS, MAX_ASTEROIDS, MAX_PARTICLES]] = \
+            (width, height, max_ships, max_asteroids, max_particles)
+        self.header[MAGIC_INDEX] = MAGIC
+
+    def publish(self, game):
+        """
+        Write the current state of the game into the region. This can be added to the games tick_listeners.
+
+        :param game: The game to publish.
+        """
+        ships = pack_ships([agent.get_ship() for agent in game.agents])[:len(self.ships)]
+        asteroids = pack_asteroids(list(game.asteroids))[:len(self.asteroids)]
+        particles = pack_particles(game.particles)[:len(self.particles)]
+        header = self.header
+        header[SEQUENCE] += 1
+        self.ships[:len(ships)] = ships
+        if len(asteroids):
+            self.asteroids[:len(asteroids)] = asteroids
+        self.particles[:len(particles)] = particles
+        header[[TICKS, POINTS, LEVEL, STATE, NUM_OF_SHIPS, NUM_OF_ASTEROIDS, NUM_OF_PARTICLES]] = \
+            (game.ticks, game.points, game.level, game.state.value, len(ships), len(asteroids), len(particles))
+        header[SEQUENCE] += 1
+
+    def close(self):
+        """ Remove the region. Viewers that are attached keep their view of the last frame. """
+        self.header = self.ships = self.asteroids = self.particles = None
+        self.region.close()
+        os.remove(self.path)
+
+
+def publish_game(game, name: str, **capacities) -> FramePublisher:
+    """
+    Publish the state of a game under a name after every tick it plays, for game.viewer to watch.
+
+    :param game: The game to publish.
+    :param name: The name of the region.
+    :param capacities: The max_ships, max_asteroids and max_particles of the region, if not the defaults.
+    :return: The publisher, to close once the game is done with.
+    """
+    publisher = FramePublisher(name, game.window_width, game.window_height, **capacities)
+    game.tick_listeners.append(publisher.publish)
+    return publisher
+
+
+class FrameReader:
+    """ Reads the frames published to a named shared memory region by a FramePublisher in another process. """
+
+    def __init__(self, name: str):
+        """
+        Attach to the region.
+
+        :param name: The name of the region.
+        :raises FileNotFoundError: If nothing has been published with that name.
+        """
+        with open(region_path(name), "rb") as region_file:
+            self.region = mmap.mmap(region_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.region, dtype=np.int64, count=HEADER_SIZE)
+        if header[MAGIC_INDEX] != MAGIC:
+            raise ValueError("Not a published game: {}".format(name))
+        self.header, self.ships, self.asteroids, self.particles = region_arrays(
+            self.region, int(header[MAX_SHIPS]), int(header[MAX_ASTEROIDS]), int(header[MAX_PARTICLES]))
+
+    def read(self, attempts: int = 100) -> Optional[Frame]:
+        """
+        Copy the latest completely written frame.
+
+        :param attempts: The number of times to try before giving up if frames keep being written while reading.
+        :return: The frame, or None if none could be read.
+        """
+        header = self.header
+        for _ in range(attempts):
+            sequence = int(header[SEQUENCE])
+            if sequence % 2 == 1:
+                continue
+            values = header.copy()
+            frame = Frame(int(values[WIDTH]), int(values[HEIGHT]), int(values[TICKS]), int(values[POINTS]),
+                          int(values[LEVEL]), int(values[STATE]), self.ships[:values[NUM_OF_SHIPS]].copy(),
+                          self.asteroids[:values[NUM_OF_ASTEROIDS]].copy(),
+                          self.particles[:values[NUM_OF_PARTICLES]].copy())
+            if int(header[SEQUENCE]) == sequence and int(values[SEQUENCE]) == sequence:
+                return frame
+        return None
+
+    def close(self):
+        """ Detach from the region. """
+        self.header = self.ships = self.asteroids = self.particles = None
+        self.region.close()
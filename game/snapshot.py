@@ -0,0 +1,136 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from game.entities import Ship, Asteroid, Particle, TurnState, BoostState
+
+
+SHIP_FIELDS = ('facing', 'centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'height', 'turn_speed', 'thrust',
+               'thrust_max', 'thrust_incr', 'particle_canon_speed', 'reload_time')
+ASTEROID_FIELDS = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y', 'radius')
+PARTICLE_FIELDS = ('centre_x', 'centre_y', 'velocity_x', 'velocity_y')
+
+
+class GameSnapshot:
+    """
+    The state of a game at one point, copied into a few arrays and numbers so that it is independent of the
+    game it came from. The state of each ship is a row of its SHIP_FIELDS followed by its turn state, boost state
+    and the seconds since its canon fired; each asteroid is a row of its ASTEROID_FIELDS followed by its points and
+    each particle a row of its PARTICLE_FIELDS.
+    """
+    __slots__ = ('ticks', 'points', 'level', 'state', 'seconds_between_asteroid_generation',
+                 'seconds_to_next_asteroid', 'rng_state', 'ships', 'alive', 'asteroids', 'particles', 'world_hash')
+
+    def __init__(self, ticks: int, points: int, level: int, state, seconds_between_asteroid_generation: float,
+                 seconds_to_next_asteroid: float, rng_state: Tuple, ships: np.ndarray, alive: np.ndarray,
+                 asteroids: np.ndarray, particles: np.ndarray, world_hash: int = 0):
+        """
+        :param ticks: The number of ticks played.
+        :param points: The points scored.
+        :param level: The level reached.
+        :param state: The GameState of the game.
+        :param seconds_between_asteroid_generation: The seconds between new asteroids.
+        :param seconds_to_next_asteroid: The seconds until the next asteroid is created.
+        :param rng_state: The state of the games random number generator.
+        :param ships: The state of the ship of every agent that started the game.
+        :param alive: Whether each of those ships is still in the game.
+        :param asteroids: The state of the asteroids.
+        :param particles: The state of the particles.
+        :param world_hash: The rolling hash of the game.
+        """
+        self.ticks = ticks
+        self.points = points
+        self.level = level
+        self.state = state
+        self.seconds_between_asteroid_generation = seconds_between_asteroid_generation
+        self.seconds_to_next_asteroid = seconds_to_next_asteroid
+        self.rng_state = rng_state
+        self.ships = ships
+        self.alive = alive
+        self.asteroids = asteroids
+        self.particles = particles
+        self.world_hash = world_hash
+
+
+def pack_ships(ships: List[Ship]) -> np.ndarray:
+    """
+    :param ships: The ships.
+    :return: An array with a row of the state of each ship.
+    """
+    return np.array([[getattr(ship, field) for field in SHIP_FIELDS] +
+                     [ship.turn_state.value, ship.boost_state.value, ship.clock() - ship.last_fire_time]
+                     for ship in ships], dtype=np.float64).reshape(len(ships), len(SHIP_FIELDS) + 3)
+
+
+def unpack_ship(row: np.ndarray, ship: Ship):
+    """
+    Set the state of a ship from a row packed by pack_ships.
+
+    :param row: The state of the ship.
+    :param ship: The ship to set the state of.
+    """
+    values = row.tolist()
+    for field, value in zip(SHIP_FIELDS, values):
+        setattr(ship, field, value)
+    ship.turn_state = TurnState(int(values[-3]))
+    ship.boost_state = BoostState(int(values[-2]))
+    ship.last_fire_time = ship.clock() - values[-1]
+
+
+def pack_asteroids(asteroids: List[Asteroid]) -> np.ndarray:
+    """
+    :param asteroids: The asteroids.
+    :return: An array with a row of the state of each asteroid.
+    """
+    if not asteroids:
+        return np.empty((0, len(ASTEROID_FIELDS)), dtype=np.float64)
+    return np.array([[asteroid.centre_x, asteroid.centre_y, asteroid.velocity_x, asteroid.velocity_y,
+                      asteroid.radius] + asteroid.points for asteroid in asteroids], dtype=np.float64)
+
+
+def unpack_asteroids(array: np.ndarray, asteroids: List[Asteroid]):
+    """
+    Set the asteroids in the list to those packed by pack_asteroids, reusing the asteroids already in the list and
+    returning any left over to the pool.
+
+    :param array: The state of the asteroids.
+    :param asteroids: The list of asteroids to set.
+    """
+    rows = array.tolist()
+    fields = len(ASTEROID_FIELDS)
+    for asteroid in asteroids[len(rows):]:
+        asteroid.release()
+    del asteroids[len(rows):]
+    for index, row in enumerate(rows):
+        if index < len(asteroids):
+            asteroids[index].reset(*row[:fields], None, row[fields:])
+        else:
+            asteroids.append(Asteroid.create(*row[:fields], None, row[fields:]))
+
+
+def pack_particles(particles: List[Particle]) -> np.ndarray:
+    """
+    :param particles: The particles.
+    :return: An array with a row of the state of each particle.
+    """
+    return np.array([[particle.centre_x, particle.centre_y, particle.velocity_x, particle.velocity_y]
+                     for particle in particles], dtype=np.float64).reshape(len(particles), len(PARTICLE_FIELDS))
+
+
+def unpack_particles(array: np.ndarray, particles: List[Particle]):
+    """
+    Set the particles in the list to those packed by pack_particles, reusing the particles already in the list and
+    returning any left over to the pool.
+
+    :param array: The state of the particles.
+    :param particles: The list of particles to set.
+    """
+    rows = array.tolist()
+    for particle in particles[len(rows):]:
+        particle.release()
+    del particles[len(rows):]
+    for index, row in enumerate(rows):
+        if index < len(particles):
+            particles[index].reset(*row)
+        else:
+            particles.append(Particle.create(*row))
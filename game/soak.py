@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import List, Type, Dict, Any, NamedTuple, Optional
+
+import numpy as np
+
+from game.agent import Agent
+from game.config import GameConfig, OVERFLOW_POLICIES
+from game.control import GameState
+from game.evaluation import import_agent
+from game.headless import create_game
+
+
+class Sample(NamedTuple):
+    """ The memory of the process and the size of the game at a point in a soak test. """
+    seconds: float
+    rss_mb: float
+    traced_mb: float
+    ticks: int
+    episodes: int
+    asteroids: int
+    particles: int
+
+
+def rss_mb() -> float:
+    """
+    :return: The resident set size of the process in megabytes, or its peak where the current size is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        # The peak is in bytes on macOS, which has no /proc, and in kilobytes elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def max_spawn_config(config: GameConfig = None) -> GameConfig:
+    """
+    :param config: The config to start from, the defaults if not given.
+    :return: The config with asteroids created as often as they ever are from the start of a game.
+    """
+    config = config if config is not None else GameConfig()
+    return config.with_values(seconds_between_asteroids=config.min_seconds_between_asteroids)
+
+
+def soak(agent_types: List[Type[Agent]], duration: float, config: GameConfig = None, seed: int = 0,
+         sample_interval: float = 1, warm_up: float = 10, trace: bool = True, frames: int = 1,
+         top: int = 20) -> Dict[str, Any]:
+    """
+    Play headless games one after another for a length of time, with asteroids created at the highest rate, to find
+    memory that grows the longer games run. The resident set size is sampled throughout, and with trace the
+    allocations are traced by tracemalloc, which makes the games several times slower, and compared between the end
+    of the warm up and the end of the test to find where memory grew.
+
+    :param agent_types: The types of agent to play the games.
+    :param duration: The seconds to play for, after the warm up.
+    :param config: The config of the games, which is changed to create asteroids at the highest rate.
+    :param seed: The seed of the first game, the seed of each game after being one more.
+    :param sample_interval: The seconds between samples.
+    :param warm_up: The seconds to play before the memory is taken as the baseline.
+    :param trace: Whether to trace allocations.
+    :param frames: The number of frames of each traceback traced, more telling apart where allocations come from.
+    :param top: The number of allocation sites reported.
+    :return: The samples, the growth of the resident set size over the test in megabytes per hour, and the allocation
+     sites that grew the most, each a traceback from the allocation outwards, with their growth in kilobytes and
+     number of blocks.
+    """
+    config = max_spawn_config(config)
+    if trace:
+        tracemalloc.start(frames)
+    samples: List[Sample] = []
+    baseline: Optional[tracemalloc.Snapshot] = None
+    ticks = episodes = 0
+    game = create_game(agent_types, seed, config=config)
+    start = perf_counter()
+    next_sample = start
+    while True:
+        now = perf_counter()
+        if now >= next_sample:
+            if baseline is None and now - start >= warm_up and trace:
+                baseline = tracemalloc.take_snapshot()
+            traced_mb = tracemalloc.get_traced_memory()[0] / 2 ** 20 if trace else 0.0
+            samples.append(Sample(now - start, rss_mb(), traced_mb, ticks, episodes, len(game.asteroids),
+                                  len(game.particles)))
+            next_sample += sample_interval
+            if now - start >= warm_up + duration:
+                break
+        game.step()
+        ticks += 1
+        if game.state is GameState.OVER:
+            episodes += 1
+            game = create_game(agent_types, seed + episodes, config=config)
+
+    growth: List[Dict[str, Any]] = []
+    if trace:
+        if baseline is not None:
+            statistics = tracemalloc.take_snapshot().compare_to(baseline, "traceback" if frames > 1 else "lineno")
+            growth = [{'site': [str(frame) for frame in reversed(statistic.traceback)],
+                       'kb': statistic.size_diff / 1024,
+                       'blocks': statistic.count_diff} for statistic in statistics[:top]]
+        tracemalloc.stop()
+    after_warm_up = [sample for sample in samples if sample.seconds >= warm_up]
+    slope = 0.0
+    if len(after_warm_up) > 1:
+        seconds = np.array([sample.seconds for sample in after_warm_up])
+        slope = float(np.polyfit(seconds, [sample.rss_mb for sample in after_warm_up], 1)[0]) * 3600
+    return {'samples': [sample._asdict() for sample in samples], 'rss_mb_per_hour': slope, 'growth': growth,
+            'ticks': ticks, 'episodes': episodes, 'config': config.to_dict()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless games at the highest asteroid rate for a length of "
+                                                 "time and report how memory grows.")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds to play after the warm up")
+    parser.add_argument("--warm-up", type=float, default=10)
+    parser.add_argument("--agent", default="agents.reactive_agent.ReactiveAgent")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=float, default=1, help="seconds between samples")
+    parser.add_argument("--max-asteroids", type=int, default=0, help="the cap on live asteroids, 0 for none")
+    parser.add_argument("--max-particles", type=int, default=0, help="the cap on live particles, 0 for none")
+    parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default="drop_new")
+    parser.add_argument("--no-trace", action="store_true", help="only sample the resident set size")
+    parser.add_argument("--frames", type=int, default=1, help="frames traced for each allocation")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="a JSON file to write the report to")
+    arguments = parser.parse_args()
+    soak_config = GameConfig(max_asteroids=arguments.max_asteroids, asteroid_overflow=arguments.overflow,
+                             max_particles=arguments.max_particles, particle_overflow=arguments.overflow)
+    report = soak([import_agent(arguments.agent)], arguments.duration, soak_config, arguments.seed,
+                  arguments.interval, arguments.warm_up, not arguments.no_trace, arguments.frames, arguments.top)
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=4)
+    last = report['samples'][-1]
+    print("{} ticks, {} episodes, RSS {:.1f}MB growing {:.2f}MB an hour".format(
+        report['ticks'], report['episodes'], last['rss_mb'], report['rss_mb_per_hour']))
+    for site in report['growth']:
+        print("{:+10.1f}KB {:+8d} blocks {}".format(site['kb'], site['blocks'], " <- ".join(site['site'])))
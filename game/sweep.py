@@ -0,0 +1,113 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from time import perf_counter
+from typing import Dict, List, Any, Iterable
+
+from game import telemetry
+from game.config import GameConfig
+from game.evaluation import import_agent
+from game.headless import create_game
+from game.results import ResultStore, EpisodeResult
+from game.telemetry import Telemetry
+
+# The columns of the results table after the values of the config
+RESULT_COLUMNS = ('agent', 'seed', 'points', 'level', 'ticks', 'over', 'seconds', 'ms_per_tick', 'peak_asteroids',
+                  'peak_particles')
+
+
+def config_grid(base: GameConfig, grid: Dict[str, List[Any]]) -> List[GameConfig]:
+    """
+    :param base: The config to vary.
+    :param grid: The values to try for each value of the config that is varied.
+    :return: A config for every combination of the values.
+    """
+    names = list(grid)
+    return [base.with_values(**dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def run_sweep_task(task) -> Dict[str, Any]:
+    """
+    Play one headless game of the sweep.
+
+    :param task: The config values, seed, agent path and tick cap of the game.
+    :return: A row of the results table.
+    """
+    config_values, seed, agent_path, max_ticks = task
+    game = create_game([import_agent(agent_path)], seed, config=GameConfig.from_dict(config_values))
+    telemetry.attach(game)
+    peak_asteroids = peak_particles = 0
+    done = False
+    start = perf_counter()
+    while not done and game.ticks < max_ticks:
+        _, done, info = game.step()
+        peak_asteroids = max(peak_asteroids, info['asteroids'])
+        peak_particles = max(peak_particles, info['particles'])
+    seconds = perf_counter() - start
+    row = dict(config_values)
+    row.update(agent=agent_path, seed=seed, points=game.points, level=game.level, ticks=game.ticks, over=done,
+               seconds=seconds, ms_per_tick=1000 * seconds / max(game.ticks, 1), peak_asteroids=peak_asteroids,
+               peak_particles=peak_particles)
+    return row
+
+
+def sweep(configs: List[GameConfig], seeds: Iterable[int], agent_paths: List[str], output: str,
+          max_ticks: int = 20000, processes: int = None, metrics: Telemetry = None, store: ResultStore = None) -> int:
+    """
+    Play every config with every agent on every seed across a pool of processes, writing a row of the results
+    table of each game to a CSV file as soon as it finishes.
+
+    :param configs: The configs.
+    :param seeds: The seeds.
+    :param agent_paths: The module and name of each agent class.
+    :param output: The CSV file to write.
+    :param max_ticks: The number of ticks after which a game is stopped if still in play.
+    :param processes: The number of processes, defaulting to the number of cores.
+    :param metrics: Telemetry to record the games of the workers in, with a slot for each process.
+    :param store: A store to add the result of every game to, if any.
+    :return: The number of games played.
+    """
+    tasks = [(config.to_dict(), seed, agent_path, max_ticks)
+             for config in configs for seed in seeds for agent_path in agent_paths]
+    config_names = list(GameConfig().to_dict())
+    columns = config_names + list(RESULT_COLUMNS)
+    initializer, initargs = (telemetry.enable, (metrics,)) if metrics is not None else (None, ())
+    with open(output, "w", newline="") as output_file, Pool(processes, initializer, initargs) as pool:
+        writer = csv.DictWriter(output_file, columns)
+        writer.writeheader()
+        for row in pool.imap_unordered(run_sweep_task, tasks):
+            writer.writerow(row)
+            if store is not None:
+                store.add(EpisodeResult(row['agent'], {}, {name: row[name] for name in config_names}, row['seed'],
+                                        row['points'], row['ticks'], row['level'], row['over'], row['seconds']))
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a grid of game configs with agents on seeded headless games.")
+    parser.add_argument("output", help="the CSV file to write the results to")
+    parser.add_argument("--grid", default="{}",
+                        help='the values of the config to try as JSON, e.g. {"spawn_decay": [1.1, 1.25, 1.5]}')
+    parser.add_argument("--config", default=None, help="a JSON file of the config to vary")
+    parser.add_argument("--agents", nargs="+", default=["agents.reactive_agent.ReactiveAgent"])
+    parser.add_argument("--seeds", type=int, default=8, help="games per config and agent")
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--telemetry-port", type=int, default=None,
+                        help="serve live metrics of the games as JSON on this port of localhost")
+    parser.add_argument("--results", default=None, help="an SQLite database to add the result of every game to")
+    arguments = parser.parse_args()
+    base_config = GameConfig.load(arguments.config) if arguments.config else GameConfig()
+    sweep_metrics = None
+    if arguments.telemetry_port is not None:
+        sweep_metrics = Telemetry(arguments.processes or os.cpu_count())
+        print("Serving metrics on http://{}:{}/".format(*sweep_metrics.serve(arguments.telemetry_port)))
+    result_store = ResultStore(arguments.results) if arguments.results else None
+    played = sweep(config_grid(base_config, json.loads(arguments.grid)), range(arguments.seeds), arguments.agents,
+                   arguments.output, arguments.max_ticks, arguments.processes, sweep_metrics, result_store)
+    if result_store is not None:
+        result_store.close()
+    print("Played {} games".format(played))
@@ -0,0 +1,216 @@
+import argparse
+import ctypes
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from multiprocessing import RawArray, Value
+from time import perf_counter, time
+from typing import Dict, Any, Optional, Tuple
+from urllib.request import urlopen
+
+from game.control import Game, GameState
+
+# The counters of each slot, which only ever increase
+COUNTERS = ('ticks', 'episodes', 'episode_points', 'decisions', 'tick_seconds', 'perceive_seconds',
+            'decide_seconds', 'move_seconds', 'collide_seconds')
+# The gauges of each slot, the state of the last game ticked
+GAUGES = ('asteroids', 'particles', 'level', 'points')
+FIELDS = COUNTERS + GAUGES
+# The phases of a tick timed by a slot, in the order they happen
+PHASES = ('perceive', 'decide', 'move', 'collide')
+(TICKS, EPISODES, EPISODE_POINTS, DECISIONS, TICK_SECONDS, PERCEIVE_SECONDS, DECIDE_SECONDS, MOVE_SECONDS,
+ COLLIDE_SECONDS, ASTEROIDS, PARTICLES, LEVEL, POINTS) = range(len(FIELDS))
+
+
+class TelemetrySlot:
+    """
+    The metrics written by one process. Each slot has a single writer, the game loop of its process, so it is
+    written without locks and read by the server as it is, a read at worst mixing the values of two ticks.
+    """
+
+    def __init__(self, values):
+        """
+        :param values: The shared values of the slot, in the order of FIELDS.
+        """
+        self.values = values
+        self.tick_start = 0.0
+        self.phase_start = 0.0
+
+    def attach(self, game: Game):
+        """
+        Record the metrics of a game every tick.
+
+        :param game: The game.
+        """
+        game.telemetry = self
+        game.tick_listeners.append(self.tick)
+
+    def start(self):
+        """ Start timing a tick. """
+        self.tick_start = self.phase_start = perf_counter()
+
+    def lap(self, field: int):
+        """
+        Add the time since the last phase ended to a phase.
+
+        :param field: The field of the phase, e.g. PERCEIVE_SECONDS.
+        """
+        now = perf_counter()
+        self.values[field] += now - self.phase_start
+        self.phase_start = now
+
+    def perceived(self):
+        """ End the perceive phase of a tick. """
+        self.lap(PERCEIVE_SECONDS)
+
+    def decided(self):
+        """ End the decide phase of a tick. """
+        self.lap(DECIDE_SECONDS)
+
+    def moved(self):
+        """ End the phase of a tick in which the ships act and move. """
+        self.lap(MOVE_SECONDS)
+
+    def collided(self):
+        """ End the phase of a tick in which collisions are found and the other entities move. """
+        self.lap(COLLIDE_SECONDS)
+
+    def tick(self, game: Game):
+        """
+        Record a tick that has just been played. This is added to the tick_listeners of the game by attach.
+
+        :param game: The game.
+        """
+        values = self.values
+        values[TICK_SECONDS] += perf_counter() - self.tick_start
+        values[TICKS] += 1
+        values[DECISIONS] += len(game.decisions)
+        values[ASTEROIDS] = len(game.asteroids)
+        values[PARTICLES] = len(game.particles)
+        values[LEVEL] = game.level
+        values[POINTS] = game.points
+        if game.state is GameState.OVER:
+            values[EPISODES] += 1
+            values[EPISODE_POINTS] += game.points
+
+
+class Telemetry:
+    """
+    Live metrics of games played in this process and in any worker processes, kept in shared memory with a slot
+    for each process and served as JSON over HTTP from a background thread.
+    """
+
+    def __init__(self, slots: int = 1):
+        """
+        :param slots: The number of processes that can write metrics, this one and its workers.
+        """
+        self.slots = slots
+        self.values = RawArray(ctypes.c_double, slots * len(FIELDS))
+        self.claimed = Value(ctypes.c_int, 0)
+        self.started = time()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.last_sample: Tuple[float, float] = (self.started, 0.0)
+
+    def claim(self) -> TelemetrySlot:
+        """
+        :return: An unused slot for the calling process to write to.
+        :raises RuntimeError: If every slot has been claimed.
+        """
+        with self.claimed.get_lock():
+            index = self.claimed.value
+            if index >= self.slots:
+                raise RuntimeError("All {} telemetry slots have been claimed".format(self.slots))
+            self.claimed.value += 1
+        size = ctypes.sizeof(ctypes.c_double)
+        return TelemetrySlot((ctypes.c_double * len(FIELDS)).from_buffer(self.values, index * len(FIELDS) * size))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        :return: The counters summed over the slots, the rate of ticks overall and since the last call, the mean time
+         of a tick and its phases and of a decision, and the gauges of each slot that has played.
+        """
+        now = time()
+        rows = [self.values[index * len(FIELDS):(index + 1) * len(FIELDS)] for index in range(self.slots)]
+        totals = {name: sum(row[field] for row in rows) for field, name in enumerate(COUNTERS)}
+        ticks = totals['ticks']
+        last_time, last_ticks = self.last_sample
+        self.last_sample = (now, ticks)
+        per_tick = 1000 / ticks if ticks else 0.0
+        return {
+            'uptime': now - self.started,
+            'ticks_per_second': ticks / max(now - self.started, 1e-9),
+            'recent_ticks_per_second': (ticks - last_ticks) / max(now - last_time, 1e-9),
+            'totals': totals,
+            'tick_ms': totals['tick_seconds'] * per_tick,
+            'phase_ms': {phase: totals[phase + '_seconds'] * per_tick for phase in PHASES},
+            'decision_ms': 1000 * totals['decide_seconds'] / totals['decisions'] if totals['decisions'] else 0.0,
+            'games': [{name: row[len(COUNTERS) + index] for index, name in enumerate(GAUGES)}
+                      for row in rows if row[TICKS]]
+        }
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> Tuple[str, int]:
+        """
+        Serve the metrics from a background thread.
+
+        :param port: The port, any free one if 0.
+        :param host: The address to listen on, only this machine by default.
+        :return: The address served on.
+        """
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(telemetry.metrics()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address
+
+    def close(self):
+        """ Stop serving the metrics. """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# The slot of this process, if telemetry is enabled in it
+_slot: Optional[TelemetrySlot] = None
+
+
+def enable(telemetry: Telemetry):
+    """
+    Write the metrics of the games of this process to a slot of telemetry. This can be given as the initializer of a
+    pool of processes, with the telemetry as its argument, to enable it in every worker.
+
+    :param telemetry: The telemetry.
+    """
+    global _slot
+    _slot = telemetry.claim()
+
+
+def attach(game: Game):
+    """
+    Record the metrics of a game if telemetry is enabled in this process, and otherwise do nothing.
+
+    :param game: The game.
+    """
+    if _slot is not None:
+        _slot.attach(game)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the metrics served by a telemetry endpoint.")
+    parser.add_argument("url", help="e.g. http://127.0.0.1:8000/")
+    arguments = parser.parse_args()
+    with urlopen(arguments.url) as response:
+        print(json.dumps(json.load(response), indent=4))
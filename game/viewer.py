@@ -0,0 +1,84 @@
+import argparse
+from typing import List
+
+import pyglet
+
+from game.control import GameState
+from game.entities import Ship, Asteroid, Particle
+from game.menu import Screen, ScreenListener, Controller, set_label_text
+from game.shared_frame import FrameReader
+from game.snapshot import unpack_ship, unpack_asteroids, unpack_particles
+
+
+class ViewerScreen(Screen):
+    """
+    Show a game that is played in another process and published with a FramePublisher. Each update the latest
+    complete frame is read from shared memory and drawn with the entities own drawing, so the game never waits
+    for the viewer and the viewer can be left or closed at any time.
+    """
+
+    def __init__(self, window, screen_listener: ScreenListener, name: str):
+        """
+        Attach to the published game.
+
+        :param window: The window to draw on.
+        :param screen_listener: The listener for changes to the screen.
+        :param name: The name the game is published under.
+        """
+        super().__init__(screen_listener)
+        self.window = window
+        self.reader = FrameReader(name)
+        self.ships: List[Ship] = []
+        self.asteroids: List[Asteroid] = []
+        self.particles: List[Particle] = []
+        self.points = 0
+        self.state = GameState.INPLAY.value
+        self.batch = pyglet.graphics.Batch()
+        self.points_label = pyglet.text.Label("Points: 0", font_name="Arial", font_size=12, x=0, y=window.height,
+                                              anchor_x="left", anchor_y="top", batch=self.batch)
+
+    def update(self, window):
+        """
+        Set the entities to those of the latest frame, keeping the last one if the game is mid write.
+
+        :param window: The window to draw on.
+        """
+        frame = self.reader.read()
+        if frame is None:
+            return
+        for _ in range(len(frame.ships) - len(self.ships)):
+            self.ships.append(Ship(0, 0, window, lambda: 0.0))
+        del self.ships[len(frame.ships):]
+        for row, ship in zip(frame.ships, self.ships):
+            unpack_ship(row, ship)
+        unpack_asteroids(frame.asteroids, self.asteroids)
+        unpack_particles(frame.particles, self.particles)
+        self.points = frame.points
+        self.state = frame.state
+
+    def draw(self, window):
+        """
+        Draw the points and the entities of the game.
+
+        :param window: The window to draw on.
+        """
+        status = "" if self.state != GameState.OVER.value else "  Game Over"
+        set_label_text(self.points_label, "Points: " + str(self.points) + status)
+        self.batch.draw()
+        for entity in self.ships + self.asteroids + self.particles:
+            entity.draw()
+
+    def leave(self, window):
+        """
+        Stop reading the published game.
+
+        :param window: The window drawn on.
+        """
+        self.reader.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Watch a game published to shared memory by another process.")
+    parser.add_argument("name", help="The name the game is published under.")
+    arguments = parser.parse_args()
+    Controller(lambda window, listener: ViewerScreen(window, listener, arguments.name))
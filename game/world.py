@@ -0,0 +1,672 @@
+import argparse
+import os
+import sys
+from multiprocessing import Pipe, Process
+from time import perf_counter
+from typing import List, Type, Dict, Tuple, NamedTuple, Any
+
+import numpy as np
+
+from game.agent import Agent, decide_all
+from game.config import GameConfig
+from game.control import Game, GameState
+from game.entities import Asteroid, Particle, Ship
+from game.evaluation import import_agent
+from game.headless import HeadlessWindow
+from game.kernels import ship_hits, point_hits
+from game.raster import ship_vertices
+from game.snapshot import ASTEROID_FIELDS, PARTICLE_FIELDS, pack_asteroids, unpack_asteroids, pack_particles,\
+    unpack_particles
+
+
+class SectorGrid:
+    """
+    A world split into a grid of sectors of the same size, numbered row by row from the bottom left. Each entity
+    belongs to the sector its centre is in, those past the edges of the world to the nearest sector. The halo of a
+    sector is the band around it that its agents see into and its entities collide across.
+    """
+
+    def __init__(self, columns: int, rows: int, sector_width: float, sector_height: float, halo: float):
+        """
+        :param columns: The number of sectors across the world.
+        :param rows: The number of sectors up the world.
+        :param sector_width: The width of each sector.
+        :param sector_height: The height of each sector.
+        :param halo: The width of the halo around each sector.
+        :raises ValueError: If the halo is wider than half a sector, so that it would reach past the neighbours.
+        """
+        if not 0 <= 2 * halo <= min(sector_width, sector_height):
+            raise ValueError("The halo of {} is wider than half of a {}x{} sector".format(halo, sector_width,
+                                                                                      sector_height))
+        self.columns = columns
+        self.rows = rows
+        self.sector_width = sector_width
+        self.sector_height = sector_height
+        self.halo = halo
+        self.width = columns * sector_width
+        self.height = rows * sector_height
+
+    def __len__(self) -> int:
+        return self.columns * self.rows
+
+    def centre(self, sector: int) -> Tuple[float, float]:
+        """
+        :param sector: A sector.
+        :return: The coordinates of the middle of the sector.
+        """
+        row, column = divmod(sector, self.columns)
+        return (column + 0.5) * self.sector_width, (row + 0.5) * self.sector_height
+
+    def columns_of(self, x: np.ndarray) -> np.ndarray:
+        """
+        :param x: The x coordinates of some points.
+        :return: The column of sectors each point is in.
+        """
+        return np.clip(np.floor_divide(x, self.sector_width), 0, self.columns - 1).astype(np.int64)
+
+    def rows_of(self, y: np.ndarray) -> np.ndarray:
+        """
+        :param y: The y coordinates of some points.
+        :return: The row of sectors each point is in.
+        """
+        return np.clip(np.floor_divide(y, self.sector_height), 0, self.rows - 1).astype(np.int64)
+
+    def sectors_of(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        :param x: The x coordinates of some points.
+        :param y: The y coordinates of the points.
+        :return: The sector each point is in.
+        """
+        return self.rows_of(y) * self.columns + self.columns_of(x)
+
+    def halo_sectors(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        :param x: The x coordinates of some points.
+        :param y: The y coordinates of the points.
+        :return: The sectors whose halo or inside each point is in, as the sectors of the corners of the square of
+         the width of two halos around it, of shape (number of points, 4) with sectors repeated where there are fewer.
+        """
+        left, right = self.columns_of(x - self.halo), self.columns_of(x + self.halo)
+        bottom, top = self.rows_of(y - self.halo) * self.columns, self.rows_of(y + self.halo) * self.columns
+        return np.stack([bottom + left, bottom + right, top + left, top + right], axis=1)
+
+
+class Halo(NamedTuple):
+    """ Copies of the entities near a sector that other sectors own, packed by pack_asteroids and pack_particles. """
+    asteroids: np.ndarray
+    particles: np.ndarray
+
+
+class Handoff(NamedTuple):
+    """
+    Entities handed to a sector by the sector they have moved out of. The asteroids and particles are packed by
+    pack_asteroids and pack_particles, and each ship is the index of the ship in the world and its agent.
+    """
+    asteroids: np.ndarray
+    particles: np.ndarray
+    ships: List[Tuple[int, Agent]]
+
+
+class SectorReport(NamedTuple):
+    """ What happened in a sector in the second half of a tick and what it sends to other sectors. """
+    reward: int
+    dead: List[int]
+    handoffs: Dict[int, Handoff]
+    halos: Dict[int, Halo]
+    asteroids: int
+    particles: int
+    ships: int
+
+
+def empty_asteroids() -> np.ndarray:
+    return np.empty((0, len(ASTEROID_FIELDS)), dtype=np.float64)
+
+
+def empty_particles() -> np.ndarray:
+    return np.empty((0, len(PARTICLE_FIELDS)), dtype=np.float64)
+
+
+def concatenate_rows(arrays: List[np.ndarray], empty: np.ndarray) -> np.ndarray:
+    """
+    :param arrays: Packed entities, any of which may be empty.
+    :param empty: The array to return if they are all empty.
+    :return: The entities one after another.
+    """
+    arrays = [array for array in arrays if len(array)]
+    return np.concatenate(arrays) if arrays else empty
+
+
+def merge_halos(halos: List[Halo]) -> Halo:
+    """
+    :param halos: The halos sent to a sector by each of its neighbours.
+    :return: The whole halo of the sector.
+    """
+    return Halo(concatenate_rows([halo.asteroids for halo in halos], empty_asteroids()),
+                concatenate_rows([halo.particles for halo in halos], empty_particles()))
+
+
+def merge_handoffs(handoffs: List[Handoff]) -> Handoff:
+    """
+    :param handoffs: The entities handed to a sector by each sector.
+    :return: All of the entities handed to the sector.
+    """
+    return Handoff(concatenate_rows([handoff.asteroids for handoff in handoffs], empty_asteroids()),
+                   concatenate_rows([handoff.particles for handoff in handoffs], empty_particles()),
+                   [ship for handoff in handoffs for ship in handoff.ships])
+
+
+def group_rows(rows: np.ndarray, sectors: np.ndarray, owners: np.ndarray) -> Dict[int, np.ndarray]:
+    """
+    :param rows: Packed entities.
+    :param sectors: The sectors to send each entity to, of shape (number of entities, any number).
+    :param owners: The sector owning each entity, which it is not sent to.
+    :return: The entities to send to each sector.
+    """
+    if not len(rows):
+        return {}
+    sectors = sectors.reshape(len(rows), -1)
+    groups = {}
+    for sector in np.unique(sectors).tolist():
+        sent = (sectors == sector).any(axis=1) & (owners != sector)
+        if sent.any():
+            groups[sector] = rows[sent]
+    return groups
+
+
+class Sector:
+    """
+    The part of a world inside one sector, simulated by a worker process. The sector owns the asteroids, particles
+    and ships whose centres are in it, and sees copies of the entities of other sectors in its halo, which its
+    agents perceive and its entities collide with. A tick is played in two halves, between which the world
+    exchanges what the sectors send each other: in act the agents perceive, decide and move their ships, and in
+    collide the entities collide and the asteroids and particles move.
+    Both sectors of a pair of entities either side of a border test them against each other, the owner of each
+    destroying it if it was hit, so that no sector waits on another to learn what happened to its entities.
+    """
+
+    def __init__(self, index: int, grid: SectorGrid, config: GameConfig):
+        """
+        :param index: The sector.
+        :param grid: The sectors of the world.
+        :param config: The constants of the world.
+        """
+        self.index = index
+        self.grid = grid
+        # Holds the entities of the sector, with the size of the whole world so that asteroids and particles leave
+        # and ships wrap at the edges of the world rather than of the sector
+        self.game = Game(HeadlessWindow(grid.width, grid.height), [], headless=True, config=config)
+        # The index in the world of the ship of each agent
+        self.indices: List[int] = []
+        self.halo_asteroids: List[Asteroid] = []
+        self.halo_particles: List[Particle] = []
+
+    def receive(self, handoff: Handoff):
+        """
+        Take ownership of the entities handed to the sector.
+
+        :param handoff: The entities.
+        """
+        game = self.game
+        arrived: List = []
+        unpack_asteroids(handoff.asteroids, arrived)
+        game.asteroids.extend(arrived)
+        arrived = []
+        unpack_particles(handoff.particles, arrived)
+        game.particles.extend(arrived)
+        for index, agent in handoff.ships:
+            agent.get_ship().clock = game.clock
+            game.agents.append(agent)
+            self.indices.append(index)
+
+    def act(self, ticks: int, arrivals: Handoff, halo: Halo) -> Tuple[Dict[int, Halo], Dict[int, Handoff]]:
+        """
+        Take the entities handed to the sector, then let the agents perceive the sector and its halo, decide and
+        move their ships.
+
+        :param ticks: The number of ticks the world has played, including this one.
+        :param arrivals: The entities handed to the sector since the last tick.
+        :param halo: The halo of the sector at the start of the tick.
+        :return: The asteroids and particles of the sector in the halo of each other sector, to collide with, and
+         the ships that have moved into each other sector.
+        """
+        game = self.game
+        game.ticks = ticks
+        self.receive(arrivals)
+        unpack_asteroids(halo.asteroids, self.halo_asteroids)
+        unpack_particles(halo.particles, self.halo_particles)
+        game.perceive(game.particles + self.halo_particles, game.asteroids + self.halo_asteroids, game.agents)
+        game.decisions = decide_all(game.agents)
+        for agent, decision in zip(game.agents, game.decisions):
+            game.enact_decision(agent, decision)
+            agent.get_ship().update()
+
+        ships = [agent.get_ship() for agent in game.agents]
+        sectors = self.grid.sectors_of(np.array([ship.centre_x for ship in ships], dtype=np.float64),
+                                       np.array([ship.centre_y for ship in ships], dtype=np.float64)).tolist()
+        leaving: Dict[int, Handoff] = {}
+        staying = [position for position, sector in enumerate(sectors) if sector == self.index]
+        for position, sector in enumerate(sectors):
+            if sector != self.index:
+                agent = game.agents[position]
+                # The clock is a method of the game of this sector, which must not be sent with the ship
+                agent.get_ship().clock = None
+                leaving.setdefault(sector, Handoff(empty_asteroids(), empty_particles(), [])).ships.append(
+                    (self.indices[position], agent))
+        if leaving:
+            game.agents = [game.agents[position] for position in staying]
+            self.indices = [self.indices[position] for position in staying]
+        # Every entity the sector owns is tested against those of the sectors whose halos it is in, including the
+        # particles just fired from ships near the border, which may already be over it
+        return self.halos(pack_asteroids(game.asteroids), pack_particles(game.particles)), leaving
+
+    def collide(self, arrivals: Handoff, halo: Halo) -> SectorReport:
+        """
+        Take the ships that have moved into the sector, collide the entities of the sector with each other and
+        with those of its halo, move the asteroids and particles and hand those that leave the sector to the
+        sectors they move into.
+
+        :param arrivals: The ships that have moved into the sector.
+        :param halo: The halo of the sector after the ships have moved.
+        :return: The report of the sector.
+        """
+        game = self.game
+        self.receive(arrivals)
+        asteroids, particles, agents = game.asteroids, game.particles, game.agents
+        num_of_asteroids = len(asteroids)
+        num_of_particles = len(particles)
+        asteroid_state = np.concatenate([
+            np.array([(asteroid.centre_x, asteroid.centre_y, asteroid.radius) for asteroid in asteroids],
+                     dtype=np.float64).reshape(-1, 3),
+            halo.asteroids[:, [0, 1, 4]]])
+        ship_hit = ship_hits(ship_vertices([agent.get_ship() for agent in agents]), asteroid_state).any(axis=1)
+        dead = []
+        for position in np.flatnonzero(ship_hit)[::-1]:
+            del agents[position]
+            dead.append(self.indices.pop(position))
+        particle_hit = point_hits(np.concatenate([
+            np.array([(particle.centre_x, particle.centre_y) for particle in particles],
+                     dtype=np.float64).reshape(-1, 2),
+            halo.particles[:, :2]]), asteroid_state)
+        # Each hit is scored by the owner of the particle, so that it is scored once
+        reward = int(particle_hit[:num_of_particles].sum())
+        particle_destroyed = particle_hit[:num_of_particles].any(axis=1).tolist()
+        asteroid_hit = particle_hit[:, :num_of_asteroids].any(axis=0).tolist()
+
+        width, height = self.grid.width, self.grid.height
+        preserved = 0
+        for asteroid, hit in zip(asteroids, asteroid_hit):
+            if hit or game.out_of_window(asteroid, width, height):
+                asteroid.release()
+            else:
+                asteroids[preserved] = asteroid
+                preserved += 1
+                asteroid.update()
+        del asteroids[preserved:]
+        preserved = 0
+        for particle, destroyed in zip(particles, particle_destroyed):
+            if not destroyed and 0 < particle.centre_x < width and 0 < particle.centre_y < height:
+                particle.update()
+                particles[preserved] = particle
+                preserved += 1
+            else:
+                particle.release()
+        del particles[preserved:]
+
+        asteroid_rows, asteroid_owners, asteroid_handoffs = self.hand_off(asteroids, pack_asteroids(asteroids))
+        particle_rows, particle_owners, particle_handoffs = self.hand_off(particles, pack_particles(particles))
+        handoffs = {sector: Handoff(asteroid_handoffs.get(sector, empty_asteroids()),
+                                    particle_handoffs.get(sector, empty_particles()), [])
+                    for sector in set(asteroid_handoffs) | set(particle_handoffs)}
+        # The halos are of the positions at the start of the next tick, so those just handed off are sent as well,
+        # by the sector that still has them
+        return SectorReport(reward, dead, handoffs,
+                            self.halos(asteroid_rows, particle_rows, asteroid_owners, particle_owners),
+                            len(asteroids), len(particles), len(agents))
+
+    def hand_off(self, entities: List, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Dict[int, np.ndarray]]:
+        """
+        Remove the entities that have moved out of the sector, returning them to their pool.
+
+        :param entities: The asteroids or particles of the sector.
+        :param rows: The entities packed.
+        :return: The rows, the sector owning each entity from now on and the entities to hand to each sector.
+        """
+        owners = self.grid.sectors_of(rows[:, 0], rows[:, 1])
+        leaving = owners != self.index
+        if not leaving.any():
+            return rows, owners, {}
+        kept = []
+        for entity, left in zip(entities, leaving.tolist()):
+            if left:
+                entity.release()
+            else:
+                kept.append(entity)
+        entities[:] = kept
+        return rows, owners, group_rows(rows[leaving], owners[leaving], self.index)
+
+    def halos(self, asteroids: np.ndarray, particles: np.ndarray, asteroid_owners=None, particle_owners=None) \
+            -> Dict[int, Halo]:
+        """
+        :param asteroids: Packed asteroids.
+        :param particles: Packed particles.
+        :param asteroid_owners: The sector owning each asteroid, this sector if not given.
+        :param particle_owners: The sector owning each particle, this sector if not given.
+        :return: The asteroids and particles in the halo of each sector that does not own them.
+        """
+        grid = self.grid
+        halos = []
+        for rows, owners in ((asteroids, asteroid_owners), (particles, particle_owners)):
+            halos.append(group_rows(rows, grid.halo_sectors(rows[:, 0], rows[:, 1]),
+                                    self.index if owners is None else owners) if len(rows) else {})
+        asteroid_halos, particle_halos = halos
+        return {sector: Halo(asteroid_halos.get(sector, empty_asteroids()),
+                             particle_halos.get(sector, empty_particles()))
+                for sector in set(asteroid_halos) | set(particle_halos)}
+
+
+def run_sector(connection, index: int, grid: SectorGrid, config: GameConfig):
+    """
+    Simulate a sector in a worker process, calling the method of the sector named by each request of the world and
+    sending back what it returns, or the error it raises, until the world sends None.
+
+    :param connection: The end of the pipe to the world.
+    :param index: The sector.
+    :param grid: The sectors of the world.
+    :param config: The constants of the world.
+    """
+    sector = Sector(index, grid, config)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        command, arguments = request
+        try:
+            reply = getattr(sector, command)(*arguments)
+        except Exception as error:
+            reply = error
+        connection.send(reply)
+    connection.close()
+
+
+class LocalSector:
+    """ A sector simulated in this process, with the same interface as the pipe to a worker process. """
+
+    def __init__(self, sector: Sector):
+        """
+        :param sector: The sector.
+        """
+        self.sector = sector
+        self.reply = None
+
+    def send(self, request):
+        command, arguments = request
+        self.reply = getattr(self.sector, command)(*arguments)
+
+    def recv(self):
+        return self.reply
+
+
+def minimum_halo(config: GameConfig) -> float:
+    """
+    :param config: The constants of a world.
+    :return: The narrowest halo in which every collision across a border is found, the furthest an asteroid can be
+     from a ship or particle it hits, as a particle is fired from the nose of a ship.
+    """
+    return config.asteroid_size + 2 * config.ship_height + 1
+
+
+class World:
+    """
+    A world of many sectors played in lockstep, each sector simulated by a worker process or, without processes, all
+    in this process. Every tick the workers are sent and send back the entities of their sectors, which costs a
+    millisecond or two, so workers only pay off when each sector has more work a tick than that and there are cores
+    to spare; benchmark times both. Asteroids are created at the edges of the whole world, ships wrap around it and
+    the agents of each sector only perceive the sector and its halo.
+    Each tick the world sends each sector the entities handed to it and its halo, waits for every sector to act,
+    sends each sector the halos for collisions and the ships that moved into it, and waits for every sector to
+    collide, so no sector is ever a tick ahead of another. The world keeps the clock, points and level and creates
+    the asteroids, by a game of its own without agents.
+    """
+
+    def __init__(self, agent_types: List[Type[Agent]], columns: int = 2, rows: int = 2, sector_width: int = 640,
+                 sector_height: int = 480, seed: int = None, config: GameConfig = None, halo: float = None,
+                 processes: bool = True):
+        """
+        Create a ship in the middle of a sector for each of the agents, the sectors taking turns, and start the
+        sectors.
+
+        :param agent_types: The types of agent to play the world.
+        :param columns: The number of sectors across the world.
+        :param rows: The number of sectors up the world.
+        :param sector_width: The width of each sector.
+        :param sector_height: The height of each sector.
+        :param seed: The seed of the world.
+        :param config: The constants of the world, the defaults if not given.
+        :param halo: The width of the halo of each sector, a quarter of the smaller side of a sector if not given.
+        :param processes: Whether to simulate each sector in a worker process, rather than all in this one.
+        :raises ValueError: If the halo is too narrow to find every collision, or wider than half a sector.
+        """
+        self.config = config if config is not None else GameConfig()
+        if halo is None:
+            halo = max(min(sector_width, sector_height) / 4, minimum_halo(self.config))
+        if halo < minimum_halo(self.config):
+            raise ValueError("The halo of {} is narrower than the {} an asteroid reaches".format(
+                halo, minimum_halo(self.config)))
+        self.grid = SectorGrid(columns, rows, sector_width, sector_height, halo)
+        self.window = HeadlessWindow(self.grid.width, self.grid.height)
+        self.game = Game(self.window, [], seed=seed, headless=True, config=self.config)
+        self.ships = len(agent_types)
+        self.alive = set(range(self.ships))
+        self.arrivals: List[List[Handoff]] = [[] for _ in range(len(self.grid))]
+        self.halos: List[List[Halo]] = [[] for _ in range(len(self.grid))]
+        self.reports: List[SectorReport] = []
+        for index, agent_type in enumerate(agent_types):
+            sector = index % len(self.grid)
+            ship = Ship(*self.grid.centre(sector), self.window, clock=self.game.clock)
+            self.config.configure_ship(ship)
+            agent = agent_type(ship)
+            ship.clock = None
+            self.arrivals[sector].append(Handoff(empty_asteroids(), empty_particles(), [(index, agent)]))
+
+        self.processes: List[Process] = []
+        self.connections = []
+        for index in range(len(self.grid)):
+            if processes:
+                connection, worker_connection = Pipe()
+                process = Process(target=run_sector, args=(worker_connection, index, self.grid, self.config),
+                                  daemon=True)
+                process.start()
+                worker_connection.close()
+                self.processes.append(process)
+                self.connections.append(connection)
+            else:
+                self.connections.append(LocalSector(Sector(index, self.grid, self.config)))
+
+    def request(self, command: str, arguments: List[Tuple]) -> List[Any]:
+        """
+        Call a method of every sector at once and wait for them all to return.
+
+        :param command: The name of the method.
+        :param arguments: The arguments for each sector.
+        :return: What each sector returned.
+        :raises Exception: The first error raised by a sector.
+        """
+        for connection, sector_arguments in zip(self.connections, arguments):
+            connection.send((command, sector_arguments))
+        replies = [connection.recv() for connection in self.connections]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+    def spawn(self):
+        """ Create the asteroids due by the clock of the world and hand each to the sector it is in. """
+        game = self.game
+        while game.next_asteroid_time <= game.clock():
+            game.asteroid_generate(self.window)
+            game.next_asteroid_time += game.seconds_between_asteroid_generation
+        if game.asteroids:
+            rows = pack_asteroids(game.asteroids)
+            for sector, sector_rows in group_rows(rows, self.grid.sectors_of(rows[:, 0], rows[:, 1]),
+                                                  np.full(len(rows), -1)).items():
+                self.arrivals[sector].append(Handoff(sector_rows, empty_particles(), []))
+            unpack_asteroids(empty_asteroids(), game.asteroids)
+            # The game of the world is never ticked, so the spawns it adds to its hash would otherwise pile up
+            game.world_hash.spawned.clear()
+
+    def step(self) -> Tuple[int, bool, Dict]:
+        """
+        Play a tick in every sector.
+
+        :return: The points scored in the tick, whether the world is over and information about the world.
+        """
+        game = self.game
+        if game.state is not GameState.INPLAY:
+            return 0, game.state is GameState.OVER, self.info()
+        game.ticks += 1
+        self.spawn()
+        replies = self.request('act', [(game.ticks, merge_handoffs(arrivals), merge_halos(halos))
+                                       for arrivals, halos in zip(self.arrivals, self.halos)])
+        collision_halos: List[List[Halo]] = [[] for _ in range(len(self.grid))]
+        moved_ships: List[List[Handoff]] = [[] for _ in range(len(self.grid))]
+        for halos, handoffs in replies:
+            for sector, halo in halos.items():
+                collision_halos[sector].append(halo)
+            for sector, handoff in handoffs.items():
+                moved_ships[sector].append(handoff)
+        self.reports = self.request('collide', [(merge_handoffs(ships), merge_halos(halos))
+                                                for ships, halos in zip(moved_ships, collision_halos)])
+
+        self.arrivals = [[] for _ in range(len(self.grid))]
+        self.halos = [[] for _ in range(len(self.grid))]
+        reward = 0
+        for report in self.reports:
+            reward += report.reward
+            self.alive.difference_update(report.dead)
+            for sector, handoff in report.handoffs.items():
+                self.arrivals[sector].append(handoff)
+            for sector, halo in report.halos.items():
+                self.halos[sector].append(halo)
+        game.points += reward
+        if not self.alive:
+            game.game_over()
+        game.advance_level()
+        return reward, game.state is GameState.OVER, self.info()
+
+    def info(self) -> Dict[str, Any]:
+        """
+        :return: The ticks, level and points of the world, the number of entities in it, including those being
+         handed between sectors, and the number in each sector.
+        """
+        handoffs = [handoff for arrivals in self.arrivals for handoff in arrivals]
+        return {
+            'ticks': self.game.ticks, 'level': self.game.level, 'points': self.game.points, 'ships': len(self.alive),
+            'asteroids': sum(report.asteroids for report in self.reports) +
+            sum(len(handoff.asteroids) for handoff in handoffs),
+            'particles': sum(report.particles for report in self.reports) +
+            sum(len(handoff.particles) for handoff in handoffs),
+            'sectors': [{'asteroids': report.asteroids, 'particles': report.particles, 'ships': report.ships}
+                        for report in self.reports]
+        }
+
+    def close(self):
+        """ Stop the worker processes. """
+        for connection in self.connections:
+            if isinstance(connection, LocalSector):
+                continue
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self) -> 'World':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def benchmark(agent_type: Type[Agent], sizes: List[Tuple[int, int]], columns: int = 2, rows: int = 2,
+              ships_per_sector: int = 4, ticks: int = 300, warm_up: int = 50, seed: int = 0,
+              config: GameConfig = None) -> List[Dict[str, Any]]:
+    """
+    Time the same worlds with their sectors in worker processes and all in this process, to find the size of
+    sector at which the workers make up for sending the entities between processes every tick.
+
+    :param agent_type: The type of agent to play the worlds.
+    :param sizes: The width and height of the sectors of each world.
+    :param columns: The number of sectors across each world.
+    :param rows: The number of sectors up each world.
+    :param ships_per_sector: The number of ships starting in each sector.
+    :param ticks: The most ticks timed, fewer if the world is over first.
+    :param warm_up: The ticks played before timing, which include compiling the kernels in each worker.
+    :param seed: The seed of the worlds.
+    :param config: The constants of the worlds, the defaults if not given.
+    :return: For each size the milliseconds of a tick in this process and with workers, the speed up of the
+     workers and the number of asteroids and ships at the end.
+    """
+    results = []
+    for width, height in sizes:
+        result: Dict[str, Any] = {'sector_width': width, 'sector_height': height}
+        for mode, processes in (('local', False), ('workers', True)):
+            with World([agent_type] * (ships_per_sector * columns * rows), columns, rows, width, height, seed,
+                       config, processes=processes) as world:
+                for _ in range(warm_up):
+                    world.step()
+                played = 0
+                start = perf_counter()
+                for _ in range(ticks):
+                    _, over, world_info = world.step()
+                    if over:
+                        break
+                    played += 1
+                result[mode + '_ms'] = 1000 * (perf_counter() - start) / max(played, 1)
+            result.update(ticks=played, asteroids=world_info['asteroids'], ships=world_info['ships'])
+        result['speed_up'] = result['local_ms'] / result['workers_ms']
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a world split into sectors, each simulated by a worker "
+                                                 "process.")
+    parser.add_argument("--columns", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=2)
+    parser.add_argument("--sector-width", type=int, default=640)
+    parser.add_argument("--sector-height", type=int, default=480)
+    parser.add_argument("--halo", type=float, default=None)
+    parser.add_argument("--agent", default="agents.reactive_agent.ReactiveAgent")
+    parser.add_argument("--ships", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=3600, help="the most ticks to play")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="simulate every sector in this process")
+    parser.add_argument("--benchmark", nargs="+", default=None, metavar="WIDTHxHEIGHT",
+                        help="time worlds of these sector sizes with and without workers, --ships per sector")
+    arguments = parser.parse_args()
+    agent_class = import_agent(arguments.agent)
+    if arguments.benchmark:
+        print("{} cores".format(os.cpu_count()))
+        benchmark_sizes = [tuple(int(value) for value in size.split("x")) for size in arguments.benchmark]
+        for benchmark_result in benchmark(agent_class, benchmark_sizes, arguments.columns, arguments.rows,
+                                          arguments.ships, min(arguments.ticks, 300), seed=arguments.seed):
+            print("{sector_width}x{sector_height}: {local_ms:.2f}ms a tick in this process, {workers_ms:.2f}ms with "
+                  "workers, {speed_up:.2f}x, {asteroids} asteroids and {ships} ships after {ticks} ticks".format(
+                      **benchmark_result))
+        sys.exit()
+    with World([agent_class] * arguments.ships, arguments.columns, arguments.rows, arguments.sector_width,
+               arguments.sector_height, arguments.seed, halo=arguments.halo,
+               processes=not arguments.local) as world:
+        start = perf_counter()
+        world_info = world.info()
+        for _ in range(arguments.ticks):
+            _, over, world_info = world.step()
+            if over:
+                break
+        seconds = perf_counter() - start
+    print("{} ticks in {:.1f}s ({:.0f} ticks a second), {} points, level {}, {} of {} ships".format(
+        world_info['ticks'], seconds, world_info['ticks'] / max(seconds, 1e-9), world_info['points'],
+        world_info['level'], world_info['ships'], arguments.ships))
+    for index, sector_info in enumerate(world_info['sectors']):
+        print("sector {}: {}".format(index, sector_info))
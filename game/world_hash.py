@@ -0,0 +1,64 @@
+from typing import List
+
+from game.agent import pack_decision
+from game.entities import Asteroid
+
+MASK = (1 << 64) - 1
+
+
+class WorldHash:
+    """
+    A hash of everything that has happened in a game, rolled forward every tick so two runs of a game have the same
+    hash at a tick only if they have played out the same up to it, and once they differ they never match again.
+    Asteroids and particles move in straight lines from where they appear, so rather than hashing every entity
+    every tick it folds in the asteroids created, which carry the position of the random number generator, the
+    ships, which decide where particles are fired from, the actions of the agents, and the number of asteroids,
+    particles and points, which change whenever something is destroyed.
+    Only numbers are hashed, with the hash of Python tuples, which unlike that of strings is the same in every
+    process but may change between versions of Python, so hashes should be compared between runs on the same
+    version.
+    """
+
+    def __init__(self, value: int = 0):
+        """
+        :param value: The hash to start from.
+        """
+        self.value = value
+        self.spawned: List[float] = []
+
+    def spawn(self, asteroid: Asteroid):
+        """
+        Record an asteroid that has been created, to be folded in with the tick it appears in.
+
+        :param asteroid: The asteroid.
+        """
+        self.spawned += (asteroid.centre_x, asteroid.centre_y, asteroid.velocity_x, asteroid.velocity_y,
+                         asteroid.radius, *asteroid.points)
+
+    def tick(self, game) -> int:
+        """
+        Fold a tick that has just been played into the hash.
+
+        :param game: The game.
+        :return: The new hash.
+        """
+        # Everything is folded into one flat tuple, as building nested ones costs more than hashing them
+        values = [self.value, game.ticks, game.points, len(game.asteroids), len(game.particles)]
+        for agent in game.agents:
+            ship = agent.get_ship()
+            values += (ship.facing, ship.centre_x, ship.centre_y, ship.velocity_x, ship.velocity_y)
+        # The hash of an action is that of its name, which differs between processes, so decisions are packed first
+        values += map(pack_decision, game.decisions)
+        values += self.spawned
+        self.value = hash(tuple(values)) & MASK
+        self.spawned.clear()
+        return self.value
+
+    def reset(self, value: int):
+        """
+        Start again from a hash, e.g. one saved in a snapshot.
+
+        :param value: The hash.
+        """
+        self.value = value
+        self.spawned.clear()
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from game import kernels
+from game.control import Game
+from game.entities import Ship
+from game.headless import HeadlessWindow
+from game.raster import ship_vertices
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = [
+    pytest.param(kernels._ship_hits_loop, kernels._point_hits_loop, id='loop'),
+    pytest.param(kernels._ship_hits_numpy, kernels._point_hits_numpy, id='numpy'),
+    pytest.param(None, None, id='numba',
+                 marks=pytest.mark.skipif(kernels.numba is None, reason="numba is not installed")),
+]
+
+# Plays seeded headless games and prints the world hash after every tick
+TRACE_SCRIPT = """
+from game.headless import create_game
+from agents.reactive_agent import ReactiveAgent
+from agents.leading_agent import LeadingAgent
+for seed in range(3):
+    game = create_game([ReactiveAgent, LeadingAgent], seed)
+    for _ in range(1500):
+        _, over, info = game.step()
+        print(info['world_hash'])
+        if over:
+            break
+"""
+
+
+def random_scene(seed: int):
+    """
+    :return: Ships, points and asteroids placed close enough together to often touch, the asteroids as the arrays
+     taken by the kernels and as the objects taken by Game.
+    """
+    rng = np.random.default_rng(seed)
+    window = HeadlessWindow()
+    ships = []
+    for x, y, facing in zip(rng.uniform(0, 100, 4), rng.uniform(0, 100, 4), rng.uniform(0, 7, 4)):
+        ship = Ship(x, y, window)
+        ship.facing = facing
+        ships.append(ship)
+    points = rng.uniform(0, 100, (8, 2))
+    asteroids = np.column_stack((rng.uniform(0, 100, (16, 2)), rng.uniform(5, 40, 16)))
+    circles = [SimpleNamespace(centre_x=x, centre_y=y, radius=radius) for x, y, radius in asteroids.tolist()]
+    return ships, points, asteroids, circles
+
+
+@pytest.mark.parametrize('ship_kernel, point_kernel', BACKENDS)
+@pytest.mark.parametrize('seed', range(50))
+def test_kernels_match_game(ship_kernel, point_kernel, seed):
+    if ship_kernel is None:
+        ship_kernel = kernels.numba.njit(kernels._ship_hits_loop)
+        point_kernel = kernels.numba.njit(kernels._point_hits_loop)
+    game = Game(HeadlessWindow(), [], headless=True)
+    ships, points, asteroids, circles = random_scene(seed)
+
+    ship_hits = np.zeros((len(ships), len(asteroids)), dtype=np.bool_)
+    ship_kernel(ship_vertices(ships).astype(np.float64), asteroids, ship_hits)
+    expected = [[game.intersecting_ship(circle, ship) for circle in circles] for ship in ships]
+    assert ship_hits.tolist() == expected
+
+    point_hits = np.zeros((len(points), len(asteroids)), dtype=np.bool_)
+    point_kernel(points, asteroids, point_hits)
+    expected = [[game.is_inside(x, y, circle) for circle in circles] for x, y in points.tolist()]
+    assert point_hits.tolist() == expected
+
+
+def world_hash_trace(backend: str = None) -> str:
+    """
+    :param backend: The backend set by ASTEROIDS_KERNELS, the default if not given.
+    :return: The world hashes of seeded games played in a new process with the backend.
+    """
+    environment = dict(os.environ)
+    environment.pop('ASTEROIDS_KERNELS', None)
+    if backend is not None:
+        environment['ASTEROIDS_KERNELS'] = backend
+    return subprocess.run([sys.executable, "-c", TRACE_SCRIPT], cwd=ROOT, env=environment, capture_output=True,
+                          text=True, check=True).stdout
+
+
+def test_world_hash_same_for_every_backend():
+    numpy_trace = world_hash_trace('numpy')
+    assert numpy_trace
+    assert world_hash_trace() == numpy_trace
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from game.agent import Agent, Action
+from game.control import Game
+from game.entities import Ship
+from game.headless import HeadlessWindow
+from game.perception import VectorPerception
+
+
+class WanderingAgent(Agent):
+    """ Boosts, turns and fires at random, so that its ship wraps around the screen and fires from its edges. """
+
+    def __init__(self, ship):
+        super().__init__(ship)
+        self.rng = random.Random(int(ship.centre_x))
+
+    def decide(self):
+        return [self.rng.choice([Action.BOOST, Action.STOPBOOST]),
+                self.rng.choice([Action.TURNLEFT, Action.TURNRIGHT, Action.STOPTURN]), Action.FIRE]
+
+    @staticmethod
+    def get_perception_type():
+        return VectorPerception
+
+
+def trace(seed: int, kinetic: bool):
+    """
+    :return: The world hash and number of particles after each tick of a seeded game of wandering agents.
+    """
+    window = HeadlessWindow(640, 480)
+    agents = [WanderingAgent(Ship(x, 240, window)) for x in (160, 320, 480)]
+    game = Game(window, agents, seed=seed, headless=True, kinetic=kinetic)
+    history = []
+    for _ in range(3000):
+        _, over, info = game.step()
+        history.append((info['world_hash'], info['particles']))
+        if over:
+            break
+    return history
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_kinetic_plays_as_all_pairs(seed):
+    assert trace(seed, True) == trace(seed, False)
@@ -0,0 +1,66 @@
+import os
+from functools import partial
+
+import numpy as np
+
+from agents.reactive_agent import ReactiveAgent
+from game.control import GameState, update_games
+from game.headless import create_game
+from game.remote import (SHIP_STATE, ASTEROID_STATE, HEADER, RemoteAgent, RemotePolicy, encode_request,
+                         decode_request, start_server)
+
+SEEDS = range(4)
+
+
+def play(games, update):
+    """
+    Play games until they are all over or have played 2000 ticks.
+
+    :param games: The games to play.
+    :param update: Updates every game by a tick.
+    :return: The points of each game and the world hashes of the games after every tick.
+    """
+    hashes = []
+    while any(game.state is GameState.INPLAY for game in games) and games[0].ticks < 2000:
+        update(games)
+        hashes.append([game.world_hash.value for game in games])
+    return [game.points for game in games], hashes
+
+
+def test_remote_agents_play_as_reactive_agents(tmp_path):
+    path = os.path.join(str(tmp_path), "policy.sock")
+    server = start_server(path)
+    policy = RemotePolicy(path)
+    try:
+        remote = play([create_game([partial(RemoteAgent, policy=policy)], seed) for seed in SEEDS], update_games)
+    finally:
+        policy.close()
+        server.terminate()
+        server.join()
+    local = play([create_game([ReactiveAgent], seed) for seed in SEEDS],
+                 lambda games: [game.update() for game in games])
+    assert remote == local
+    assert sum(remote[0]) > 0
+
+
+def test_request_round_trip():
+    rng = np.random.default_rng(0)
+    observations = [(rng.uniform(0, 100, len(SHIP_STATE)), rng.uniform(0, 100, (count, len(ASTEROID_STATE))))
+                    for count in (3, 0, 5)]
+    request = encode_request(observations)
+    size, num_of_ships, num_of_asteroids = HEADER.unpack(request[:HEADER.size])
+    assert (size, num_of_ships, num_of_asteroids) == (len(request), 3, 8)
+    ships, counts, asteroids = decode_request(request[HEADER.size:], num_of_ships, num_of_asteroids)
+    assert np.array_equal(ships, np.array([ship for ship, _ in observations]))
+    assert counts.tolist() == [3, 0, 5]
+    assert np.array_equal(asteroids, np.concatenate([seen for _, seen in observations]))
+
+
+def test_request_round_trip_without_asteroids():
+    observations = [(np.arange(len(SHIP_STATE), dtype=np.float64), np.empty((0, len(ASTEROID_STATE))))]
+    request = encode_request(observations)
+    size, num_of_ships, num_of_asteroids = HEADER.unpack(request[:HEADER.size])
+    ships, counts, asteroids = decode_request(request[HEADER.size:], num_of_ships, num_of_asteroids)
+    assert np.array_equal(ships, observations[0][0][None, :])
+    assert counts.tolist() == [0]
+    assert asteroids.shape == (0, len(ASTEROID_STATE))
@@ -0,0 +1,56 @@
+import pytest
+
+from agents.dumb_agent import DumbAgent
+from agents.reactive_agent import ReactiveAgent
+from game.control import Game
+from game.entities import Ship
+from game.headless import HeadlessWindow, create_game
+from game.world import World
+
+
+def trace(simulation, ticks: int):
+    """
+    Play a game or world until it is over or for a number of ticks.
+
+    :param simulation: The game or world to play.
+    :param ticks: The most ticks to play.
+    :return: The ticks, points, asteroids and particles after each tick.
+    """
+    history = []
+    for _ in range(ticks):
+        _, over, info = simulation.step()
+        history.append((info['ticks'], info['points'], info['asteroids'], info['particles']))
+        if over:
+            break
+    return history
+
+
+@pytest.mark.parametrize('agent_type', [DumbAgent, ReactiveAgent])
+@pytest.mark.parametrize('seed', range(2))
+def test_one_sector_plays_as_a_game(agent_type, seed):
+    expected = trace(create_game([agent_type], seed), 2000)
+    with World([agent_type], 1, 1, 640, 480, seed, processes=False) as world:
+        assert trace(world, 2000) == expected
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_sectors_play_as_one_game(seed):
+    window = HeadlessWindow(640, 480)
+    with World([DumbAgent] * 2, 2, 2, 320, 240, seed, processes=False) as world:
+        agents = [DumbAgent(Ship(*world.grid.centre(sector), window)) for sector in range(2)]
+        expected = trace(Game(window, agents, seed=seed, headless=True), 3000)
+        assert trace(world, 3000) == expected
+
+
+def test_workers_play_as_local_sectors():
+    traces = []
+    for processes in (False, True):
+        with World([ReactiveAgent] * 4, 2, 2, 320, 240, 0, processes=processes) as world:
+            traces.append([world.step() for _ in range(300)])
+    assert traces[0] == traces[1]
+
+
+def test_spawns_are_not_kept():
+    with World([DumbAgent], 2, 2, 320, 240, 0, processes=False) as world:
+        trace(world, 1000)
+        assert world.game.world_hash.spawned == []